@@ -0,0 +1,78 @@
+# bench_item_batch.py
+# Compares updating/deleting N items one call at a time with one batch call,
+# with the GET response cache listening and optionally a durable journal.
+#
+# Usage: python benchmarks/bench_item_batch.py [batch_size]
+
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from item_journal import ItemJournal
+from item_store import ItemStore
+from response_cache import ResponseCache
+
+ITEMS = 100_000
+
+
+def make_store(data_dir):
+    store = ItemStore(copy_on_write=True)
+    if data_dir is not None:
+        ItemJournal(data_dir).open(store)
+    store.add_items("app", "env", [{"id": i, "name": f"item {i}", "description": "benchmark item"}
+                                   for i in range(ITEMS)])
+    store.add_listener(ResponseCache().invalidate)
+    return store
+
+
+def timed(fn):
+    gc.collect()
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def bench(batch_size, data_dir, rounds):
+    store = make_store(data_dir)
+    timings = {}
+
+    def best(label, seconds):
+        timings[label] = min(timings.get(label, seconds), seconds)
+
+    for _ in range(rounds):
+        ids = random.sample(range(ITEMS), 2 * batch_size)
+        singles, batch = ids[:batch_size], ids[batch_size:]
+
+        def put_singles():
+            for item_id in singles:
+                store.update_item("app", "env", item_id, {"description": "one"})
+
+        def delete_singles():
+            for item_id in singles:
+                store.delete_item("app", "env", item_id)
+
+        best('PUT x N', timed(put_singles))
+        best('PUT batch', timed(lambda: store.update_items(
+            "app", "env", [(item_id, {"description": "batch"}) for item_id in batch])))
+        best('DELETE x N', timed(delete_singles))
+        best('DELETE batch', timed(lambda: store.delete_items("app", "env", batch)))
+        # Put the deleted items back for the next round
+        store.add_items("app", "env", [{"id": i, "name": f"item {i}"} for i in ids])
+    return timings
+
+
+if __name__ == '__main__':
+    batch_size = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    print(f"{batch_size} items per request, best ms per request")
+    print(f"{'store':>14} {'PUT x N':>9} {'PUT batch':>10} {'DELETE x N':>11} {'DELETE batch':>13}")
+    for label in ('memory', 'journal+fsync'):
+        with tempfile.TemporaryDirectory() as tmp:
+            timings = bench(batch_size, tmp if label != 'memory' else None,
+                            rounds=5 if label == 'memory' else 2)
+        print(f"{label:>14} {timings['PUT x N'] * 1e3:9.2f} {timings['PUT batch'] * 1e3:10.2f} "
+              f"{timings['DELETE x N'] * 1e3:11.2f} {timings['DELETE batch'] * 1e3:13.2f}")
@@ -0,0 +1,55 @@
+# bench_item_ingest.py
+# Peak memory and time of parsing a large POST /api/items body: buffering
+# and json.loads (what request.get_json() does), then the ItemRecords the
+# store keeps, versus read_items_batch. Times are taken without tracemalloc,
+# which slows allocation-heavy code several times over.
+#
+# Usage: python benchmarks/bench_item_ingest.py [items]
+
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from item_ingest import read_items_batch
+from item_record import ItemRecord
+
+
+def measure(label, fn):
+    start = time.perf_counter()
+    items = fn()
+    elapsed = time.perf_counter() - start
+    del items
+    tracemalloc.start()
+    items = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} {elapsed:7.2f}s  peak {peak / 2**20:8.1f} MiB  ({len(items)} items)")
+
+
+if __name__ == '__main__':
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    with tempfile.NamedTemporaryFile(suffix='.json') as body:
+        body.write(b'{"appid": "app", "appenv": "env", "items": [')
+        for i in range(total):
+            if i:
+                body.write(b', ')
+            body.write(json.dumps({"id": i, "name": f"item {i}", "description": "benchmark item"}).encode())
+        body.write(b']}')
+        body.flush()
+        print(f"body size: {os.path.getsize(body.name) / 2**20:.1f} MiB")
+
+        def buffered():
+            with open(body.name, 'rb') as f:
+                return [ItemRecord.from_dict(item) for item in json.loads(f.read())['items']]
+
+        def streamed():
+            with open(body.name, 'rb') as f:
+                return read_items_batch(f)[2]
+
+        measure("get_json (buffered)", buffered)
+        measure("read_items_batch (streamed)", streamed)
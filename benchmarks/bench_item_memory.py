@@ -0,0 +1,52 @@
+# bench_item_memory.py
+# Memory per stored item: the dicts the store used to keep versus ItemRecord,
+# measured with tracemalloc. Items are decoded from a JSON body the way
+# POST /api/items receives them, so equal descriptions arrive as separate strings.
+#
+# Usage: python benchmarks/bench_item_memory.py [items]
+
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from item_record import ItemRecord
+from item_store import ItemStore
+
+DESCRIPTIONS = ["short description here", "imported by nightly sync", "pending review"]
+
+
+def request_body(total):
+    return json.dumps([
+        {"id": i, "name": f"item {i}", "description": DESCRIPTIONS[i % len(DESCRIPTIONS)]}
+        for i in range(total)
+    ])
+
+
+def measure(label, total, build):
+    body = request_body(total)
+    gc.collect()
+    tracemalloc.start()
+    kept = build(json.loads(body))
+    gc.collect()
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<40} {used / total:8.1f} bytes/item")
+    return kept
+
+
+if __name__ == '__main__':
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    print(f"{total} items")
+    measure("dicts", total, lambda items: list(items))
+    measure("ItemRecord", total, lambda items: [ItemRecord.from_dict(item) for item in items])
+    # What ItemStore held per item before records: the dict plus its
+    # slot, insertion sequence number and id index entry
+    measure("dicts + ItemStore indexes (before)", total,
+            lambda items: (items, list(range(1, len(items) + 1)),
+                           {item["id"]: pos for pos, item in enumerate(items)}))
+    measure("ItemStore with ItemRecord (after)", total,
+            lambda items: ItemStore({"app": {"env": items}}, copy_on_write=True))
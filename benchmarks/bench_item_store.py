@@ -0,0 +1,60 @@
+# bench_item_store.py
+# Measures PUT/DELETE latency of ItemStore as an environment grows.
+#
+# Usage: python benchmarks/bench_item_store.py [max_items]
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from item_store import ItemStore
+
+SIZES = [100, 1_000, 10_000, 100_000, 1_000_000]
+OPS = 2_000
+
+
+def legacy_find(items, item_id):
+    """The linear scan the handlers used before ItemStore."""
+    for i, item in enumerate(items):
+        if item['id'] == item_id:
+            return i
+    return None
+
+
+def bench(size):
+    items = [{"id": i, "name": f"item {i}", "description": "benchmark item"} for i in range(size)]
+    store = ItemStore({"app": {"env": items}})
+    ids = random.sample(range(size), min(OPS, size))
+
+    start = time.perf_counter()
+    for item_id in ids:
+        store.update_item("app", "env", item_id, {"description": "updated"})
+    put_us = (time.perf_counter() - start) / len(ids) * 1e6
+
+    start = time.perf_counter()
+    for item_id in ids:
+        store.delete_item("app", "env", item_id)
+    delete_us = (time.perf_counter() - start) / len(ids) * 1e6
+
+    legacy_us = None
+    if size <= 100_000:
+        probes = ids[:200]
+        start = time.perf_counter()
+        for item_id in probes:
+            legacy_find(items, item_id)
+        legacy_us = (time.perf_counter() - start) / len(probes) * 1e6
+    return put_us, delete_us, legacy_us
+
+
+if __name__ == '__main__':
+    max_items = int(sys.argv[1]) if len(sys.argv) > 1 else SIZES[-1]
+    print(f"{'items':>10} {'PUT us/op':>10} {'DELETE us/op':>13} {'legacy scan us/op':>18}")
+    for size in SIZES:
+        if size > max_items:
+            break
+        put_us, delete_us, legacy_us = bench(size)
+        legacy = f"{legacy_us:18.2f}" if legacy_us is not None else f"{'-':>18}"
+        print(f"{size:>10} {put_us:10.2f} {delete_us:13.2f} {legacy}")
@@ -0,0 +1,79 @@
+# bench_json_provider.py
+# Times building a JSON response (app.json.response, i.e. jsonify) for item
+# lists of growing size with each JSON_PROVIDER, and a constant error body
+# encoded per request against one pre-encoded at startup.
+#
+# Usage: python benchmarks/bench_json_provider.py [min_seconds_per_case]
+
+import gc
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, Response
+
+from json_provider import configure_json_provider, orjson
+
+SIZES = [1, 10, 100, 1_000, 10_000]
+ERROR_BODY = {"error": "appid and appenv query parameters are required"}
+
+
+def make_app(provider):
+    app = Flask(__name__)
+    app.config['JSON_PROVIDER'] = provider
+    configure_json_provider(app)
+    return app
+
+
+def payload(size):
+    return {
+        "appid": "ap123",
+        "appenv": "production",
+        "items": [{"id": i, "name": f"item {i}", "description": f"description of item number {i}"}
+                  for i in range(size)],
+    }
+
+
+def per_call_us(fn, min_seconds):
+    """Mean microseconds per call over at least min_seconds."""
+    gc.collect()
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return elapsed / calls * 1e6
+
+
+if __name__ == '__main__':
+    min_seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 0.5
+    providers = ['stdlib'] + (['orjson'] if orjson is not None else [])
+    if orjson is None:
+        print("orjson is not installed; timing the stdlib provider only")
+    apps = {name: make_app(name) for name in providers}
+
+    print(f"{'items':>7} {'bytes':>9} " + ' '.join(f"{name + ' us':>12}" for name in providers) +
+          (f" {'speedup':>8}" if len(providers) > 1 else ''))
+    for size in SIZES:
+        body = payload(size)
+        times = []
+        for name in providers:
+            app = apps[name]
+            times.append(per_call_us(lambda: app.json.response(body), min_seconds))
+        length = len(apps['stdlib'].json.response(body).get_data())
+        print(f"{size:>7} {length:>9} " + ' '.join(f"{t:>12.1f}" for t in times) +
+              (f" {times[0] / times[1]:>7.1f}x" if len(times) > 1 else ''))
+
+    print()
+    print(f"{'error body':<22} " + ' '.join(f"{name + ' us':>12}" for name in providers))
+    encoded = ' '.join(f"{per_call_us(lambda: apps[name].json.response(ERROR_BODY), min_seconds):>12.2f}"
+                       for name in providers)
+    print(f"{'encoded per request':<22} {encoded}")
+    cached = {name: apps[name].json.response(ERROR_BODY).get_data() for name in providers}
+    reused = ' '.join(f"{per_call_us(lambda: Response(cached[name], status=400, mimetype='application/json'), min_seconds):>12.2f}"
+                      for name in providers)
+    print(f"{'pre-encoded':<22} {reused}")
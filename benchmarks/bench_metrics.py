@@ -0,0 +1,118 @@
+# bench_metrics.py
+# Measures what Metrics adds to a request. First app.full_dispatch_request
+# (request hooks, view, response) run inside one request context with and
+# without the extension, which isolates the added work apart from the
+# teardown hook (it runs when the context is popped, and finds nothing to
+# record once the after_request hook has recorded the request). Then a
+# trivial route through the test client, from 1 and 8 threads; there the
+# run-to-run noise of the test client (about +-10us here) is larger than the
+# difference. Also times rendering /metrics for a growing number of endpoints.
+#
+# Usage: python benchmarks/bench_metrics.py [min_seconds_per_case]
+
+import gc
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+from metrics import Metrics
+
+THREADS = 8
+ROUNDS = 10
+
+
+def make_app(with_metrics, endpoints=1):
+    app = Flask(__name__)
+    for n in range(endpoints):
+        app.add_url_rule(f'/ping/{n}', f'ping_{n}', lambda: 'pong')
+    metrics = Metrics()
+    if with_metrics:
+        metrics.init_app(app)
+    return app, metrics
+
+
+def per_call_us(fn, min_seconds, rounds=ROUNDS):
+    """Best of `rounds` runs of at least min_seconds each, in microseconds per call."""
+    best = None
+    for _ in range(rounds):
+        gc.collect()
+        calls = 0
+        start = time.perf_counter()
+        while True:
+            fn()
+            calls += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_seconds:
+                break
+        best = elapsed / calls * 1e6 if best is None else min(best, elapsed / calls * 1e6)
+    return best
+
+
+def dispatch_us(app, min_seconds):
+    """app.full_dispatch_request() for one request, its context pushed once."""
+    with app.test_request_context('/ping/0'):
+        return per_call_us(app.full_dispatch_request, min_seconds, rounds=1)
+
+
+def compare_us(without, with_):
+    """Best of ROUNDS of each measurement, their rounds interleaved so drift
+    hits both alike."""
+    best = [None, None]
+    for _ in range(ROUNDS):
+        for i, measure in enumerate((without, with_)):
+            us = measure()
+            best[i] = us if best[i] is None else min(best[i], us)
+    return best
+
+
+def threaded_us(app, min_seconds):
+    """Wall time per request with THREADS clients sharing the app."""
+    counts = []
+    deadline = time.perf_counter() + min_seconds
+
+    def client():
+        c = app.test_client()
+        count = 0
+        while time.perf_counter() < deadline:
+            c.get('/ping/0')
+            count += 1
+        counts.append(count)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return (time.perf_counter() - start) / sum(counts) * 1e6
+
+
+if __name__ == '__main__':
+    min_seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 0.5
+    plain, measured = make_app(False)[0], make_app(True)[0]
+    without, with_ = compare_us(lambda: dispatch_us(plain, min_seconds), lambda: dispatch_us(measured, min_seconds))
+    print(f"{'full_dispatch_request':<40} {without:>8.2f} -> {with_:.2f} us/request ({with_ - without:+.2f})")
+
+    plain = make_app(False)[0].test_client()
+    measured = make_app(True)[0].test_client()
+    without, with_ = compare_us(lambda: per_call_us(lambda: plain.get('/ping/0'), min_seconds, rounds=1),
+                                lambda: per_call_us(lambda: measured.get('/ping/0'), min_seconds, rounds=1))
+    print(f"{'test client, 1 thread':<40} {without:>8.1f} -> {with_:.1f} us/request ({with_ - without:+.1f})")
+    plain, measured = make_app(False)[0], make_app(True)[0]
+    without, with_ = compare_us(lambda: threaded_us(plain, min_seconds), lambda: threaded_us(measured, min_seconds))
+    print(f"{f'test client, {THREADS} threads':<40} {without:>8.1f} -> {with_:.1f} us/request ({with_ - without:+.1f})")
+
+    print()
+    for endpoints in (10, 100):
+        app, metrics = make_app(True, endpoints)
+        client = app.test_client()
+        for n in range(endpoints):
+            client.get(f'/ping/{n}')
+        render_us = per_call_us(metrics.render, min_seconds)
+        print(f"{f'render /metrics, {endpoints} endpoints':<40} {render_us / 1000:>8.2f} ms "
+              f"({len(metrics.render()):,} bytes)")
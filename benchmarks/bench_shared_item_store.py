@@ -0,0 +1,77 @@
+# bench_shared_item_store.py
+# GET throughput (list_page + JSON encoding, as get_items does) from several
+# worker processes sharing one SharedItemStore, against a single process
+# serving a private ItemStore. One extra process keeps writing throughout.
+#
+# Usage: python benchmarks/bench_shared_item_store.py [seconds]
+
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from item_store import ItemStore
+from shared_item_store import SharedItemStore
+
+ENV_SIZE = 10_000
+PAGE = 100
+WORKER_COUNTS = [1, 2, 4, 8]
+
+
+def seed(store):
+    store.add_items("app", "env", [{"id": i, "name": f"item {i}", "description": "benchmark"} for i in range(ENV_SIZE)])
+
+
+def serve(store, seconds):
+    """Runs GET-like reads for ``seconds``; returns the number completed."""
+    count = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        items, _ = store.list_page("app", "env", PAGE, count % (ENV_SIZE - PAGE))
+        json.dumps({"appid": "app", "appenv": "env", "items": [item.to_dict() for item in items]})
+        count += 1
+    return count
+
+
+def shared_reader(path, seconds, results):
+    results.put(serve(SharedItemStore(path), seconds))
+
+
+def shared_writer(path, stop):
+    store = SharedItemStore(path)
+    i = 0
+    while not stop.is_set():
+        store.update_item("app", "env", i % ENV_SIZE, {"description": f"write {i}"})
+        i += 1
+        time.sleep(0.001)
+
+
+if __name__ == '__main__':
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+
+    baseline = ItemStore(copy_on_write=True)
+    seed(baseline)
+    print(f"single process, private store: {serve(baseline, seconds) / seconds:10.0f} GET/s")
+
+    with tempfile.TemporaryDirectory(dir='/dev/shm' if os.path.isdir('/dev/shm') else None) as tmp:
+        path = os.path.join(tmp, 'items.store')
+        seed(SharedItemStore(path))
+        for workers in WORKER_COUNTS:
+            stop = multiprocessing.Event()
+            results = multiprocessing.Queue()
+            writer = multiprocessing.Process(target=shared_writer, args=(path, stop))
+            readers = [multiprocessing.Process(target=shared_reader, args=(path, seconds, results))
+                       for _ in range(workers)]
+            writer.start()
+            for p in readers:
+                p.start()
+            total = sum(results.get() for _ in readers)
+            for p in readers:
+                p.join()
+            stop.set()
+            writer.join()
+            print(f"{workers} worker(s), shared store:     {total / seconds:10.0f} GET/s (writes in flight)")
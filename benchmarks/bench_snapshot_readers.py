@@ -0,0 +1,95 @@
+# bench_snapshot_readers.py
+# Read throughput of ItemStore.list_items with concurrent writers in flight,
+# comparing copy-on-write snapshots against readers behind a coarse lock and
+# against plain unlocked reads (which can observe half-applied batches).
+# Then the cost of a single-item write followed by a read, which includes
+# publishing the snapshot, for growing environments.
+#
+# Usage: python benchmarks/bench_snapshot_readers.py [seconds_per_run]
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from item_store import ItemStore
+
+ENV_SIZE = 10_000
+BATCH = 50
+THREAD_COUNTS = [1, 2, 4, 8]
+
+
+class LockedReadStore(ItemStore):
+    """Baseline: every read serializes behind the writer lock."""
+
+    def list_items(self, appid, appenv):
+        with self._write_lock:
+            return super().list_items(appid, appenv)
+
+
+def run(store_cls, readers, seconds, copy_on_write):
+    store = store_cls(
+        {"app": {"env": [{"id": i, "name": f"item {i}"} for i in range(ENV_SIZE)]}},
+        copy_on_write=copy_on_write,
+    )
+    stop = threading.Event()
+    reads = [0] * readers
+    torn = [0]
+
+    def writer():
+        next_id = ENV_SIZE
+        while not stop.is_set():
+            batch = [{"id": next_id + i, "name": "new"} for i in range(BATCH)]
+            store.add_items("app", "env", batch)
+            for item in batch:
+                store.update_item("app", "env", item["id"] % ENV_SIZE, {"name": "updated"})
+            next_id += BATCH
+            time.sleep(0.0005)  # Keep writes in flight without starving readers
+
+    def reader(slot):
+        count = 0
+        while not stop.is_set():
+            items = store.list_items("app", "env")
+            # Batches are only ever added whole, never part of one
+            if (len(items) - ENV_SIZE) % BATCH:
+                torn[0] += 1
+            count += 1
+        reads[slot] = count
+
+    threads = [threading.Thread(target=writer)]
+    threads += [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    return sum(reads) / seconds, torn[0]
+
+
+def write_then_read_us(size, writes=2000):
+    store = ItemStore({"app": {"env": [{"id": i, "name": f"item {i}"} for i in range(size)]}},
+                      copy_on_write=True)
+    start = time.perf_counter()
+    for i in range(writes):
+        store.update_item("app", "env", i * 7919 % size, {"name": "updated"})
+        store.list_page("app", "env", 100)
+    return (time.perf_counter() - start) / writes * 1e6
+
+
+if __name__ == '__main__':
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+    print(f"{'readers':>7} {'cow reads/s':>12} {'locked reads/s':>15} "
+          f"{'unlocked reads/s':>17} {'unlocked torn':>14}")
+    for readers in THREAD_COUNTS:
+        cow_rate, cow_torn = run(ItemStore, readers, seconds, copy_on_write=True)
+        assert cow_torn == 0, "copy-on-write reader saw a half-applied batch"
+        locked_rate, _ = run(LockedReadStore, readers, seconds, copy_on_write=False)
+        plain_rate, plain_torn = run(ItemStore, readers, seconds, copy_on_write=False)
+        print(f"{readers:>7} {cow_rate:12.0f} {locked_rate:15.0f} {plain_rate:17.0f} {plain_torn:14}")
+
+    print()
+    for size in (10_000, 100_000, 1_000_000):
+        print(f"update + first page read, {size:>9,} items: {write_then_read_us(size):8.1f} us")
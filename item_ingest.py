@@ -0,0 +1,153 @@
+# item_ingest.py
+import codecs
+import json
+import re
+
+from item_record import ItemRecord
+
+CHUNK_SIZE = 64 * 1024
+MAX_VALUE_BYTES = 1024 * 1024  # Largest single item (or other top-level value) accepted
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+# The end of an array element: optional whitespace, then ',' or ']'
+ELEMENT_END = re.compile(r'[ \t\n\r]*([,\]])[ \t\n\r]*')
+
+
+class IngestError(ValueError):
+    """The request body is not a valid items batch; the message is safe to return."""
+
+
+class _StreamParser:
+    """Pulls JSON values one at a time out of a byte stream.
+
+    Only the unconsumed tail of the body is buffered, so memory is bounded by
+    the largest single value rather than the size of the whole body.
+    """
+
+    def __init__(self, stream, chunk_size=CHUNK_SIZE, max_value_bytes=MAX_VALUE_BYTES):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._max_value_bytes = max_value_bytes
+        # The decoder's C scanner: raw_decode adds a Python call per value
+        self._scan = json.JSONDecoder().scan_once
+        self._text = codecs.getincrementaldecoder('utf-8')()
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        """Reads another chunk; returns False once the stream is exhausted."""
+        if self._eof:
+            return False
+        chunk = self._stream.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            self._buf = self._buf[self._pos:] + self._text.decode(b'', final=True)
+        else:
+            self._buf = self._buf[self._pos:] + self._text.decode(chunk)
+        self._pos = 0
+        return True
+
+    def peek(self):
+        """Returns the next non-whitespace character without consuming it ('' at EOF)."""
+        while True:
+            self._pos = WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise IngestError("Request body must be valid JSON")
+        self._pos += 1
+
+    def value(self):
+        """Decodes the next complete JSON value."""
+        if self._pos >= len(self._buf) or self._buf[self._pos] in ' \t\n\r':
+            self.peek()
+        while True:
+            try:
+                value, end = self._scan(self._buf, self._pos)
+            except (StopIteration, json.JSONDecodeError):
+                end = None
+            # A value that runs to the end of the buffer (e.g. a number) may be
+            # cut short, so only trust it once more data or EOF has been seen
+            if end is not None and (end < len(self._buf) or self._eof):
+                self._pos = end
+                return value
+            if len(self._buf) - self._pos > self._max_value_bytes:
+                raise IngestError("Item exceeds the maximum allowed size")
+            if not self._fill():
+                raise IngestError("Request body must be valid JSON")
+
+    def element_end(self):
+        """Consumes what follows an array element; returns ',' or ']'."""
+        match = ELEMENT_END.match(self._buf, self._pos)
+        if match is not None:
+            self._pos = match.end()
+            return match.group(1)
+        char = self.peek()  # the separator is in the next chunk
+        if char not in (',', ']'):
+            raise IngestError("Request body must be valid JSON")
+        self._pos += 1
+        return char
+
+
+def read_items_batch(stream, **parser_options):
+    """Parses and validates a ``{"appid", "appenv", "items": [...]}`` body.
+
+    Each element of ``items`` is validated and turned into an ItemRecord as
+    soon as it is decoded, so an invalid batch is rejected without anything
+    being stored and no decoded dict outlives its item. Returns (appid,
+    appenv, records), ready for ItemStore.add_items.
+    """
+    parser = _StreamParser(stream, **parser_options)
+    fields = {}
+    items = None
+
+    parser.expect('{')
+    if parser.peek() == '}':
+        parser.expect('}')
+    else:
+        while True:
+            key = parser.value()
+            if not isinstance(key, str):
+                raise IngestError("Request body must be valid JSON")
+            parser.expect(':')
+            if key == 'items' and parser.peek() == '[':
+                items = _read_items_array(parser)
+            else:
+                fields[key] = parser.value()
+            if parser.peek() == ',':
+                parser.expect(',')
+                continue
+            parser.expect('}')
+            break
+    if parser.peek() != '':
+        raise IngestError("Request body must be valid JSON")
+
+    if 'appid' not in fields or 'appenv' not in fields or (items is None and 'items' not in fields):
+        raise IngestError("Invalid request. Required fields: appid, appenv, items")
+    if not items:
+        raise IngestError("Items must be a non-empty array")
+    return fields['appid'], fields['appenv'], items
+
+
+def _read_items_array(parser):
+    records = []
+    parser.expect('[')
+    if parser.peek() == ']':
+        parser.expect(']')
+        return records
+    while True:
+        item = parser.value()
+        if not isinstance(item, dict) or 'id' not in item or 'name' not in item:
+            raise IngestError("Each item must have an id and name")
+        # bool is an int subclass, so check the exact type: the item routes
+        # only ever look items up by an integer id
+        if type(item['id']) is not int or not isinstance(item['name'], str):
+            raise IngestError("Each item id must be an integer and each name a string")
+        records.append(ItemRecord.from_dict(item))
+        if parser.element_end() == ']':
+            return records
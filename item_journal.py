@@ -0,0 +1,338 @@
+# item_journal.py
+import atexit
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+
+from item_record import ItemRecord
+
+logger = logging.getLogger(__name__)
+
+# --- On-disk format ---
+# Log segments:  log-<first seq>.bin, a sequence of records
+#   record  = header + payload
+#   header  = seq (u64), payload length (u32), crc32 of payload (u32)
+#   payload = op code (1 byte) + JSON [appid, appenv, data], where data is
+#             items (A), [id, changes] (U), id (D), [[id, changes], ...] (u)
+#             or [id, ...] (d)
+# Snapshots:     snapshot-<last seq>.bin
+#   SNAPSHOT_MAGIC + last seq (u64), then blocks of length (u32) + JSON
+#   [appid, appenv, [items...]], each block holding at most SNAPSHOT_CHUNK items
+RECORD_HEADER = struct.Struct('<QII')
+BLOCK_HEADER = struct.Struct('<I')
+SNAPSHOT_MAGIC = b'ITEMSNP1'
+SNAPSHOT_SEQ = struct.Struct('<Q')
+SNAPSHOT_CHUNK = 10_000
+
+OP_ADD = b'A'
+OP_UPDATE = b'U'
+OP_DELETE = b'D'
+OP_UPDATE_MANY = b'u'
+OP_DELETE_MANY = b'd'
+
+
+def _encode(obj):
+    return json.dumps(obj, separators=(',', ':'), default=_encode_record).encode('utf-8')
+
+
+def _encode_record(obj):
+    # Added items can arrive as ItemRecords (see item_ingest)
+    if isinstance(obj, ItemRecord):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def encode_record(seq, op, body):
+    """Returns header + payload bytes for one mutation."""
+    payload = op + _encode(body)
+    return RECORD_HEADER.pack(seq, len(payload), zlib.crc32(payload)) + payload
+
+
+def update_op(appid, appenv, updates):
+    """Returns the (op, body) recording (item_id, changes) pairs.
+
+    A lone update keeps the single-item format, so logs written by plain
+    PUTs stay readable by older code.
+    """
+    if len(updates) == 1:
+        item_id, changes = updates[0]
+        return OP_UPDATE, [appid, appenv, [item_id, changes]]
+    return OP_UPDATE_MANY, [appid, appenv, [list(update) for update in updates]]
+
+
+def delete_op(appid, appenv, item_ids):
+    """Returns the (op, body) recording deleted ids; see update_op."""
+    if len(item_ids) == 1:
+        return OP_DELETE, [appid, appenv, item_ids[0]]
+    return OP_DELETE_MANY, [appid, appenv, list(item_ids)]
+
+
+def apply_payload(store, payload):
+    """Replays one record payload against ``store``."""
+    op = payload[:1]
+    appid, appenv, data = json.loads(payload[1:])
+    if op == OP_ADD:
+        store.add_items(appid, appenv, data)
+    elif op == OP_UPDATE:
+        item_id, changes = data
+        store.update_item(appid, appenv, item_id, changes)
+    elif op == OP_DELETE:
+        store.delete_item(appid, appenv, data)
+    elif op == OP_UPDATE_MANY:
+        store.update_items(appid, appenv, data)
+    elif op == OP_DELETE_MANY:
+        store.delete_items(appid, appenv, data)
+    else:
+        raise ValueError(f"Unknown item journal op {op!r}")
+
+
+class ItemJournal:
+    """Append-only log plus periodic snapshots for an ItemStore.
+
+    Every mutation is appended to the current log segment while the store's
+    writer lock is held, so the log order matches the order writes were
+    applied. A flusher thread fsyncs pending records in groups: each writer
+    waits for the next fsync instead of paying for its own. A compactor
+    thread periodically writes a snapshot and drops the log segments it
+    covers, so startup only loads the snapshot and replays the log tail.
+    """
+
+    def __init__(self, data_dir, sync_commits=True, fsync_interval=0.002,
+                 snapshot_interval=60.0, snapshot_min_records=10_000):
+        self.data_dir = data_dir
+        self.sync_commits = sync_commits
+        self.fsync_interval = fsync_interval
+        self.snapshot_interval = snapshot_interval
+        self.snapshot_min_records = snapshot_min_records
+
+        self._store = None
+        self._file = None
+        self._lock = threading.Lock()  # guards the segment file and counters
+        self._cond = threading.Condition(self._lock)
+        self._sync_lock = threading.Lock()  # held across an fsync or a rotation
+        self._written_seq = 0
+        self._durable_seq = 0
+        self._snapshot_seq = 0
+        self._closed = False
+        self._stop = threading.Event()
+        self._threads = []
+
+    # --- Lifecycle ---
+    def open(self, store):
+        """Recovers ``store`` from disk, then journals its writes from now on.
+
+        Returns True if any state was recovered.
+        """
+        os.makedirs(self.data_dir, exist_ok=True)
+        started = time.perf_counter()
+        recovered = self._recover(store)
+        logger.info("Recovered item store from %s up to seq %d in %.2fs",
+                    self.data_dir, self._written_seq, time.perf_counter() - started)
+
+        self._durable_seq = self._written_seq
+        self._open_segment(self._written_seq + 1)
+        self._store = store
+        store.attach_journal(self)
+
+        for target in (self._flush_loop, self._compact_loop):
+            thread = threading.Thread(target=target, name=f"item-journal-{target.__name__}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        atexit.register(self.close)
+        return recovered
+
+    def close(self):
+        if self._closed:
+            return
+        self._stop.set()
+        self._sync()
+        with self._lock:
+            self._closed = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._file.close()
+
+    # --- Writes (called by ItemStore under its writer lock) ---
+    def record_add(self, appid, appenv, items):
+        return self._append(OP_ADD, [appid, appenv, items])
+
+    def record_update(self, appid, appenv, updates):
+        return self._append(*update_op(appid, appenv, updates))
+
+    def record_delete(self, appid, appenv, item_ids):
+        return self._append(*delete_op(appid, appenv, item_ids))
+
+    def wait_durable(self, seq):
+        """Blocks until the record with ``seq`` has been fsynced."""
+        if not self.sync_commits:
+            return
+        with self._lock:
+            while self._durable_seq < seq and not self._closed:
+                self._cond.wait()
+
+    def _append(self, op, body):
+        with self._lock:
+            self._written_seq += 1
+            seq = self._written_seq
+            self._file.write(encode_record(seq, op, body))
+            self._cond.notify_all()
+        return seq
+
+    # --- Group fsync ---
+    def _flush_loop(self):
+        while not self._stop.is_set():
+            with self._lock:
+                while self._durable_seq == self._written_seq and not self._stop.is_set():
+                    self._cond.wait(timeout=0.5)
+            # Give concurrent writers a moment to join this fsync group
+            time.sleep(self.fsync_interval)
+            self._sync()
+
+    def _sync(self):
+        with self._sync_lock:
+            with self._lock:
+                if self._durable_seq == self._written_seq:
+                    return
+                self._file.flush()
+                target = self._written_seq
+                fd = self._file.fileno()
+            os.fsync(fd)
+            with self._lock:
+                self._durable_seq = max(self._durable_seq, target)
+                self._cond.notify_all()
+
+    # --- Snapshots ---
+    def _compact_loop(self):
+        while not self._stop.wait(self.snapshot_interval):
+            if self._written_seq - self._snapshot_seq >= self.snapshot_min_records:
+                try:
+                    self.snapshot()
+                except Exception:
+                    logger.exception("Item store snapshot failed")
+
+    def snapshot(self):
+        """Writes a snapshot of the store and removes the log it supersedes."""
+        boundary = []
+
+        def rotate():
+            # Runs with store writers held off: seal the current segment so
+            # the snapshot contains exactly the records up to the boundary.
+            with self._sync_lock:
+                with self._lock:
+                    self._file.flush()
+                    os.fsync(self._file.fileno())
+                    self._file.close()
+                    self._durable_seq = self._written_seq
+                    boundary.append(self._written_seq)
+                    self._open_segment(self._written_seq + 1)
+                    self._cond.notify_all()
+
+        state = self._store.dump(on_locked=rotate)
+        seq = boundary[0]
+        final_path = os.path.join(self.data_dir, f'snapshot-{seq:020d}.bin')
+        tmp_path = final_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(SNAPSHOT_MAGIC + SNAPSHOT_SEQ.pack(seq))
+            for appid, appenv, items in state:
+                for start in range(0, max(len(items), 1), SNAPSHOT_CHUNK):
+                    chunk = [item.to_dict() for item in items[start:start + SNAPSHOT_CHUNK]]
+                    block = _encode([appid, appenv, chunk])
+                    f.write(BLOCK_HEADER.pack(len(block)))
+                    f.write(block)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, final_path)
+        self._fsync_dir()
+        self._snapshot_seq = seq
+
+        # Everything at or below seq now lives in the snapshot
+        for name in os.listdir(self.data_dir):
+            kind, file_seq = self._parse_name(name)
+            if (kind == 'snapshot' and file_seq < seq) or (kind == 'log' and file_seq <= seq):
+                os.remove(os.path.join(self.data_dir, name))
+        logger.info("Wrote item store snapshot at seq %d", seq)
+
+    # --- Recovery ---
+    def _recover(self, store):
+        snapshots, segments = [], []
+        for name in os.listdir(self.data_dir):
+            kind, seq = self._parse_name(name)
+            if kind == 'snapshot':
+                snapshots.append(seq)
+            elif kind == 'log':
+                segments.append(seq)
+
+        recovered = False
+        if snapshots:
+            self._snapshot_seq = self._written_seq = self._load_snapshot(store, max(snapshots))
+            recovered = True
+        for first_seq in sorted(segments):
+            path = os.path.join(self.data_dir, f'log-{first_seq:020d}.bin')
+            recovered = self._replay_segment(store, path) or recovered
+        return recovered
+
+    def _load_snapshot(self, store, seq):
+        path = os.path.join(self.data_dir, f'snapshot-{seq:020d}.bin')
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            header_size = len(SNAPSHOT_MAGIC) + SNAPSHOT_SEQ.size
+            if data[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+                raise ValueError(f"{path} is not an item store snapshot")
+            offset = header_size
+            while offset < len(data):
+                (length,) = BLOCK_HEADER.unpack_from(data, offset)
+                offset += BLOCK_HEADER.size
+                appid, appenv, items = json.loads(data[offset:offset + length])
+                store.add_items(appid, appenv, items)
+                offset += length
+        return seq
+
+    def _replay_segment(self, store, path):
+        size = os.path.getsize(path)
+        if size == 0:
+            return False
+        replayed = False
+        with open(path, 'r+b') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            offset = 0
+            while offset + RECORD_HEADER.size <= size:
+                seq, length, crc = RECORD_HEADER.unpack_from(data, offset)
+                start = offset + RECORD_HEADER.size
+                payload = data[start:start + length]
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    break
+                if seq > self._written_seq:
+                    apply_payload(store, payload)
+                    self._written_seq = seq
+                    replayed = True
+                offset = start + length
+        if offset < size:
+            # A torn write from a crash; everything after it was never acknowledged
+            logger.warning("Truncating %d bytes of incomplete log at the end of %s", size - offset, path)
+            os.truncate(path, offset)
+        return replayed
+
+    # --- Helpers ---
+    def _open_segment(self, first_seq):
+        path = os.path.join(self.data_dir, f'log-{first_seq:020d}.bin')
+        self._file = open(path, 'ab')
+        self._fsync_dir()
+
+    def _fsync_dir(self):
+        fd = os.open(self.data_dir, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _parse_name(name):
+        for kind in ('snapshot', 'log'):
+            prefix = kind + '-'
+            if name.startswith(prefix) and name.endswith('.bin'):
+                return kind, int(name[len(prefix):-len('.bin')])
+        return None, None
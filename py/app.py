@@ -1,12 +1,14 @@
 # app.py
 
 import os
-from flask import Flask, request, jsonify, abort # Keep abort
+from flask import Flask, request, jsonify, abort, stream_with_context # Keep abort
 from flask_sqlalchemy import SQLAlchemy
 from marshmallow import Schema, fields, ValidationError, validate
+from sqlalchemy.exc import IntegrityError
 
 # --- Import error handling registration ---
-from errors import register_error_handlers
+from error import register_error_handlers
+from json_provider import configure_json_provider
 
 # --- Configuration ---
 basedir = os.path.abspath(os.path.dirname(__file__))
@@ -62,17 +64,38 @@ class ItemUpdateSchema(Schema):
     )
 
 item_create_schema = ItemCreateSchema()
+item_create_many_schema = ItemCreateSchema(many=True)
 item_update_schema = ItemUpdateSchema()
 
+# --- Bulk Insert Limits ---
+MAX_BATCH_ITEMS = 100_000 # Most items accepted by one POST /items/batch request
+# SQLite accepts at most 32766 bound parameters per statement, so name
+# lookups for very large batches are split into IN queries of this size
+NAME_LOOKUP_CHUNK = 10_000
+
+# --- Listing Limits ---
+DEFAULT_PAGE_LIMIT = 100 # GET /items?after_id= page size when no limit is given
+MAX_PAGE_LIMIT = 1000
+STREAM_CHUNK = 1000 # Rows fetched per round trip when GET /items streams the whole table
+# Columns of Item.to_dict(); listings select them directly instead of
+# building an ORM object per row
+ITEM_COLUMNS = (Item.id, Item.name, Item.description)
+
+
+# --- JSON Provider ---
+# orjson when installed; JSON_PROVIDER=stdlib|orjson overrides. Configured before
+# the error handlers, which pre-encode their static bodies with it
+app.config['JSON_PROVIDER'] = os.environ.get('JSON_PROVIDER') or 'auto'
+configure_json_provider(app)
 
 # --- Register Error Handlers ---
-# Call the function from errors.py to register handlers for the app
+# Call the function from error.py to register handlers for the app
 register_error_handlers(app)
 
 
 # --- API Routes (CRUD) ---
 # Routes remain the same as before, using abort() which will now
-# trigger the handlers registered from errors.py
+# trigger the handlers registered from error.py
 
 # Create a new item
 @app.route('/items', methods=['POST'])
@@ -107,16 +130,136 @@ def create_item():
 
     return jsonify(new_item.to_dict()), 201
 
-# Get all items
+# Create many items in one transaction
+@app.route('/items/batch', methods=['POST'])
+def create_items_batch():
+    json_data = request.get_json()
+    if not isinstance(json_data, list) or not json_data:
+        abort(400, description="Request body must be a non-empty JSON array of items.") # Triggers handle_bad_request
+    if len(json_data) > MAX_BATCH_ITEMS:
+        abort(400, description=f"A batch can hold at most {MAX_BATCH_ITEMS} items.")
+
+    # Validate the whole list in one pass; invalid entries are reported by index
+    try:
+        rows = item_create_many_schema.load(json_data)
+        errors = {}
+    except ValidationError as err:
+        rows, errors = err.valid_data, err.messages
+
+    # First valid entry per name wins; later ones in the same batch are rejected
+    pending = {} # name -> index in the request
+    for index, row in enumerate(rows):
+        if index in errors:
+            continue
+        if row['name'] in pending:
+            errors[index] = {'name': [f"Duplicate name '{row['name']}' within the batch."]}
+        else:
+            pending[row['name']] = index
+
+    for name in existing_item_names(pending):
+        errors[pending.pop(name)] = {'name': [f"Item with name '{name}' already exists."]}
+
+    created = {}
+    if pending:
+        # One executemany in one transaction; RETURNING hands back the new ids
+        # in parameter order, so they line up with the pending entries
+        try:
+            result = db.session.execute(
+                db.insert(Item).returning(Item.id, Item.name, Item.description, sort_by_parameter_order=True),
+                [{'name': name, 'description': rows[index].get('description')} for name, index in pending.items()],
+            )
+            created = {index: row._asdict() for index, row in zip(pending.values(), result)}
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            # A concurrent request took one of the names after our check
+            abort(400, description="Another request created items with some of these names; nothing was created, retry the batch.")
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error(f"Database error on batch create: {e}", exc_info=True)
+            abort(500, description="Database error occurred during batch creation.") # Triggers handle_internal_server_error
+
+    results = [
+        {'index': index, 'status': 201, 'item': created[index]} if index in created
+        else {'index': index, 'status': 400, 'errors': errors[index]}
+        for index in range(len(json_data))
+    ]
+    # 207 Multi-Status tells the client to look at the per-item results
+    return jsonify({'created': len(created), 'failed': len(errors), 'results': results}), 201 if not errors else 207
+
+def existing_item_names(names):
+    """Returns which of ``names`` are already taken, using as few IN queries as possible."""
+    names = list(names)
+    existing = set()
+    for start in range(0, len(names), NAME_LOOKUP_CHUNK):
+        chunk = names[start:start + NAME_LOOKUP_CHUNK]
+        existing.update(db.session.execute(db.select(Item.name).where(Item.name.in_(chunk))).scalars())
+    return existing
+
+# Get items, one page at a time or streamed
 @app.route('/items', methods=['GET'])
 def get_items():
+    # ?limit=N&after_id=<last id of the previous page> returns one page in id
+    # order, read straight off the primary key index. Without either
+    # parameter the whole table is streamed rather than loaded at once.
+    limit = request.args.get('limit')
+    after_id = request.args.get('after_id')
+    if limit is None and after_id is None:
+        return stream_all_items()
+
+    try:
+        limit = int(limit) if limit is not None else DEFAULT_PAGE_LIMIT
+        after_id = int(after_id) if after_id is not None else 0
+    except ValueError:
+        abort(400, description="limit and after_id must be integers.") # Triggers handle_bad_request
+    if not 1 <= limit <= MAX_PAGE_LIMIT:
+        abort(400, description=f"limit must be between 1 and {MAX_PAGE_LIMIT}.")
+
+    try:
+        # One extra row tells whether another page follows
+        rows = db.session.execute(
+            db.select(*ITEM_COLUMNS).where(Item.id > after_id).order_by(Item.id).limit(limit + 1)
+        ).all()
+    except Exception as e:
+        app.logger.error(f"Database error on get page: {e}", exc_info=True)
+        abort(500, description="Database error occurred while fetching items.")
+
+    page = rows[:limit]
+    response = jsonify([row._asdict() for row in page])
+    if len(rows) > limit:
+        # Pass back as after_id to get the next page
+        response.headers['X-Next-After-Id'] = str(page[-1].id)
+    return response, 200
+
+def stream_all_items():
+    """Streams every item as a JSON array, fetching STREAM_CHUNK rows at a time."""
     try:
-        all_items = Item.query.all()
-        return jsonify([item.to_dict() for item in all_items]), 200
+        result = db.session.execute(
+            db.select(*ITEM_COLUMNS).order_by(Item.id).execution_options(yield_per=STREAM_CHUNK)
+        )
     except Exception as e:
-         app.logger.error(f"Database error on get all: {e}", exc_info=True)
-         # Abort triggers the handle_internal_server_error
-         abort(500, description="Database error occurred while fetching items.")
+        app.logger.error(f"Database error on get all: {e}", exc_info=True)
+        abort(500, description="Database error occurred while fetching items.")
+
+    def generate():
+        count = 0
+        yield '['
+        try:
+            for rows in result.partitions():
+                # Encode each chunk as one compact array and splice off its brackets
+                body = app.json.dumps([row._asdict() for row in rows], separators=(',', ':'))[1:-1]
+                yield body if count == 0 else ',' + body
+                count += len(rows)
+        except Exception as e:
+            # The status line is already sent; leaving the array unterminated
+            # makes the failure visible to the client as invalid JSON
+            app.logger.error(f"Database error while streaming items after {count} rows: {e}", exc_info=True)
+            return
+        yield ']'
+
+    # stream_with_context keeps the app context, and with it the session and
+    # its open cursor, alive until the last chunk has been sent
+    return app.response_class(stream_with_context(generate()), mimetype='application/json')
 
 
 # Get a specific item by ID
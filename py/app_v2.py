@@ -3,12 +3,15 @@
 import os
 import logging # Import logging
 from logging.handlers import RotatingFileHandler # Import RotatingFileHandler
-from flask import Flask, request, jsonify, abort, current_app # Import current_app
+from flask import Flask, request, jsonify, abort, current_app, stream_with_context # Import current_app
 from flask_sqlalchemy import SQLAlchemy
 from marshmallow import Schema, fields, ValidationError, validate
+from sqlalchemy.exc import IntegrityError
 
 # --- Import error handling registration ---
-from errors import register_error_handlers
+from error_v2 import register_error_handlers
+from json_provider import configure_json_provider
+from request_log import install_request_log, make_log_formatter
 
 # --- Configuration ---
 basedir = os.path.abspath(os.path.dirname(__file__))
@@ -19,13 +22,24 @@ LOG_FILE = os.path.join(basedir, 'app.log') # Define log file path
 app = Flask(__name__)
 app.config['SQLALCHEMY_DATABASE_URI'] = DB_URI
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# 'text' or 'json' (one JSON object per line); LOG_SOURCE=false drops the
+# [in file:line] location from each line
+app.config['LOG_FORMAT'] = os.environ.get('LOG_FORMAT') or 'text'
+app.config['LOG_SOURCE'] = os.environ.get('LOG_SOURCE', 'true').lower() == 'true'
+# Share of request lines written below status 400 (e.g. 0.01) and from 400
+# up. Client-error warnings (400/404) are limited per kind to a burst of
+# LOG_RATE_BURST, then LOG_RATE_LIMIT per second (0: no limit). What both
+# leave out is counted in a summary line at most every LOG_SUMMARY_INTERVAL seconds
+app.config['REQUEST_LOG_SAMPLE'] = float(os.environ.get('REQUEST_LOG_SAMPLE', 1.0))
+app.config['REQUEST_LOG_ERROR_SAMPLE'] = float(os.environ.get('REQUEST_LOG_ERROR_SAMPLE', 1.0))
+app.config['LOG_RATE_LIMIT'] = float(os.environ.get('LOG_RATE_LIMIT', 0))
+app.config['LOG_RATE_BURST'] = int(os.environ.get('LOG_RATE_BURST', 20))
+app.config['LOG_SUMMARY_INTERVAL'] = float(os.environ.get('LOG_SUMMARY_INTERVAL', 60))
 
 # --- Logging Configuration Function ---
 def configure_logging(app_instance):
-    # Define log format
-    log_formatter = logging.Formatter(
-        '%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]'
-    )
+    # Define log format (LOG_FORMAT / LOG_SOURCE)
+    log_formatter = make_log_formatter(app_instance)
     log_level = logging.DEBUG if app_instance.debug else logging.INFO
     app_instance.logger.setLevel(log_level) # Set logger level
 
@@ -115,39 +129,49 @@ class ItemUpdateSchema(Schema):
     )
 
 item_create_schema = ItemCreateSchema()
+item_create_many_schema = ItemCreateSchema(many=True)
 item_update_schema = ItemUpdateSchema()
 
+# --- Bulk Insert Limits ---
+MAX_BATCH_ITEMS = 100_000 # Most items accepted by one POST /items/batch request
+# SQLite accepts at most 32766 bound parameters per statement, so name
+# lookups for very large batches are split into IN queries of this size
+NAME_LOOKUP_CHUNK = 10_000
+
+# --- Listing Limits ---
+DEFAULT_PAGE_LIMIT = 100 # GET /items?after_id= page size when no limit is given
+MAX_PAGE_LIMIT = 1000
+STREAM_CHUNK = 1000 # Rows fetched per round trip when GET /items streams the whole table
+# Columns of Item.to_dict(); listings select them directly instead of
+# building an ORM object per row
+ITEM_COLUMNS = (Item.id, Item.name, Item.description)
+
+
+# --- JSON Provider ---
+# orjson when installed; JSON_PROVIDER=stdlib|orjson overrides. Configured before
+# the error handlers, which pre-encode their static bodies with it
+app.config['JSON_PROVIDER'] = os.environ.get('JSON_PROVIDER') or 'auto'
+configure_json_provider(app)
 
 # --- Register Error Handlers ---
-register_error_handlers(app) # Function from errors.py
+register_error_handlers(app) # Function from error_v2.py
 
-# --- Request/Response Logging Hooks ---
+# --- Request Logging ---
+# One line per request: method, path, status, duration and item id
+install_request_log(app)
 
 @app.before_request
-def log_request_info():
-    # Use current_app.logger which is correctly configured
-    current_app.logger.info(
-        f"Request: {request.method} {request.path} from {request.remote_addr}"
-    )
+def log_request_body():
     # Example: Log request body for debugging (be careful with sensitive data!)
     if request.is_json and current_app.debug:
          try:
             # Limit size to avoid logging huge bodies
             body_preview = str(request.get_json())[:200]
-            current_app.logger.debug(f"Request JSON Body (Preview): {body_preview}")
+            current_app.logger.debug("Request JSON Body (Preview): %s", body_preview)
          except Exception as e:
              current_app.logger.warning(f"Could not log request body: {e}")
 
 
-@app.after_request
-def log_response_info(response):
-    # Runs after a request has been processed, before it's sent to the client
-    current_app.logger.info(
-        f"Response: {request.method} {request.path} - Status {response.status_code}"
-    )
-    return response # Must return the response object
-
-
 # --- API Routes (CRUD) ---
 # (Adding specific logging within routes)
 
@@ -161,7 +185,7 @@ def create_item():
 
     try:
         validated_data = item_create_schema.load(json_data)
-        app.logger.debug(f"Create item validation successful for name: {validated_data.get('name')}")
+        app.logger.debug("Create item validation successful for name: %s", validated_data.get('name'))
     except ValidationError as err:
         app.logger.warning(f"Create item validation failed: {err.messages}")
         abort(400, description=err.messages)
@@ -186,32 +210,162 @@ def create_item():
 
     return jsonify(new_item.to_dict()), 201
 
+@app.route('/items/batch', methods=['POST'])
+def create_items_batch():
+    app.logger.debug("Attempting to create a batch of items.")
+    json_data = request.get_json()
+    if not isinstance(json_data, list) or not json_data:
+        app.logger.warning("Create batch failed: Request body was not a non-empty JSON array.")
+        abort(400, description="Request body must be a non-empty JSON array of items.")
+    if len(json_data) > MAX_BATCH_ITEMS:
+        app.logger.warning(f"Create batch failed: {len(json_data)} items exceeds the limit of {MAX_BATCH_ITEMS}.")
+        abort(400, description=f"A batch can hold at most {MAX_BATCH_ITEMS} items.")
+
+    # Validate the whole list in one pass; invalid entries are reported by index
+    try:
+        rows = item_create_many_schema.load(json_data)
+        errors = {}
+    except ValidationError as err:
+        rows, errors = err.valid_data, err.messages
+
+    # First valid entry per name wins; later ones in the same batch are rejected
+    pending = {} # name -> index in the request
+    for index, row in enumerate(rows):
+        if index in errors:
+            continue
+        if row['name'] in pending:
+            errors[index] = {'name': [f"Duplicate name '{row['name']}' within the batch."]}
+        else:
+            pending[row['name']] = index
+
+    for name in existing_item_names(pending):
+        errors[pending.pop(name)] = {'name': [f"Item with name '{name}' already exists."]}
+
+    created = {}
+    if pending:
+        # One executemany in one transaction; RETURNING hands back the new ids
+        # in parameter order, so they line up with the pending entries
+        try:
+            result = db.session.execute(
+                db.insert(Item).returning(Item.id, Item.name, Item.description, sort_by_parameter_order=True),
+                [{'name': name, 'description': rows[index].get('description')} for name, index in pending.items()],
+            )
+            created = {index: row._asdict() for index, row in zip(pending.values(), result)}
+            db.session.commit()
+        except IntegrityError as e:
+            db.session.rollback()
+            app.logger.warning(f"Create batch failed: name conflict with a concurrent write: {e.orig}")
+            abort(400, description="Another request created items with some of these names; nothing was created, retry the batch.")
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error(f"Database error on batch create: {e}", exc_info=True)
+            abort(500, description="Database error occurred during batch creation.")
+
+    app.logger.info(f"Batch create finished: {len(created)} created, {len(errors)} rejected.")
+    results = [
+        {'index': index, 'status': 201, 'item': created[index]} if index in created
+        else {'index': index, 'status': 400, 'errors': errors[index]}
+        for index in range(len(json_data))
+    ]
+    # 207 Multi-Status tells the client to look at the per-item results
+    return jsonify({'created': len(created), 'failed': len(errors), 'results': results}), 201 if not errors else 207
+
+def existing_item_names(names):
+    """Returns which of ``names`` are already taken, using as few IN queries as possible."""
+    names = list(names)
+    existing = set()
+    for start in range(0, len(names), NAME_LOOKUP_CHUNK):
+        chunk = names[start:start + NAME_LOOKUP_CHUNK]
+        existing.update(db.session.execute(db.select(Item.name).where(Item.name.in_(chunk))).scalars())
+    return existing
+
 @app.route('/items', methods=['GET'])
 def get_items():
-    app.logger.debug("Attempting to retrieve all items.")
+    # ?limit=N&after_id=<last id of the previous page> returns one page in id
+    # order, read straight off the primary key index. Without either
+    # parameter the whole table is streamed rather than loaded at once.
+    limit = request.args.get('limit')
+    after_id = request.args.get('after_id')
+    if limit is None and after_id is None:
+        return stream_all_items()
+
     try:
-        all_items = Item.query.all()
-        app.logger.info(f"Retrieved {len(all_items)} items.")
-        return jsonify([item.to_dict() for item in all_items]), 200
+        limit = int(limit) if limit is not None else DEFAULT_PAGE_LIMIT
+        after_id = int(after_id) if after_id is not None else 0
+    except ValueError:
+        app.logger.warning(f"Get items failed: non-integer limit '{limit}' or after_id '{after_id}'.")
+        abort(400, description="limit and after_id must be integers.")
+    if not 1 <= limit <= MAX_PAGE_LIMIT:
+        app.logger.warning(f"Get items failed: limit {limit} out of range.")
+        abort(400, description=f"limit must be between 1 and {MAX_PAGE_LIMIT}.")
+
+    app.logger.debug("Attempting to retrieve %s items after ID %s.", limit, after_id)
+    try:
+        # One extra row tells whether another page follows
+        rows = db.session.execute(
+            db.select(*ITEM_COLUMNS).where(Item.id > after_id).order_by(Item.id).limit(limit + 1)
+        ).all()
+    except Exception as e:
+        app.logger.error(f"Database error on get page: {e}", exc_info=True)
+        abort(500, description="Database error occurred while fetching items.")
+
+    page = rows[:limit]
+    app.logger.info(f"Retrieved {len(page)} items after ID {after_id}.")
+    response = jsonify([row._asdict() for row in page])
+    if len(rows) > limit:
+        # Pass back as after_id to get the next page
+        response.headers['X-Next-After-Id'] = str(page[-1].id)
+    return response, 200
+
+def stream_all_items():
+    """Streams every item as a JSON array, fetching STREAM_CHUNK rows at a time."""
+    app.logger.debug("Attempting to stream all items.")
+    try:
+        result = db.session.execute(
+            db.select(*ITEM_COLUMNS).order_by(Item.id).execution_options(yield_per=STREAM_CHUNK)
+        )
     except Exception as e:
-         app.logger.error(f"Database error on get all: {e}", exc_info=True)
-         abort(500, description="Database error occurred while fetching items.")
+        app.logger.error(f"Database error on get all: {e}", exc_info=True)
+        abort(500, description="Database error occurred while fetching items.")
+
+    def generate():
+        count = 0
+        yield '['
+        try:
+            for rows in result.partitions():
+                # Encode each chunk as one compact array and splice off its brackets
+                body = app.json.dumps([row._asdict() for row in rows], separators=(',', ':'))[1:-1]
+                yield body if count == 0 else ',' + body
+                count += len(rows)
+        except Exception as e:
+            # The status line is already sent; leaving the array unterminated
+            # makes the failure visible to the client as invalid JSON
+            app.logger.error(f"Database error while streaming items after {count} rows: {e}", exc_info=True)
+            return
+        yield ']'
+        app.logger.info(f"Streamed {count} items.")
+
+    # stream_with_context keeps the app context, and with it the session and
+    # its open cursor, alive until the last chunk has been sent
+    return app.response_class(stream_with_context(generate()), mimetype='application/json')
 
 @app.route('/items/<int:item_id>', methods=['GET'])
 def get_item(item_id):
-    app.logger.debug(f"Attempting to retrieve item with ID: {item_id}.")
+    app.logger.debug("Attempting to retrieve item with ID: %s.", item_id)
     try:
-        item = db.get_or_404(Item, item_id, description=f"Item with ID {item_id} not found.")
-        app.logger.info(f"Retrieved item with ID: {item_id}.")
-        return jsonify(item.to_dict()), 200
+        item = db.session.get(Item, item_id)
     except Exception as e:
-         # Catch potential non-404 errors during lookup, although get_or_404 handles 404 itself
+         # Non-404 errors during lookup; a missing item is a 404 below, not a 500
          app.logger.error(f"Error retrieving item {item_id}: {e}", exc_info=True)
          abort(500, description=f"Error retrieving item {item_id}.")
+    if item is None:
+        abort(404, description=f"Item with ID {item_id} not found.")
+    app.logger.info(f"Retrieved item with ID: {item_id}.")
+    return jsonify(item.to_dict()), 200
 
 @app.route('/items/<int:item_id>', methods=['PUT'])
 def update_item(item_id):
-    app.logger.debug(f"Attempting to update item with ID: {item_id}.")
+    app.logger.debug("Attempting to update item with ID: %s.", item_id)
     item = db.get_or_404(Item, item_id, description=f"Item with ID {item_id} not found for update.")
 
     json_data = request.get_json()
@@ -221,7 +375,7 @@ def update_item(item_id):
 
     try:
         validated_data = item_update_schema.load(json_data, partial=True)
-        app.logger.debug(f"Update item {item_id} validation successful. Data: {validated_data}")
+        app.logger.debug("Update item %s validation successful. Data: %s", item_id, validated_data)
     except ValidationError as err:
         app.logger.warning(f"Update item {item_id} validation failed: {err.messages}")
         abort(400, description=err.messages)
@@ -260,7 +414,7 @@ def update_item(item_id):
 
 @app.route('/items/<int:item_id>', methods=['DELETE'])
 def delete_item(item_id):
-    app.logger.debug(f"Attempting to delete item with ID: {item_id}.")
+    app.logger.debug("Attempting to delete item with ID: %s.", item_id)
     item = db.get_or_404(Item, item_id, description=f"Item with ID {item_id} not found for deletion.")
     item_name_for_log = item.name # Get name before deleting for logging
 
@@ -1,10 +1,20 @@
-# errors.py
+# error.py
 
 from flask import jsonify, current_app # Import current_app for logging
 # Note: We avoid importing 'db' here to keep this module decoupled from database specifics.
 # Rollback logic might need to be handled via application context teardown if needed globally,
 # or kept within specific route exception handling before aborting with 500.
 
+# Bodies that never change are serialized once, by the app's JSON provider,
+# when the handlers are registered
+STATIC_ERROR_BODIES = {
+    500: {"error": "internal_server_error", "message": "An unexpected error occurred on the server."},
+}
+
+def static_error_response(status):
+    body = current_app.extensions['static_error_bodies'][status]
+    return current_app.response_class(body, status=status, mimetype=current_app.json.mimetype)
+
 def handle_bad_request(error):
     """Handles 400 Bad Request errors, including Marshmallow validation errors."""
     messages = getattr(error, 'description', None)
@@ -53,15 +63,16 @@ def handle_internal_server_error(error):
     # Consider using @app.teardown_request or specific try/except blocks in routes
     # if automatic rollback on all 500s is desired.
 
-    response = jsonify({
-        "error": "internal_server_error",
-        "message": "An unexpected error occurred on the server."
-    })
-    response.status_code = 500
-    return response
+    return static_error_response(500)
 
 def register_error_handlers(app):
-    """Registers the error handler functions with the Flask app."""
+    """Registers the error handler functions with the Flask app.
+
+    Call after the JSON provider is configured: static bodies are encoded here.
+    """
+    app.extensions['static_error_bodies'] = {
+        status: app.json.response(body).get_data() for status, body in STATIC_ERROR_BODIES.items()
+    }
     app.register_error_handler(400, handle_bad_request)
     app.register_error_handler(404, handle_not_found)
     app.register_error_handler(500, handle_internal_server_error)
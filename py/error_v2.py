@@ -1,7 +1,19 @@
-# errors.py
+# error_v2.py
 
 from flask import jsonify, current_app # Import current_app
 
+# Bodies that never change are serialized once, by the app's JSON provider,
+# when the handlers are registered
+STATIC_ERROR_BODIES = {
+    500: {"error": "internal_server_error", "message": "An unexpected error occurred on the server."},
+}
+
+def static_error_response(status):
+    body = current_app.extensions['static_error_bodies'][status]
+    return current_app.response_class(body, status=status, mimetype=current_app.json.mimetype)
+
+# Client-error warnings carry a rate_key, so a flood of them can be rate
+# limited per kind (LOG_RATE_LIMIT, see request_log.LogRateLimiter)
 def handle_bad_request(error):
     """Handles 400 Bad Request errors, logs, and returns JSON response."""
     messages = getattr(error, 'description', "Invalid request.")
@@ -20,7 +32,7 @@ def handle_bad_request(error):
         log_message += " - No specific description provided."
 
     # Log as WARNING or INFO depending on severity preference for bad requests
-    current_app.logger.warning(log_message)
+    current_app.logger.warning(log_message, extra={'rate_key': 'bad_request'})
 
     response = jsonify(error_payload)
     response.status_code = 400
@@ -35,7 +47,8 @@ def handle_not_found(error):
     })
     response.status_code = 404
     # Log as WARNING as it often indicates a client error or broken link
-    current_app.logger.warning(f"Not Found (404): {request.method} {request.path} - {message}")
+    current_app.logger.warning(f"Not Found (404): {request.method} {request.path} - {message}",
+                               extra={'rate_key': 'not_found'})
     return response
 
 def handle_internal_server_error(error):
@@ -50,15 +63,16 @@ def handle_internal_server_error(error):
         exc_info=error # Pass the original error for traceback logging
     )
 
-    response = jsonify({
-        "error": "internal_server_error",
-        "message": "An unexpected error occurred on the server." # Generic message to client
-    })
-    response.status_code = 500
-    return response
+    return static_error_response(500)
 
 def register_error_handlers(app):
-    """Registers the error handler functions with the Flask app."""
+    """Registers the error handler functions with the Flask app.
+
+    Call after the JSON provider is configured: static bodies are encoded here.
+    """
+    app.extensions['static_error_bodies'] = {
+        status: app.json.response(body).get_data() for status, body in STATIC_ERROR_BODIES.items()
+    }
     # Import request here, only needed for logging context in handlers
     # Alternatively, access request via current_app if preferred/safer
     global request
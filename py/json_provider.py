@@ -0,0 +1,81 @@
+# json_provider.py
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency; the stdlib provider is used instead
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider (app.json, jsonify, request.get_json) backed by orjson.
+
+    Output matches the stdlib provider's apart from whitespace: always compact
+    UTF-8 (separators and ensure_ascii are ignored), with dates still rendered
+    by Flask's default hook. Arguments orjson has no equivalent for, like
+    cls or an indent other than 2, are handed to the stdlib encoder, and so
+    are values orjson cannot encode but the stdlib can, like integers
+    beyond 64 bits.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return self.dumps_bytes(obj, **kwargs).decode()
+
+    def dumps_bytes(self, obj, **kwargs):
+        kwargs.pop('separators', None)
+        kwargs.pop('ensure_ascii', None)
+        indent = kwargs.pop('indent', None)
+        sort_keys = kwargs.pop('sort_keys', self.sort_keys)
+        default = kwargs.pop('default', self.default)
+        if kwargs or indent not in (None, 2):
+            return super().dumps(obj, indent=indent, sort_keys=sort_keys, default=default, **kwargs).encode()
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=default, option=option)
+        except orjson.JSONEncodeError:
+            # Compact and UTF-8 like orjson's output; a value neither can
+            # encode raises the stdlib's TypeError
+            separators = None if indent else (',', ':')
+            return super().dumps(obj, indent=indent, sort_keys=sort_keys, default=default,
+                                 separators=separators, ensure_ascii=False).encode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # Pretty-printed in debug mode, like the stdlib provider
+        indent = 2 if self.compact is False or (self.compact is None and self._app.debug) else None
+        return self._app.response_class(self.dumps_bytes(obj, indent=indent) + b'\n', mimetype=self.mimetype)
+
+
+JSON_PROVIDERS = {
+    'stdlib': DefaultJSONProvider,
+    'orjson': OrjsonProvider,
+}
+
+
+def configure_json_provider(app):
+    """Installs the JSON_PROVIDER named in the config as app.json.
+
+    'auto' picks orjson when it is installed. Asking for orjson without it
+    installed logs a warning and uses the stdlib provider. Returns the name
+    of the provider installed.
+    """
+    name = app.config.get('JSON_PROVIDER', 'auto')
+    if name == 'auto':
+        name = 'orjson' if orjson is not None else 'stdlib'
+    if name not in JSON_PROVIDERS:
+        raise ValueError(f"Unknown JSON_PROVIDER '{name}'. Choose from: auto, {', '.join(JSON_PROVIDERS)}")
+    if name == 'orjson' and orjson is None:
+        app.logger.warning("JSON_PROVIDER 'orjson' requested but orjson is not installed; using 'stdlib'.")
+        name = 'stdlib'
+    app.json = JSON_PROVIDERS[name](app)
+    app.logger.info("JSON provider: %s", name)
+    return name
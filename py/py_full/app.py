@@ -1,49 +1,82 @@
 # app.py
 import os
-from flask import Flask, request, current_app # request/current_app needed for global hooks
+from flask import Flask
 
 # Import necessary parts from our modules
 from config import Config
-from extensions import db
+from extensions import db, item_cache, item_writer, metrics
+from models import Item, install_item_schema
 from errors import register_error_handlers
+from json_provider import configure_json_provider
 from logging_config import configure_logging
+from request_log import install_request_log
+from sqlite_profile import configure_sqlite_profile, install_sqlite_pragmas
+from item_search import install_item_search
 from routes import items_bp # Import the blueprint
+from cli import items_cli
 
 def create_app(config_class=Config):
     """Application Factory Function"""
     app = Flask(__name__)
     app.config.from_object(config_class)
 
+    # Configure logging
+    configure_logging(app)
+
+    # SQLite profile: pool sizing has to be in the config before the engine
+    # is created, the pragmas are then run on each new connection
+    sqlite_pragmas = configure_sqlite_profile(app)
+
     # Initialize Flask extensions
     db.init_app(app)
 
-    # Configure logging
-    configure_logging(app)
+    if sqlite_pragmas:
+        with app.app_context():
+            install_sqlite_pragmas(db.engine, sqlite_pragmas)
+    item_cache.init_app(app, db.session, Item)
+    item_writer.init_app(app, db)
+    # Columns added since the database was created (e.g. item.version) and
+    # AUTOINCREMENT ids, then the full-text index for GET /items/search; new
+    # databases get all of it from db.create_all
+    with app.app_context():
+        install_item_schema(app, db.engine)
+        install_item_search(app, db.engine)
+
+    # JSON provider for jsonify and the error handlers (before registering
+    # the handlers, which pre-encode their static bodies with it)
+    configure_json_provider(app)
 
     # Register error handlers
     register_error_handlers(app)
 
     # Register blueprints
-    app.register_blueprint(items_bp) # All routes defined in items_bp are now active
-
-    # --- Optional: Add App-Level Request/Response Logging Hooks ---
-    # These run for ALL requests, including those not handled by a blueprint (like a root 404)
-    @app.before_request
-    def app_log_request_info():
-        # Use current_app.logger which is configured
-        # Avoid logging static file requests if desired
-        if request.endpoint and 'static' not in request.endpoint:
-             current_app.logger.info(
-                f"App Request: {request.method} {request.path} from {request.remote_addr}"
-             )
-
-    @app.after_request
-    def app_log_response_info(response):
-        if request.endpoint and 'static' not in request.endpoint:
-            current_app.logger.info(
-                f"App Response: {request.method} {request.path} - Status {response.status_code}"
-            )
-        return response # Must return the response object
+    blueprint = app.config.get('ITEMS_BLUEPRINT', 'sync')
+    if blueprint == 'async':
+        # Imported here so sync deployments don't need aiosqlite/greenlet
+        from async_db import AsyncItemSession
+        from async_routes import async_db, async_items_bp
+        async_db.init_app(app, sqlite_pragmas)
+        item_cache.watch(AsyncItemSession)
+        app.register_blueprint(async_items_bp)
+    elif blueprint == 'sync':
+        app.register_blueprint(items_bp) # All routes defined in items_bp are now active
+    else:
+        raise ValueError(f"Unknown ITEMS_BLUEPRINT '{blueprint}'. Choose 'sync' or 'async'.")
+
+    # Request metrics at METRICS_PATH, with the item cache and writer counters
+    metrics.init_app(app)
+    metrics.add_collector('item_cache', item_cache.stats)
+    metrics.add_collector('item_writer', item_writer.stats)
+    if 'log_queue' in app.extensions:
+        metrics.add_collector('log_queue', app.extensions['log_queue'].stats)
+
+    # CLI commands: flask items export / flask items import
+    app.cli.add_command(items_cli)
+
+    # --- Request Logging ---
+    # One line per request (method, path, status, duration, item id) for ALL
+    # requests, including those not handled by a blueprint (like a root 404)
+    install_request_log(app)
 
     app.logger.info("Application factory finished configuration.")
     return app
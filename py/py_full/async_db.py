@@ -0,0 +1,57 @@
+# async_db.py
+import asyncio
+import threading
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from sqlite_profile import install_sqlite_pragmas
+
+
+class AsyncItemSession(Session):
+    """Sync session class behind the async sessions, so listeners (e.g. the
+    item cache) can be attached to the async blueprint's sessions only."""
+
+
+class AsyncDatabase:
+    """SQLAlchemy asyncio engine (aiosqlite) for the async items blueprint.
+
+    Flask runs every async view on a fresh event loop, but pooled aiosqlite
+    connections are bound to the loop that opened them. So the engine lives
+    on one long-lived loop in a background thread, and views hand their
+    database coroutines to it with ``run`` (from async code) or ``call``
+    (from sync code, e.g. a streaming generator).
+    """
+
+    def __init__(self):
+        self.engine = None
+        self.session = None
+        self._loop = None
+
+    def init_app(self, app, sqlite_pragmas=None):
+        url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+        if url.get_backend_name() == 'sqlite':
+            url = url.set(drivername='sqlite+aiosqlite')
+        engine_options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+        self.engine = create_async_engine(url, **engine_options)
+        if sqlite_pragmas:
+            install_sqlite_pragmas(self.engine.sync_engine, sqlite_pragmas)
+
+        self.session = async_sessionmaker(self.engine, expire_on_commit=False,
+                                          sync_session_class=AsyncItemSession)
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            threading.Thread(target=self._loop.run_forever, name='async-db-loop', daemon=True).start()
+        app.logger.info(f"Async database engine: {url.render_as_string(hide_password=True)}")
+
+    def run(self, coro):
+        """Awaitable running ``coro`` on the database loop."""
+        return asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._loop))
+
+    def call(self, coro):
+        """Runs ``coro`` on the database loop and blocks until it is done."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def dispose(self):
+        self.call(self.engine.dispose())
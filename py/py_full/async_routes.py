@@ -0,0 +1,367 @@
+# async_routes.py
+from flask import Blueprint, request, jsonify, abort, current_app, make_response, stream_with_context
+from marshmallow import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+# Import application components
+from async_db import AsyncDatabase
+from extensions import item_cache
+from models import Item, item_etag
+from item_search import search_statement
+from routes import (ITEM_COLUMNS, ITEM_FIELDS, NAME_LOOKUP_CHUNK, delete_item_statement, parse_fields,
+                    parse_search_args, row_dicts, search_response, update_item_statement)
+from schemas import item_create_schema, item_create_many_schema, item_update_schema
+from auth import require_api_key
+
+# Same routes as routes.items_bp, served with SQLAlchemy's asyncio engine.
+# Selected with ITEMS_BLUEPRINT = 'async'; the blueprint keeps the name
+# 'items' so url_for() works the same with either one.
+async_items_bp = Blueprint('items', __name__, url_prefix='/items')
+async_db = AsyncDatabase()
+
+
+# --- Database Coroutines ---
+# These run on async_db's event loop, outside the app context, so they
+# return plain data and leave logging and aborting to the views.
+async def name_taken(session, name):
+    return await session.scalar(select(Item.id).where(Item.name == name).limit(1)) is not None
+
+
+async def db_create_item(name, description):
+    """Returns the new item's dict, or None if the name is taken."""
+    async with async_db.session() as session:
+        if await name_taken(session, name):
+            return None
+        item = Item(name=name, description=description)
+        session.add(item)
+        try:
+            await session.commit()
+        except IntegrityError:
+            # A concurrent write took the name between the check and the commit
+            await session.rollback()
+            return None
+        return item.to_dict()
+
+
+async def db_create_items(rows, pending):
+    """Inserts pending (name -> request index) rows; returns {index: item dict} and the names already taken."""
+    async with async_db.session() as session:
+        names = list(pending)
+        taken = set()
+        for start in range(0, len(names), NAME_LOOKUP_CHUNK):
+            chunk = names[start:start + NAME_LOOKUP_CHUNK]
+            taken.update(await session.scalars(select(Item.name).where(Item.name.in_(chunk))))
+        indexes = [index for name, index in pending.items() if name not in taken]
+        if not indexes:
+            return {}, taken
+        result = await session.execute(
+            insert(Item).returning(Item.id, Item.name, Item.description, sort_by_parameter_order=True),
+            [{'name': rows[index]['name'], 'description': rows[index].get('description')} for index in indexes],
+        )
+        created = {index: row._asdict() for index, row in zip(indexes, result)}
+        # Core inserts bypass the ORM's change tracking; drop any cached 404s
+        item_cache.mark_changed(session.sync_session, *(item['id'] for item in created.values()))
+        await session.commit()
+        return created, taken
+
+
+async def db_get_page(columns, after_id, limit):
+    async with async_db.session() as session:
+        result = await session.execute(
+            select(*columns).where(Item.id > after_id).order_by(Item.id).limit(limit + 1)
+        )
+        return row_dicts(tuple(result.keys()), result)
+
+
+async def db_open_stream(columns, chunk_size):
+    session = async_db.session()
+    result = await session.stream(select(*columns).order_by(Item.id).execution_options(yield_per=chunk_size))
+    return session, result
+
+
+async def db_next_chunk(result, keys, chunk_size):
+    return row_dicts(keys, await result.fetchmany(chunk_size))
+
+
+async def db_close_stream(session, result):
+    await result.close()
+    await session.close()
+
+
+async def db_search(query, limit, offset, columns):
+    async with async_db.session() as session:
+        result = await session.execute(search_statement(query, limit, offset, columns))
+        return tuple(result.keys()), result.all()
+
+
+async def db_load_item(item_id):
+    """item_cache loader: the item's response body and ETag, or None if it does not exist."""
+    async with async_db.session() as session:
+        row = (await session.execute(select(*ITEM_COLUMNS, Item.version).where(Item.id == item_id))).first()
+        return None if row is None else (dict(zip(ITEM_FIELDS, row)), item_etag(row.id, row.version))
+
+
+async def db_update_item(item_id, changes):
+    """Returns (status, item dict); status is 'ok', 'not_found' or 'name_taken'."""
+    async with async_db.session() as session:
+        try:
+            row = (await session.execute(update_item_statement(item_id, changes))).first()
+        except IntegrityError:
+            return 'name_taken', None
+        if row is None:
+            return 'not_found', None
+        item_cache.mark_changed(session.sync_session, item_id)
+        await session.commit()
+        return 'ok', dict(zip(ITEM_FIELDS, row))
+
+
+async def db_delete_item(item_id):
+    """Returns the deleted item's name, or None if it does not exist."""
+    async with async_db.session() as session:
+        name = (await session.execute(delete_item_statement(item_id))).scalar()
+        if name is not None:
+            item_cache.mark_changed(session.sync_session, item_id)
+            await session.commit()
+        return name
+
+
+# --- API Routes (CRUD) ---
+@async_items_bp.route('/', methods=['POST']) # Corresponds to POST /items
+@require_api_key
+async def create_item():
+    current_app.logger.debug("Attempting to create a new item (authorized, async).")
+    json_data = request.get_json()
+    if not json_data:
+        current_app.logger.warning("Create item failed: Request body was not JSON.")
+        abort(400, description="Request body must be JSON.")
+
+    try:
+        validated_data = item_create_schema.load(json_data)
+    except ValidationError as err:
+        current_app.logger.warning(f"Create item validation failed: {err.messages}")
+        abort(400, description=err.messages)
+
+    name = validated_data['name']
+    try:
+        item = await async_db.run(db_create_item(name, validated_data.get('description')))
+    except Exception as e:
+        current_app.logger.error(f"Database error on create: {e}", exc_info=True)
+        abort(500, description="Database error occurred during item creation.")
+
+    if item is None:
+        current_app.logger.warning(f"Create item failed: Item name '{name}' already exists.")
+        abort(400, description=f"Item with name '{name}' already exists.")
+    current_app.logger.info(f"Item created successfully with ID: {item['id']}, Name: {item['name']}")
+    return jsonify(item), 201
+
+
+@async_items_bp.route('/batch', methods=['POST']) # Corresponds to POST /items/batch
+@require_api_key
+async def create_items_batch():
+    current_app.logger.debug("Attempting to create a batch of items (authorized, async).")
+    json_data = request.get_json()
+    if not isinstance(json_data, list) or not json_data:
+        current_app.logger.warning("Create batch failed: Request body was not a non-empty JSON array.")
+        abort(400, description="Request body must be a non-empty JSON array of items.")
+
+    max_items = current_app.config['ITEMS_BATCH_MAX']
+    if len(json_data) > max_items:
+        current_app.logger.warning(f"Create batch failed: {len(json_data)} items exceeds the limit of {max_items}.")
+        abort(400, description=f"A batch can hold at most {max_items} items.")
+
+    try:
+        rows = item_create_many_schema.load(json_data)
+        errors = {}
+    except ValidationError as err:
+        rows, errors = err.valid_data, err.messages
+
+    pending = {}  # name -> index in the request
+    for index, row in enumerate(rows):
+        if index in errors:
+            continue
+        if row['name'] in pending:
+            errors[index] = {'name': [f"Duplicate name '{row['name']}' within the batch."]}
+        else:
+            pending[row['name']] = index
+
+    created = {}
+    if pending:
+        try:
+            created, taken = await async_db.run(db_create_items(rows, pending))
+        except IntegrityError as e:
+            current_app.logger.warning(f"Create batch failed: name conflict with a concurrent write: {e.orig}")
+            abort(400, description="Another request created items with some of these names; nothing was created, retry the batch.")
+        except Exception as e:
+            current_app.logger.error(f"Database error on batch create: {e}", exc_info=True)
+            abort(500, description="Database error occurred during batch creation.")
+        for name in taken:
+            errors[pending[name]] = {'name': [f"Item with name '{name}' already exists."]}
+
+    current_app.logger.info(f"Batch create finished: {len(created)} created, {len(errors)} rejected.")
+    results = [
+        {'index': index, 'status': 201, 'item': created[index]} if index in created
+        else {'index': index, 'status': 400, 'errors': errors[index]}
+        for index in range(len(json_data))
+    ]
+    return jsonify({'created': len(created), 'failed': len(errors), 'results': results}), 201 if not errors else 207
+
+
+@async_items_bp.route('/', methods=['GET']) # Corresponds to GET /items
+async def get_items():
+    columns = parse_fields()
+    limit = request.args.get('limit')
+    after_id = request.args.get('after_id')
+    if limit is None and after_id is None:
+        return await stream_all_items(columns)
+
+    try:
+        limit = int(limit) if limit is not None else current_app.config['ITEMS_PAGE_DEFAULT']
+        after_id = int(after_id) if after_id is not None else 0
+    except ValueError:
+        current_app.logger.warning(f"Get items failed: non-integer limit '{limit}' or after_id '{after_id}'.")
+        abort(400, description="limit and after_id must be integers.")
+    max_limit = current_app.config['ITEMS_PAGE_MAX']
+    if not 1 <= limit <= max_limit:
+        current_app.logger.warning(f"Get items failed: limit {limit} out of range.")
+        abort(400, description=f"limit must be between 1 and {max_limit}.")
+
+    try:
+        rows = await async_db.run(db_get_page(columns, after_id, limit))
+    except Exception as e:
+        current_app.logger.error(f"Database error on get page: {e}", exc_info=True)
+        abort(500, description="Database error occurred while fetching items.")
+
+    page = rows[:limit]
+    current_app.logger.info(f"Retrieved {len(page)} items after ID {after_id}.")
+    response = jsonify(page)
+    if len(rows) > limit:
+        response.headers['X-Next-After-Id'] = str(page[-1]['id'])
+    return response, 200
+
+
+async def stream_all_items(columns=ITEM_COLUMNS):
+    """Streams every item as a JSON array, fetching ITEMS_STREAM_CHUNK rows at a time."""
+    chunk_size = current_app.config['ITEMS_STREAM_CHUNK']
+    try:
+        session, result = await async_db.run(db_open_stream(columns, chunk_size))
+    except Exception as e:
+        current_app.logger.error(f"Database error on get all: {e}", exc_info=True)
+        abort(500, description="Database error occurred while fetching items.")
+
+    # Flask can only stream from a sync generator, so each chunk is fetched
+    # by blocking on the database loop
+    def generate():
+        dumps = current_app.json.dumps
+        keys = tuple(result.keys())
+        count = 0
+        yield '['
+        try:
+            while rows := async_db.call(db_next_chunk(result, keys, chunk_size)):
+                body = dumps(rows, separators=(',', ':'))[1:-1]
+                yield body if count == 0 else ',' + body
+                count += len(rows)
+        except Exception as e:
+            current_app.logger.error(f"Database error while streaming items after {count} rows: {e}", exc_info=True)
+            return
+        yield ']'
+        current_app.logger.info(f"Streamed {count} items.")
+
+    response = current_app.response_class(stream_with_context(generate()), mimetype='application/json')
+    # Closed with the response rather than at the end of generate(), which
+    # never runs for HEAD or a client that leaves before the first chunk
+    response.call_on_close(lambda: async_db.call(db_close_stream(session, result)))
+    return response
+
+
+@async_items_bp.route('/search', methods=['GET']) # Corresponds to GET /items/search?q=
+async def search_items():
+    query, limit, offset = parse_search_args()
+    columns = parse_fields()
+    try:
+        keys, rows = await async_db.run(db_search(query, limit + 1, offset, columns))
+    except Exception as e:
+        current_app.logger.error(f"Database error on search: {e}", exc_info=True)
+        abort(500, description="Database error occurred while searching items.")
+
+    current_app.logger.info(f"Search for {query} returned {min(len(rows), limit)} items at offset {offset}.")
+    return search_response(keys, rows, limit, offset), 200
+
+
+@async_items_bp.route('/<int:item_id>', methods=['GET']) # Corresponds to GET /items/<id>
+async def get_item(item_id):
+    current_app.logger.debug("Attempting to retrieve item with ID: %s.", item_id)
+    try:
+        cached = await item_cache.aget(item_id, lambda key: async_db.run(db_load_item(key)))
+    except Exception as e:
+        current_app.logger.error(f"Error retrieving item {item_id}: {e}", exc_info=True)
+        abort(500, description=f"Error retrieving item {item_id}.")
+
+    if cached is None:
+        abort(404, description=f"Item with ID {item_id} not found.")
+    data, etag = cached
+
+    if request.if_none_match.contains_weak(etag):
+        response = make_response('', 304)
+        response.set_etag(etag, weak=True)
+        return response
+
+    response = jsonify(data)
+    response.set_etag(etag, weak=True)
+    return response, 200
+
+
+@async_items_bp.route('/cache/stats', methods=['GET']) # Corresponds to GET /items/cache/stats
+async def get_cache_stats():
+    return jsonify(item_cache.stats()), 200
+
+
+@async_items_bp.route('/<int:item_id>', methods=['PUT']) # Corresponds to PUT /items/<id>
+@require_api_key
+async def update_item(item_id):
+    current_app.logger.debug("Attempting to update item with ID: %s (authorized, async).", item_id)
+    json_data = request.get_json()
+    if not json_data:
+        current_app.logger.warning(f"Update item {item_id} failed: Request body was not JSON.")
+        abort(400, description="Request body must be JSON.")
+
+    try:
+        validated_data = item_update_schema.load(json_data, partial=True)
+    except ValidationError as err:
+        current_app.logger.warning(f"Update item {item_id} validation failed: {err.messages}")
+        abort(400, description=err.messages)
+
+    if not validated_data:
+         current_app.logger.warning(f"Update item {item_id} failed: No update data provided.")
+         abort(400, description="No update data provided. Must provide 'name' or 'description'.")
+
+    try:
+        status, item = await async_db.run(db_update_item(item_id, validated_data))
+    except Exception as e:
+        current_app.logger.error(f"Database error on update for item {item_id}: {e}", exc_info=True)
+        abort(500, description="Database error occurred during update.")
+
+    if status == 'not_found':
+        abort(404, description=f"Item with ID {item_id} not found for update.")
+    if status == 'name_taken':
+        new_name = validated_data['name']
+        current_app.logger.warning(f"Update item {item_id} failed: Name '{new_name}' already exists.")
+        abort(400, description=f"Cannot update: another item with name '{new_name}' already exists.")
+    current_app.logger.info(f"Item {item_id} updated successfully. Fields: {', '.join(validated_data)}.")
+    return jsonify(item), 200
+
+
+@async_items_bp.route('/<int:item_id>', methods=['DELETE']) # Corresponds to DELETE /items/<id>
+async def delete_item(item_id):
+    # Like the sync blueprint, DELETE does not require an API key
+    current_app.logger.debug("Attempting to delete item with ID: %s (async).", item_id)
+    try:
+        name = await async_db.run(db_delete_item(item_id))
+    except Exception as e:
+        current_app.logger.error(f"Database error on delete for item {item_id}: {e}", exc_info=True)
+        abort(500, description="Database error occurred during deletion.")
+
+    if name is None:
+        abort(404, description=f"Item with ID {item_id} not found for deletion.")
+    current_app.logger.info(f"Item {item_id} (Name: '{name}') deleted successfully.")
+    return jsonify({"message": f"Item with ID {item_id} deleted successfully."}), 200
@@ -0,0 +1,61 @@
+# bench_batch_insert.py
+# Compares loading items through POST /items one at a time with a single
+# POST /items/batch, against a fresh SQLite file.
+#
+# Usage: python benchmarks/bench_batch_insert.py [items]
+
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config import Config
+from extensions import db
+
+SINGLE_SAMPLE = 2_000  # POST /items is timed on this many items and extrapolated
+
+
+def make_client(db_path):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + db_path
+        LOG_FILE = None
+
+    app = create_app(BenchConfig)
+    app.logger.setLevel(logging.ERROR)
+    with app.app_context():
+        db.create_all()
+    return app.test_client(), {'X-API-Key': BenchConfig.EXPECTED_API_KEY}
+
+
+def bench_single(n):
+    with tempfile.TemporaryDirectory() as tmp:
+        client, headers = make_client(os.path.join(tmp, 'items.db'))
+        start = time.perf_counter()
+        for i in range(n):
+            response = client.post('/items/', json={'name': f'item {i}', 'description': 'bench'}, headers=headers)
+            assert response.status_code == 201
+        return time.perf_counter() - start
+
+
+def bench_batch(n):
+    with tempfile.TemporaryDirectory() as tmp:
+        client, headers = make_client(os.path.join(tmp, 'items.db'))
+        body = [{'name': f'item {i}', 'description': 'bench'} for i in range(n)]
+        start = time.perf_counter()
+        response = client.post('/items/batch', json=body, headers=headers)
+        assert response.status_code == 201, response.status_code
+        return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    items = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    sample = min(items, SINGLE_SAMPLE)
+    single = bench_single(sample) / sample * items
+    batch = bench_batch(items)
+    print(f"{items} items")
+    print(f"POST /items x {items:<8} {single:8.1f}s  (extrapolated from {sample})")
+    print(f"POST /items/batch       {batch:8.1f}s")
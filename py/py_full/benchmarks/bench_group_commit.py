@@ -0,0 +1,122 @@
+# bench_group_commit.py
+# Runs 1, 8 and 64 concurrent writers (POST /items, as in the locust mix,
+# plus PUT /items/<id>) against a fresh SQLite file, committing each write
+# on its own and with ITEMS_GROUP_COMMIT, for the 'production' and 'durable'
+# SQLite profiles. Reports writes/s, latency, failures and group size.
+#
+# Usage: python benchmarks/bench_group_commit.py [seconds] [window_ms]
+
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config import Config
+from extensions import db, item_writer
+from models import Item
+
+ITEMS = 1_000
+WRITERS = [1, 8, 64]
+
+
+def make_app(db_path, profile, group_commit, window_ms):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + db_path
+        SQLITE_PROFILE = profile
+        ITEMS_GROUP_COMMIT = group_commit
+        ITEMS_GROUP_COMMIT_WINDOW_MS = window_ms
+        LOG_FILE = None
+
+    app = create_app(BenchConfig)
+    app.logger.setLevel(logging.CRITICAL)
+    with app.app_context():
+        db.create_all()
+        db.session.execute(db.insert(Item), [{'name': f'item {i}', 'description': 'bench'} for i in range(ITEMS)])
+        db.session.commit()
+    return app
+
+
+def worker(app, deadline, stats):
+    client = app.test_client()
+    headers = {'X-API-Key': app.config['EXPECTED_API_KEY']}
+    ok = failed = 0
+    latencies = []
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        if random.random() < 0.75:
+            response = client.post('/items/', json={'name': uuid.uuid4().hex}, headers=headers)
+        else:
+            response = client.put(f'/items/{random.randint(1, ITEMS)}', json={'description': uuid.uuid4().hex},
+                                  headers=headers)
+        latencies.append(time.perf_counter() - start)
+        if response.status_code in (200, 201):
+            ok += 1
+        else:
+            failed += 1
+    stats.append((ok, failed, latencies))
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def check_isolation(app):
+    """A failing write in a group must not take the others down with it."""
+    client = app.test_client()
+    headers = {'X-API-Key': app.config['EXPECTED_API_KEY']}
+    name = uuid.uuid4().hex
+    statuses = []
+    threads = [threading.Thread(target=lambda: statuses.append(
+        client.post('/items/', json={'name': name}, headers=headers).status_code)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(statuses) == [201] + [400] * 7, statuses
+
+
+def bench(profile, group_commit, writers, seconds, window_ms):
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, 'items.db'), profile, group_commit, window_ms)
+        check_isolation(app)
+        groups_before = item_writer.stats()
+        stats = []
+        deadline = time.perf_counter() + seconds
+        threads = [threading.Thread(target=worker, args=(app, deadline, stats)) for _ in range(writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        writer_stats = item_writer.stats()
+        groups = writer_stats['groups'] - groups_before['groups']
+        writes = writer_stats['writes'] - groups_before['writes']
+        with app.app_context():
+            db.engine.dispose()
+
+    ok = sum(s[0] for s in stats)
+    failed = sum(s[1] for s in stats)
+    latencies = [lat for s in stats for lat in s[2]]
+    mode = 'group' if group_commit else 'per-request'
+    group_size = f"{writes / groups:6.1f}" if groups else '     -'
+    print(f"{profile:>10} {mode:>11} {writers:>7} {ok / seconds:8.0f} {failed:6d} "
+          f"{percentile(latencies, 0.5) * 1e3:7.2f} {percentile(latencies, 0.99) * 1e3:8.2f} {group_size}")
+
+
+if __name__ == '__main__':
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    window_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 0
+    print(f"{seconds:g}s per run, group commit window {window_ms:g}ms")
+    print(f"{'profile':>10} {'mode':>11} {'writers':>7} {'writes/s':>8} {'failed':>6} "
+          f"{'p50 ms':>7} {'p99 ms':>8} {'group':>6}")
+    for profile in ('production', 'durable'):
+        for group_commit in (False, True):
+            for writers in WRITERS:
+                bench(profile, group_commit, writers, seconds, window_ms)
@@ -0,0 +1,60 @@
+# bench_item_cache.py
+# GET /items/<id> throughput over a hot set of ids with the item cache
+# enabled ('lru') and disabled ('null').
+#
+# Usage: python benchmarks/bench_item_cache.py [requests]
+
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config import Config
+from extensions import db, item_cache
+from models import Item
+
+ITEMS = 100_000
+HOT_IDS = 1_000
+
+
+def make_app(db_path, backend):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + db_path
+        ITEM_CACHE_BACKEND = backend
+        LOG_FILE = None
+
+    app = create_app(BenchConfig)
+    app.logger.setLevel(logging.ERROR)
+    with app.app_context():
+        db.create_all()
+        db.session.execute(db.insert(Item), [{'name': f'item {i}', 'description': 'bench'} for i in range(ITEMS)])
+        db.session.commit()
+    return app
+
+
+def bench(backend, requests):
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, 'items.db'), backend)
+        client = app.test_client()
+        ids = [random.randint(1, HOT_IDS) for _ in range(requests)]
+        start = time.perf_counter()
+        for item_id in ids:
+            client.get(f'/items/{item_id}')
+        elapsed = time.perf_counter() - start
+        with app.app_context():
+            db.engine.dispose()
+    stats = item_cache.stats()
+    print(f"{backend:>5} {requests / elapsed:10.0f} {elapsed / requests * 1e6:10.1f} {stats['hit_rate']:9.1%}")
+
+
+if __name__ == '__main__':
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    print(f"{requests} GETs over {HOT_IDS} hot ids of {ITEMS}")
+    print(f"{'cache':>5} {'req/s':>10} {'us/req':>10} {'hit rate':>9}")
+    for backend in ('null', 'lru'):
+        bench(backend, requests)
@@ -0,0 +1,108 @@
+# bench_item_mutations.py
+# Counts SQL statements and times PUT and DELETE of one item: the previous
+# ORM path (get_or_404, a name lookup, then a flush) against the
+# single-statement UPDATE ... RETURNING / DELETE ... RETURNING path, each
+# committed per request. Also counts statements per HTTP request for the
+# current endpoints.
+#
+# Usage: python benchmarks/bench_item_mutations.py [operations]
+
+import gc
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+
+from app import create_app
+from config import Config
+from extensions import db, item_writer
+from models import Item
+from routes import write_delete_item, write_update_item
+
+
+# --- Previous ORM path ---
+def orm_update_item(item_id, changes):
+    item = db.get_or_404(Item, item_id)
+    new_name = changes.get('name')
+    if new_name is not None and new_name != item.name and Item.query.filter_by(name=new_name).first():
+        raise ValueError(new_name)
+    for field, value in changes.items():
+        setattr(item, field, value)
+    db.session.flush()
+    return item.to_dict()
+
+
+def orm_delete_item(item_id):
+    item = db.get_or_404(Item, item_id)
+    db.session.delete(item)
+    db.session.flush()
+    return item.name
+
+
+def make_app(db_path, items):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + db_path
+        LOG_FILE = None
+
+    app = create_app(BenchConfig)
+    app.logger.setLevel(logging.CRITICAL)
+    with app.app_context():
+        db.create_all()
+        db.session.execute(db.insert(Item), [{'name': f'item {i}', 'description': 'bench'} for i in range(items)])
+        db.session.commit()
+    return app
+
+
+class StatementCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self.on_execute)
+
+    def on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def run(app, counter, label, operations, write, args_for):
+    with app.test_request_context():
+        gc.collect()
+        counter.count = 0
+        start = time.perf_counter()
+        for i in range(operations):
+            item_writer.run(write, *args_for(i))
+            db.session.remove()  # end of request
+        elapsed = time.perf_counter() - start
+    print(f"{label:<32} {counter.count / operations:>10.1f} {elapsed / operations * 1e6:>10.0f}")
+
+
+if __name__ == '__main__':
+    operations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, 'items.db'), operations * 4)
+        with app.app_context():
+            counter = StatementCounter(db.engine)
+        print(f"{operations} operations each, committed per request")
+        print(f"{'path':<32} {'stmts/op':>10} {'us/op':>10}")
+        run(app, counter, 'PUT  ORM (get, lookup, flush)', operations, orm_update_item,
+            lambda i: (i + 1, {'name': f'renamed {i}', 'description': 'orm'}))
+        run(app, counter, 'PUT  UPDATE ... RETURNING', operations, write_update_item,
+            lambda i: (operations + i + 1, {'name': f'renamed {operations + i}', 'description': 'core'}))
+        run(app, counter, 'DELETE ORM (get, flush)', operations, orm_delete_item,
+            lambda i: (2 * operations + i + 1,))
+        run(app, counter, 'DELETE ... RETURNING', operations, write_delete_item,
+            lambda i: (3 * operations + i + 1,))
+
+        client = app.test_client()
+        headers = {'X-API-Key': app.config['EXPECTED_API_KEY']}
+        counter.count = 0
+        client.put('/items/1', json={'description': 'http'}, headers=headers)
+        put_statements = counter.count
+        counter.count = 0
+        client.delete('/items/1')
+        print(f"HTTP statements per request: PUT {put_statements}, DELETE {counter.count}")
+        with app.app_context():
+            db.engine.dispose()
@@ -0,0 +1,86 @@
+# bench_item_projection.py
+# Times reading N items and encoding them as JSON: the ORM path
+# (Item.query.all() + to_dict()) against Core column selects, with and
+# without a ?fields= style projection.
+#
+# Usage: python benchmarks/bench_item_projection.py [items] [rounds]
+
+import gc
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config import Config
+from extensions import db
+from models import Item
+from routes import ITEM_COLUMNS, row_dicts
+
+
+def make_app(db_path, items):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + db_path
+        LOG_FILE = None
+
+    app = create_app(BenchConfig)
+    app.logger.setLevel(logging.CRITICAL)
+    with app.app_context():
+        db.create_all()
+        db.session.execute(db.insert(Item), [{'name': f'item {i}', 'description': f'description of item {i}'}
+                                             for i in range(items)])
+        db.session.commit()
+    return app
+
+
+def orm_to_dict():
+    return [item.to_dict() for item in Item.query.all()]
+
+
+def core_asdict():
+    return [row._asdict() for row in db.session.execute(db.select(*ITEM_COLUMNS))]
+
+
+def core_row_dicts(columns=ITEM_COLUMNS):
+    result = db.session.execute(db.select(*columns))
+    return row_dicts(tuple(result.keys()), result)
+
+
+def core_fields_name():
+    return core_row_dicts((Item.id, Item.name))
+
+
+def best_seconds(fn, dumps, rounds):
+    times = []
+    for _ in range(rounds):
+        gc.collect()
+        start = time.perf_counter()
+        dumps(fn())
+        db.session.remove()  # drop the identity map, as at the end of a request
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == '__main__':
+    items = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, 'items.db'), items)
+        with app.app_context():
+            dumps = app.json.dumps
+            baseline = None
+            print(f"{items} items, best of {rounds}")
+            print(f"{'path':<36} {'ms':>8} {'speedup':>8}")
+            for label, fn in [
+                ('Item.query.all() + to_dict()', orm_to_dict),
+                ('Core columns + Row._asdict()', core_asdict),
+                ('Core columns + row_dicts()', core_row_dicts),
+                ('Core, fields=name + row_dicts()', core_fields_name),
+            ]:
+                seconds = best_seconds(fn, dumps, rounds)
+                baseline = baseline or seconds
+                print(f"{label:<36} {seconds * 1e3:8.1f} {baseline / seconds:7.1f}x")
+            db.engine.dispose()
@@ -0,0 +1,82 @@
+# bench_list_items.py
+# Peak Python memory and time of listing a large items table: the old
+# Item.query.all() + jsonify body, the streamed GET /items, and paging
+# through it with GET /items?limit=&after_id=.
+#
+# Usage: python benchmarks/bench_list_items.py [items]
+
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import jsonify
+
+from app import create_app
+from config import Config
+from extensions import db
+from models import Item
+
+
+def make_app(db_path, items):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + db_path
+        LOG_FILE = None
+
+    app = create_app(BenchConfig)
+    app.logger.setLevel(logging.ERROR)
+    with app.app_context():
+        db.create_all()
+        db.session.execute(db.insert(Item), [{'name': f'item {i}', 'description': 'bench'} for i in range(items)])
+        db.session.commit()
+    return app
+
+
+def legacy_list(app):
+    """What GET /items did before: load every row, then render one body."""
+    with app.test_request_context('/items/'):
+        response = jsonify([item.to_dict() for item in Item.query.all()])
+        return len(response.get_data())
+
+
+def streamed_list(app):
+    response = app.test_client().get('/items/', buffered=False)
+    size = sum(len(chunk) for chunk in response.response)
+    response.close()
+    return size
+
+
+def paged_list(app):
+    client = app.test_client()
+    after_id, size = 0, 0
+    while after_id is not None:
+        response = client.get(f'/items/?limit=1000&after_id={after_id}')
+        size += len(response.data)
+        after_id = response.headers.get('X-Next-After-Id')
+    return size
+
+
+def measure(label, fn, app):
+    # Timed without tracing, which would slow every allocation down
+    start = time.perf_counter()
+    size = fn(app)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn(app)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} {elapsed:7.2f}s {peak / 2**20:9.1f} MiB peak {size / 2**20:8.1f} MiB sent")
+
+
+if __name__ == '__main__':
+    items = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, 'items.db'), items)
+        print(f"{items} items")
+        measure("query.all() + jsonify (old)", legacy_list, app)
+        measure("GET /items (streamed)", streamed_list, app)
+        measure("GET /items?limit=1000 pages", paged_list, app)
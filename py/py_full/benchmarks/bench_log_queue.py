@@ -0,0 +1,117 @@
+# bench_log_queue.py
+# Sends GET /items/<id> (served from the item cache, so logging is a large
+# share of each request) from 16 clients at fixed total rates, with file
+# logging done on the request thread and with LOG_QUEUE under both
+# full-queue policies. Latency is measured from when each request was due,
+# so a stall also counts against the requests queued behind it. Reports the
+# rate achieved, latency percentiles, dropped records and how long the final
+# flush took. A stall > 0 makes each log rotation that many ms slower, as on
+# a slow or network disk.
+#
+# Usage: python benchmarks/bench_log_queue.py [seconds] [stall_ms]
+
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config import Config
+from extensions import db
+from models import Item
+
+ITEMS = 1_000
+CLIENTS = 16
+RATES = [200, 400, 600, 800]
+MODES = [('direct', False, None), ('queue/drop', True, 'drop'), ('queue/block', True, 'block')]
+
+
+def make_app(tmp, log_queue, policy, queue_size):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(tmp, 'items.db')
+        LOG_FILE = os.path.join(tmp, 'logs', 'app.log')
+        LOG_QUEUE = log_queue
+        LOG_QUEUE_FULL = policy or 'drop'
+        LOG_QUEUE_SIZE = queue_size
+
+    # Start from a bare logger: app.logger is shared by every app in the process
+    for handler in list(logging.getLogger('app').handlers):
+        handler.close()
+        logging.getLogger('app').removeHandler(handler)
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        db.session.execute(db.insert(Item), [{'name': f'item {i}', 'description': 'bench'} for i in range(ITEMS)])
+        db.session.commit()
+    return app
+
+
+def worker(app, start, deadline, interval, stats):
+    client = app.test_client()
+    latencies = []
+    due = start + random.random() * interval
+    while due < deadline:
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        client.get(f'/items/{random.randint(1, ITEMS)}')
+        latencies.append(time.perf_counter() - due)
+        due += interval
+    stats.append(latencies)
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def bench(mode, log_queue, policy, rate, seconds, queue_size):
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(tmp, log_queue, policy, queue_size)
+        stats = []
+        start = time.perf_counter()
+        deadline = start + seconds
+        threads = [threading.Thread(target=worker, args=(app, start, deadline, CLIENTS / rate, stats))
+                   for _ in range(CLIENTS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        queue_handler = app.extensions.get('log_queue')
+        dropped = queue_handler.dropped if queue_handler else 0
+        start = time.perf_counter()
+        for handler in list(app.logger.handlers):
+            handler.close()
+            app.logger.removeHandler(handler)
+        flush = time.perf_counter() - start
+        with app.app_context():
+            db.engine.dispose()
+
+    latencies = sorted(lat for s in stats for lat in s)
+    print(f"{mode:>12} {rate:>7} {len(latencies) / seconds:8.0f} "
+          f"{percentile(latencies, 0.5) * 1e3:7.2f} {percentile(latencies, 0.99) * 1e3:7.2f} "
+          f"{percentile(latencies, 0.999) * 1e3:8.2f} {latencies[-1] * 1e3:7.1f} {dropped:8d} {flush * 1e3:8.1f}")
+
+
+if __name__ == '__main__':
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    stall_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 0
+    if stall_ms:
+        do_rollover = RotatingFileHandler.doRollover
+
+        def slow_rollover(self):
+            time.sleep(stall_ms / 1000)
+            do_rollover(self)
+        RotatingFileHandler.doRollover = slow_rollover
+    print(f"{seconds:g}s per run, {CLIENTS} clients, rotation stall {stall_ms:g}ms, "
+          f"queue size {Config.LOG_QUEUE_SIZE}")
+    print(f"{'logging':>12} {'rate':>7} {'req/s':>8} {'p50 ms':>7} {'p99 ms':>7} "
+          f"{'p99.9 ms':>8} {'max ms':>7} {'dropped':>8} {'flush ms':>8}")
+    for rate in RATES:
+        for mode, log_queue, policy in MODES:
+            bench(mode, log_queue, policy, rate, seconds, Config.LOG_QUEUE_SIZE)
@@ -0,0 +1,95 @@
+# bench_log_sampling.py
+# Replays a mix of GET /items/<id> (served from the item cache) with a 404
+# flood on unknown paths, logging to a file, with request-line sampling and
+# the 404 warning rate limit off and on. Reports microseconds, log bytes and
+# lines per request, and the summary line's counts.
+#
+# Usage: python benchmarks/bench_log_sampling.py [requests] [not_found_share]
+
+import gc
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config import Config
+from extensions import db
+from models import Item
+
+ITEMS = 1_000
+CASES = [
+    # label, REQUEST_LOG_SAMPLE, REQUEST_LOG_ERROR_SAMPLE, LOG_RATE_LIMIT
+    ('everything', 1.0, 1.0, 0),
+    ('2xx at 1%', 0.01, 1.0, 0),
+    ('2xx at 1%, 404 warnings 10/s', 0.01, 1.0, 10),
+    ('2xx at 1%, 4xx at 10%, 10/s', 0.01, 0.1, 10),
+]
+
+
+def bench(label, sample, error_sample, rate_limit, paths):
+    with tempfile.TemporaryDirectory() as tmp:
+        class BenchConfig(Config):
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(tmp, 'items.db')
+            LOG_FILE = os.path.join(tmp, 'logs', 'app.log')
+            LOG_SOURCE = False
+            REQUEST_LOG_SAMPLE = sample
+            REQUEST_LOG_ERROR_SAMPLE = error_sample
+            LOG_RATE_LIMIT = rate_limit
+            LOG_SUMMARY_INTERVAL = 1
+
+        for handler in list(logging.getLogger('app').handlers):
+            handler.close()
+            logging.getLogger('app').removeHandler(handler)
+        app = create_app(BenchConfig)
+        with app.app_context():
+            db.create_all()
+            db.session.execute(db.insert(Item), [{'name': f'item {i}', 'description': 'bench'} for i in range(ITEMS)])
+            db.session.commit()
+        client = app.test_client()
+        app.logger.setLevel(logging.ERROR)
+        for i in range(ITEMS):  # warm the item cache
+            client.get(f'/items/{i + 1}')
+        app.logger.setLevel(logging.INFO)
+
+        log_path = BenchConfig.LOG_FILE
+        for handler in app.logger.handlers:
+            handler.flush()
+        size_before, lines_before = os.path.getsize(log_path), sum(1 for _ in open(log_path))
+        gc.collect()
+        start = time.perf_counter()
+        for path in paths:
+            client.get(path)
+        elapsed = time.perf_counter() - start
+        for handler in app.logger.handlers:
+            handler.flush()
+        size = os.path.getsize(log_path) - size_before
+        lines = sum(1 for _ in open(log_path)) - lines_before
+        summaries = sum(1 for line in open(log_path) if 'Suppressed in the last' in line)
+        pending = sum(app.extensions['suppressed_logs'].counts.values())
+        for handler in list(app.logger.handlers):
+            handler.close()
+            app.logger.removeHandler(handler)
+        for log_filter in list(app.logger.filters):
+            app.logger.removeFilter(log_filter)
+        with app.app_context():
+            db.engine.dispose()
+    print(f"{label:<30} {elapsed / len(paths) * 1e6:>7.0f} {size / len(paths):>7.0f} {lines / len(paths):>6.2f} "
+          f"{summaries:>9} {pending:>8}")
+
+
+if __name__ == '__main__':
+    # Few enough that the 'everything' case logs less than the 1 MiB rotation size
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    not_found_share = float(sys.argv[2]) if len(sys.argv) > 2 else 0.2
+    random.seed(1)
+    paths = [f'/nope/{i}' if random.random() < not_found_share else f'/items/{i % ITEMS + 1}'
+             for i in range(requests)]
+    print(f"{requests} requests, {not_found_share:.0%} to unknown paths; summaries every 1s")
+    print(f"{'logging':<30} {'us/req':>7} {'bytes':>7} {'lines':>6} {'summaries':>9} {'pending':>8}")
+    for case in CASES:
+        bench(*case, paths)
@@ -0,0 +1,110 @@
+# bench_request_log.py
+# Times GET /items/<id> (served from the item cache) with logging to a file:
+# the previous separate request/response hook lines, and the single request
+# line from install_request_log as text and JSON, with and without the
+# [in file:line] source location (LOG_SOURCE), and with INFO disabled.
+# Reports microseconds and log bytes and lines per request.
+#
+# Usage: python benchmarks/bench_request_log.py [requests]
+
+import gc
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import current_app, request
+
+from app import create_app
+from config import Config
+from extensions import db
+from models import Item
+
+ITEMS = 1_000
+ROUNDS = 5  # timings are the best round; log sizes come from the first
+CASES = [
+    # label, LOG_FORMAT, LOG_SOURCE, LOG_LEVEL, previous hooks
+    ('before/after hooks, text', 'text', True, 'INFO', True),
+    ('request line, text', 'text', True, 'INFO', False),
+    ('request line, text, no source', 'text', False, 'INFO', False),
+    ('request line, json, no source', 'json', False, 'INFO', False),
+    ('request line, INFO disabled', 'json', False, 'WARNING', False),
+]
+
+
+# --- Previous hooks ---
+def install_separate_hooks(app):
+    app.after_request_funcs[None] = [f for f in app.after_request_funcs[None] if f.__name__ != 'log_request']
+
+    @app.before_request
+    def app_log_request_info():
+        if request.endpoint and 'static' not in request.endpoint:
+            current_app.logger.info(f"App Request: {request.method} {request.path} from {request.remote_addr}")
+
+    @app.after_request
+    def app_log_response_info(response):
+        if request.endpoint and 'static' not in request.endpoint:
+            current_app.logger.info(f"App Response: {request.method} {request.path} - Status {response.status_code}")
+        return response
+
+
+def bench(label, log_format, log_source, log_level, separate_hooks, requests):
+    with tempfile.TemporaryDirectory() as tmp:
+        class BenchConfig(Config):
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(tmp, 'items.db')
+            LOG_FILE = os.path.join(tmp, 'logs', 'app.log')
+            LOG_FORMAT = log_format
+            LOG_SOURCE = log_source
+            LOG_LEVEL = log_level
+
+        for handler in list(logging.getLogger('app').handlers):
+            handler.close()
+            logging.getLogger('app').removeHandler(handler)
+        app = create_app(BenchConfig)
+        if separate_hooks:
+            install_separate_hooks(app)
+        with app.app_context():
+            db.create_all()
+            db.session.execute(db.insert(Item), [{'name': f'item {i}', 'description': 'bench'} for i in range(ITEMS)])
+            db.session.commit()
+        client = app.test_client()
+        app.logger.setLevel(logging.ERROR)
+        for i in range(ITEMS):  # warm the item cache
+            client.get(f'/items/{i + 1}')
+        app.logger.setLevel(log_level)
+
+        log_path = BenchConfig.LOG_FILE
+        best = None
+        for round_number in range(ROUNDS):
+            for handler in app.logger.handlers:
+                handler.flush()
+            size_before, lines_before = os.path.getsize(log_path), sum(1 for _ in open(log_path))
+            gc.collect()
+            start = time.perf_counter()
+            for i in range(requests):
+                client.get(f'/items/{i % ITEMS + 1}')
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+            if round_number == 0:
+                for handler in app.logger.handlers:
+                    handler.flush()
+                size = os.path.getsize(log_path) - size_before
+                lines = sum(1 for _ in open(log_path)) - lines_before
+        for handler in list(app.logger.handlers):
+            handler.close()
+            app.logger.removeHandler(handler)
+        with app.app_context():
+            db.engine.dispose()
+    print(f"{label:<32} {best / requests * 1e6:>8.0f} {size / requests:>8.0f} {lines / requests:>6.1f}")
+
+
+if __name__ == '__main__':
+    # Few enough that one round logs less than the 1 MiB rotation size
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(f"{requests} requests per round, best of {ROUNDS} rounds")
+    print(f"{'logging':<32} {'us/req':>8} {'bytes':>8} {'lines':>6}")
+    for case in CASES:
+        bench(*case, requests)
@@ -0,0 +1,97 @@
+# bench_sqlite_profiles.py
+# Runs concurrent readers (GET /items/<id>) and writers (PUT /items/<id>)
+# against a fresh SQLite file for each SQLITE_PROFILE, and reports
+# throughput, latency and failed requests (e.g. "database is locked").
+#
+# Usage: python benchmarks/bench_sqlite_profiles.py [seconds] [readers] [writers]
+
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config import Config
+from extensions import db
+from models import Item
+from sqlite_profile import SQLITE_PROFILES
+
+ITEMS = 10_000
+
+
+def make_app(db_path, profile):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + db_path
+        SQLITE_PROFILE = profile
+        LOG_FILE = None
+
+    app = create_app(BenchConfig)
+    app.logger.setLevel(logging.CRITICAL)
+    with app.app_context():
+        db.create_all()
+        db.session.execute(db.insert(Item), [{'name': f'item {i}', 'description': 'bench'} for i in range(ITEMS)])
+        db.session.commit()
+    return app
+
+
+def worker(app, write, deadline, stats):
+    client = app.test_client()
+    headers = {'X-API-Key': app.config['EXPECTED_API_KEY']}
+    ok = failed = 0
+    latencies = []
+    while time.perf_counter() < deadline:
+        item_id = random.randint(1, ITEMS)
+        start = time.perf_counter()
+        if write:
+            response = client.put(f'/items/{item_id}', json={'description': f'v{random.random()}'}, headers=headers)
+        else:
+            response = client.get(f'/items/{item_id}')
+        latencies.append(time.perf_counter() - start)
+        if response.status_code == 200:
+            ok += 1
+        else:
+            failed += 1
+    stats.append((write, ok, failed, latencies))
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def bench(profile, seconds, readers, writers):
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, 'items.db'), profile)
+        stats = []
+        deadline = time.perf_counter() + seconds
+        threads = [threading.Thread(target=worker, args=(app, i < writers, deadline, stats))
+                   for i in range(readers + writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        with app.app_context():
+            db.engine.dispose()
+
+    for write in (False, True):
+        rows = [s for s in stats if s[0] == write]
+        ok = sum(s[1] for s in rows)
+        failed = sum(s[2] for s in rows)
+        latencies = [lat for s in rows for lat in s[3]]
+        print(f"{profile:>11} {'PUT' if write else 'GET':>4} {ok / seconds:9.0f} {failed:7d} "
+              f"{percentile(latencies, 0.5) * 1e3:8.2f} {percentile(latencies, 0.99) * 1e3:8.2f}")
+
+
+if __name__ == '__main__':
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    writers = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    print(f"{readers} readers, {writers} writers, {seconds:g}s per profile")
+    print(f"{'profile':>11} {'op':>4} {'ok/s':>9} {'failed':>7} {'p50 ms':>8} {'p99 ms':>8}")
+    for profile in SQLITE_PROFILES:
+        bench(profile, seconds, readers, writers)
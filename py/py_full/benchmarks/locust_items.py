@@ -0,0 +1,63 @@
+# locust_items.py
+# Load test for the /items blueprint, to compare ITEMS_BLUEPRINT=sync with
+# ITEMS_BLUEPRINT=async. Give both runs the same cores: same gunicorn
+# worker and thread counts, and the same Locust user count and spawn rate.
+#
+# Usage (from py/py_full):
+#   python -c "from app import create_app; from extensions import db; app = create_app(); app.app_context().push(); db.create_all()"
+#   ITEMS_BLUEPRINT=sync  gunicorn -w 2 --threads 8 -b 127.0.0.1:8080 'app:create_app()'
+#   locust -f benchmarks/locust_items.py --headless -u 50 -r 10 -t 60s --host http://127.0.0.1:8080 --csv sync
+#   (stop gunicorn, then repeat with ITEMS_BLUEPRINT=async and --csv async)
+#
+# Flask runs async views in a worker thread like any other view, so use the
+# same --threads for both; the async blueprint changes how the database
+# work is done, not how many requests a worker can hold.
+
+import os
+import random
+import uuid
+
+from locust import HttpUser, between, task
+
+API_KEY = os.getenv("API_KEY", "your_super_secret_api_key")
+
+
+class ItemsUser(HttpUser):
+    wait_time = between(0.05, 0.25)
+
+    def on_start(self):
+        self.headers = {"X-API-Key": API_KEY}
+        self.item_ids = []
+        for _ in range(5):
+            self.create_item()
+
+    @task(2)
+    def create_item(self):
+        payload = {"name": f"locust-{uuid.uuid4().hex}", "description": "created by locust"}
+        with self.client.post("/items/", json=payload, headers=self.headers,
+                              catch_response=True, name="/items/ [POST]") as response:
+            if response.status_code == 201:
+                self.item_ids.append(response.json()["id"])
+            else:
+                response.failure(f"POST failed with status {response.status_code}: {response.text[:100]}")
+
+    @task(10)
+    def get_item(self):
+        if self.item_ids:
+            self.client.get(f"/items/{random.choice(self.item_ids)}", name="/items/<id> [GET]")
+
+    @task(3)
+    def get_page(self):
+        self.client.get("/items/?limit=50", name="/items/?limit=50 [GET]")
+
+    @task(3)
+    def update_item(self):
+        if self.item_ids:
+            self.client.put(f"/items/{random.choice(self.item_ids)}", json={"description": uuid.uuid4().hex},
+                            headers=self.headers, name="/items/<id> [PUT]")
+
+    @task(1)
+    def delete_item(self):
+        if len(self.item_ids) > 5:
+            item_id = self.item_ids.pop(random.randrange(len(self.item_ids)))
+            self.client.delete(f"/items/{item_id}", name="/items/<id> [DELETE]")
@@ -0,0 +1,223 @@
+# cache.py
+import threading
+import time
+from collections import OrderedDict
+from itertools import chain
+
+from sqlalchemy import event
+
+# Returned by CacheBackend.get when it holds nothing for a key
+MISS = object()
+# Stored for keys the loader found nothing for (negative caching)
+_ABSENT = object()
+
+
+# --- Backends ---
+class CacheBackend:
+    """Storage behind ReadThroughCache. Subclass this to plug in another store."""
+
+    def get(self, key):
+        """Returns the value stored for key, or MISS."""
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self):
+        return {}
+
+
+class LRUCacheBackend(CacheBackend):
+    """In-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries=10_000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISS
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return MISS
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {'entries': len(self._entries), 'max_entries': self.max_entries, 'evictions': self._evictions}
+
+
+class NullCacheBackend(CacheBackend):
+    """Caches nothing; every lookup goes to the loader."""
+
+    def get(self, key):
+        return MISS
+
+    def set(self, key, value, ttl):
+        pass
+
+    def delete(self, key):
+        pass
+
+    def clear(self):
+        pass
+
+
+CACHE_BACKENDS = {
+    'lru': lambda config: LRUCacheBackend(config['ITEM_CACHE_MAX_ENTRIES']),
+    'null': lambda config: NullCacheBackend(),
+}
+
+
+# --- Read-through cache ---
+class ReadThroughCache:
+    """Read-through cache of one model's rows, kept in step with the session.
+
+    Only values read from committed rows are ever stored. Rows of the model
+    that a session flushes are invalidated right away and again once the
+    transaction commits or rolls back, so a failed commit never leaves
+    anything behind. A load that overlaps any invalidation is not stored:
+    it may have read the row just before the write committed.
+    """
+
+    def __init__(self):
+        self.backend = NullCacheBackend()
+        self.ttl = 0
+        self.negative_ttl = 0
+        self._model = None
+        self._lock = threading.Lock()
+        self._invalidations = 0
+        self._hits = 0
+        self._negative_hits = 0
+        self._misses = 0
+
+    def init_app(self, app, session, model):
+        config = app.config
+        backend_name = config.get('ITEM_CACHE_BACKEND', 'lru')
+        if backend_name not in CACHE_BACKENDS:
+            raise ValueError(f"Unknown ITEM_CACHE_BACKEND '{backend_name}'. Choose from: {', '.join(CACHE_BACKENDS)}")
+        self.backend = CACHE_BACKENDS[backend_name](config)
+        self.ttl = config.get('ITEM_CACHE_TTL', 60)
+        self.negative_ttl = config.get('ITEM_CACHE_NEGATIVE_TTL', 5)
+        self._model = model
+        with self._lock:
+            self._invalidations = self._hits = self._negative_hits = self._misses = 0
+        self.watch(session)
+        app.logger.info(f"Item cache: backend '{backend_name}', ttl {self.ttl}s, negative ttl {self.negative_ttl}s")
+
+    def watch(self, session):
+        """Invalidates on writes made through ``session`` (a session, scoped
+        session or Session class)."""
+        for name, listener in (('after_flush', self._after_flush),
+                               ('after_commit', self._after_end),
+                               ('after_rollback', self._after_end)):
+            if not event.contains(session, name, listener):
+                event.listen(session, name, listener)
+
+    # --- Reads ---
+    def get(self, key, loader):
+        """Returns the cached value for key, calling ``loader(key)`` on a miss.
+
+        A loader result of None is cached for negative_ttl seconds.
+        """
+        value, started_at = self._lookup(key)
+        if started_at is None:
+            return value
+        value = loader(key)
+        self._fill(key, value, started_at)
+        return value
+
+    async def aget(self, key, loader):
+        """As get, for a coroutine ``loader``."""
+        value, started_at = self._lookup(key)
+        if started_at is None:
+            return value
+        value = await loader(key)
+        self._fill(key, value, started_at)
+        return value
+
+    def _lookup(self, key):
+        """Returns (value, None) on a hit, else (None, invalidation count to pass to _fill)."""
+        value = self.backend.get(key)
+        with self._lock:
+            if value is MISS:
+                self._misses += 1
+                return None, self._invalidations
+            if value is _ABSENT:
+                self._negative_hits += 1
+                return None, None
+            self._hits += 1
+            return value, None
+
+    def _fill(self, key, value, started_at):
+        with self._lock:
+            if self._invalidations == started_at:
+                if value is None:
+                    self.backend.set(key, _ABSENT, self.negative_ttl)
+                else:
+                    self.backend.set(key, value, self.ttl)
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._negative_hits + self._misses
+            stats = {
+                'hits': self._hits,
+                'negative_hits': self._negative_hits,
+                'misses': self._misses,
+                'hit_rate': (self._hits + self._negative_hits) / lookups if lookups else 0.0,
+                'invalidations': self._invalidations,
+            }
+        stats.update(self.backend.stats())
+        return stats
+
+    # --- Invalidation ---
+    def invalidate(self, *keys):
+        with self._lock:
+            self._invalidations += 1
+            for key in keys:
+                self.backend.delete(key)
+
+    def mark_changed(self, session, *keys):
+        """Invalidates keys now and again when session's transaction ends.
+
+        For writes the ORM does not track, e.g. Core insert/update/delete.
+        """
+        self.invalidate(*keys)
+        session.info.setdefault('read_through_cache_keys', set()).update(keys)
+
+    def _after_flush(self, session, flush_context):
+        keys = [obj.id for obj in chain(session.new, session.dirty, session.deleted)
+                if isinstance(obj, self._model)]
+        if keys:
+            self.mark_changed(session, *keys)
+
+    def _after_end(self, session):
+        keys = session.info.pop('read_through_cache_keys', None)
+        if keys:
+            self.invalidate(*keys)
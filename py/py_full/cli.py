@@ -0,0 +1,157 @@
+# cli.py
+import gzip
+import io
+import sys
+import time
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from marshmallow import ValidationError
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models import Item
+from routes import ITEM_COLUMNS, row_dicts
+from schemas import item_create_schema
+
+# flask items export / flask items import
+items_cli = AppGroup('items', help="Bulk export and import of items as NDJSON (one JSON object per line).")
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+# --- Helpers ---
+def open_output(path, compress):
+    """Text stream for path ('-' is stdout), gzip-compressed if asked or the name ends in .gz."""
+    raw = sys.stdout.buffer if path == '-' else open(path, 'wb')
+    if compress or (compress is None and path.endswith('.gz')):
+        raw = gzip.GzipFile(fileobj=raw, mode='wb')
+    return io.TextIOWrapper(raw, encoding='utf-8', newline='\n')
+
+
+def open_input(path):
+    """Text stream for path ('-' is stdin), decompressed if it is gzip."""
+    raw = sys.stdin.buffer if path == '-' else open(path, 'rb')
+    if raw.peek(2)[:2] == GZIP_MAGIC:
+        raw = gzip.GzipFile(fileobj=raw, mode='rb')
+    return io.TextIOWrapper(raw, encoding='utf-8')
+
+
+class Progress:
+    """Reports a running count and rate on stderr, at most once a second."""
+
+    def __init__(self, verb):
+        self.verb = verb
+        self.count = 0
+        self.started = self._reported = time.perf_counter()
+
+    def add(self, count):
+        self.count += count
+        now = time.perf_counter()
+        if now - self._reported >= 1:
+            self._reported = now
+            self.report()
+
+    def report(self, final=False):
+        elapsed = time.perf_counter() - self.started
+        rate = self.count / elapsed if elapsed else 0
+        click.echo(f"{self.verb} {self.count} items in {elapsed:.1f}s ({rate:,.0f} items/s){'' if final else '...'}",
+                   err=True)
+
+
+def parse_line(line, line_number, keep_ids):
+    """One NDJSON line as an insert row; raises click.ClickException if it is not a valid item."""
+    try:
+        record = current_app.json.loads(line)
+        item_id = record.pop('id', None) if isinstance(record, dict) else None
+        row = item_create_schema.load(record)
+    except (ValueError, ValidationError) as e:
+        details = e.messages if isinstance(e, ValidationError) else e
+        raise click.ClickException(f"Line {line_number}: not a valid item: {details}")
+    # bool is an int subclass: {"id": true} would otherwise import as id 1
+    if item_id is not None and type(item_id) is not int:
+        raise click.ClickException(f"Line {line_number}: id must be an integer.")
+    row['id'] = item_id if keep_ids else None
+    return row
+
+
+# --- Commands ---
+@items_cli.command('export')
+@click.argument('path', default='-')
+@click.option('--gzip/--no-gzip', 'compress', default=None,
+              help="Compress the output. Default: only when PATH ends in .gz.")
+@click.option('--chunk-size', type=click.IntRange(min=1), default=None,
+              help="Rows fetched per round trip. Default: ITEMS_STREAM_CHUNK.")
+def export_items(path, compress, chunk_size):
+    """Writes every item to PATH (default stdout) as NDJSON, in id order."""
+    chunk_size = chunk_size or current_app.config['ITEMS_STREAM_CHUNK']
+    dumps = current_app.json.dumps
+    progress = Progress('Exported')
+    # yield_per streams rows off a server-side cursor instead of loading the table
+    result = db.session.execute(
+        db.select(*ITEM_COLUMNS).order_by(Item.id).execution_options(yield_per=chunk_size)
+    )
+    keys = tuple(result.keys())
+    with open_output(path, compress) as out:
+        for rows in result.partitions():
+            out.write(''.join(dumps(row, separators=(',', ':')) + '\n' for row in row_dicts(keys, rows)))
+            progress.add(len(rows))
+    progress.report(final=True)
+
+
+@items_cli.command('import')
+@click.argument('path', default='-')
+@click.option('--chunk-size', type=click.IntRange(min=1), default=None,
+              help="Items inserted per transaction. Default: ITEMS_IMPORT_CHUNK.")
+@click.option('--keep-ids/--new-ids', default=True,
+              help="Keep the ids in the file (the default) or let the database assign new ones.")
+@click.option('--skip-existing', is_flag=True,
+              help="Skip items whose id or name already exists instead of stopping.")
+def import_items(path, chunk_size, keep_ids, skip_existing):
+    """Inserts the items in an NDJSON file (plain or gzip; default stdin).
+
+    Each chunk is committed on its own, so when a line is invalid or an item
+    already exists, the chunks before it stay imported.
+    """
+    chunk_size = chunk_size or current_app.config['ITEMS_IMPORT_CHUNK']
+    # Core inserts against the table, so the result carries a rowcount
+    statement = db.insert(Item.__table__)
+    if skip_existing:
+        statement = sqlite_insert(Item.__table__).on_conflict_do_nothing()
+    progress = Progress('Imported')
+    inserted = 0
+
+    def flush(rows, first_line, last_line):
+        nonlocal inserted
+        try:
+            result = db.session.execute(statement, rows)
+            db.session.commit()
+        except IntegrityError as e:
+            db.session.rollback()
+            raise click.ClickException(
+                f"Lines {first_line}-{last_line}: {e.orig}. "
+                f"{inserted} items were imported before them; use --skip-existing to skip duplicates."
+            )
+        inserted += len(rows) if result.rowcount < 0 else result.rowcount
+        progress.add(len(rows))
+
+    with open_input(path) as lines:
+        # first_line and last_line are file line numbers, blank lines included
+        rows, first_line, last_line = [], 1, 1
+        for line_number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            if not rows:
+                first_line = line_number
+            rows.append(parse_line(line, line_number, keep_ids))
+            last_line = line_number
+            if len(rows) >= chunk_size:
+                flush(rows, first_line, last_line)
+                rows = []
+        if rows:
+            flush(rows, first_line, last_line)
+    progress.report(final=True)
+    if skip_existing:
+        click.echo(f"Inserted {inserted} new items; {progress.count - inserted} already existed.", err=True)
@@ -13,9 +13,89 @@ class Config:
         'sqlite:///' + os.path.join(basedir, 'items.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # SQLite Performance Configuration
+    # One of sqlite_profile.SQLITE_PROFILES: 'durable' (WAL, fsync on every
+    # commit, larger pool), 'production' (as durable with synchronous=NORMAL:
+    # faster commits, but the last ones can be lost on power failure) or
+    # 'default' (SQLite as shipped)
+    SQLITE_PROFILE = os.environ.get('SQLITE_PROFILE') or 'durable'
+    # Per-pragma overrides of the profile, e.g. {'synchronous': 'NORMAL'}
+    SQLITE_PRAGMAS = {}
+
+    # Blueprint Configuration
+    # 'sync' serves /items with Flask-SQLAlchemy (routes.py); 'async' serves
+    # the same routes with SQLAlchemy's asyncio engine on aiosqlite (async_routes.py)
+    ITEMS_BLUEPRINT = os.environ.get('ITEMS_BLUEPRINT') or 'sync'
+
+    # Write Configuration
+    # Group commit: single-item writes are queued to one writer thread, which
+    # commits everything queued (at most ITEMS_GROUP_COMMIT_MAX) in one
+    # transaction. Writes arriving during a commit form the next group; a
+    # window > 0 also waits that long for more, which only pays off when
+    # commits are much slower than the window
+    ITEMS_GROUP_COMMIT = os.environ.get('ITEMS_GROUP_COMMIT', 'false').lower() == 'true'
+    ITEMS_GROUP_COMMIT_WINDOW_MS = float(os.environ.get('ITEMS_GROUP_COMMIT_WINDOW_MS', 0))
+    ITEMS_GROUP_COMMIT_MAX = int(os.environ.get('ITEMS_GROUP_COMMIT_MAX', 256))
+    # Seconds a request waits for its write before answering 503
+    ITEMS_GROUP_COMMIT_TIMEOUT = float(os.environ.get('ITEMS_GROUP_COMMIT_TIMEOUT', 30))
+
+    # Bulk Insert Configuration
+    # Most items accepted by one POST /items/batch request
+    ITEMS_BATCH_MAX = int(os.environ.get('ITEMS_BATCH_MAX', 100_000))
+
+    # Bulk Import Configuration
+    # Items inserted per transaction by `flask items import`
+    ITEMS_IMPORT_CHUNK = int(os.environ.get('ITEMS_IMPORT_CHUNK', 10_000))
+
+    # Item Cache Configuration
+    # Backend from cache.CACHE_BACKENDS ('lru', or 'null' to disable); values
+    # live ITEM_CACHE_TTL seconds, 404s ITEM_CACHE_NEGATIVE_TTL seconds
+    ITEM_CACHE_BACKEND = os.environ.get('ITEM_CACHE_BACKEND') or 'lru'
+    ITEM_CACHE_MAX_ENTRIES = int(os.environ.get('ITEM_CACHE_MAX_ENTRIES', 10_000))
+    ITEM_CACHE_TTL = float(os.environ.get('ITEM_CACHE_TTL', 60))
+    ITEM_CACHE_NEGATIVE_TTL = float(os.environ.get('ITEM_CACHE_NEGATIVE_TTL', 5))
+
+    # Listing Configuration
+    # GET /items?limit=&after_id= page sizes, and rows fetched per round trip
+    # when GET /items streams the whole table
+    ITEMS_PAGE_DEFAULT = int(os.environ.get('ITEMS_PAGE_DEFAULT', 100))
+    ITEMS_PAGE_MAX = int(os.environ.get('ITEMS_PAGE_MAX', 1000))
+    ITEMS_STREAM_CHUNK = int(os.environ.get('ITEMS_STREAM_CHUNK', 1000))
+
+    # JSON Configuration
+    # Provider from json_provider.JSON_PROVIDERS used by jsonify and the error
+    # handlers: 'orjson', 'stdlib', or 'auto' (orjson when installed)
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER') or 'auto'
+
+    # Metrics Configuration
+    # Request counts, in-flight gauges and latency histograms per endpoint,
+    # plus cache and writer counters, in the Prometheus text format
+    METRICS_PATH = os.environ.get('METRICS_PATH') or '/metrics'
+
     # Logging Configuration
     LOG_FILE = os.environ.get('LOG_FILE') or os.path.join(basedir, 'app.log')
     LOG_LEVEL = 'DEBUG' if DEBUG else 'INFO'
+    # 'text' or 'json' (one JSON object per line, request fields as keys).
+    # LOG_SOURCE=false drops the [in file:line] location from each line
+    LOG_FORMAT = os.environ.get('LOG_FORMAT') or 'text'
+    LOG_SOURCE = os.environ.get('LOG_SOURCE', 'true').lower() == 'true'
+    # Sampling: the share of request lines written for statuses below 400
+    # (e.g. 0.01) and from 400 up. Client-error warnings (400/401/404) are
+    # limited per kind to a burst of LOG_RATE_BURST, then LOG_RATE_LIMIT per
+    # second (0: no limit). A summary of what was left out is logged at most
+    # every LOG_SUMMARY_INTERVAL seconds
+    REQUEST_LOG_SAMPLE = float(os.environ.get('REQUEST_LOG_SAMPLE', 1.0))
+    REQUEST_LOG_ERROR_SAMPLE = float(os.environ.get('REQUEST_LOG_ERROR_SAMPLE', 1.0))
+    LOG_RATE_LIMIT = float(os.environ.get('LOG_RATE_LIMIT', 0))
+    LOG_RATE_BURST = int(os.environ.get('LOG_RATE_BURST', 20))
+    LOG_SUMMARY_INTERVAL = float(os.environ.get('LOG_SUMMARY_INTERVAL', 60))
+    # Queued logging: request threads only put records on a bounded queue of
+    # LOG_QUEUE_SIZE and one listener thread formats and writes them. When the
+    # queue is full, 'drop' discards the record (counted, and reported in the
+    # log once there is room) and 'block' waits for room
+    LOG_QUEUE = os.environ.get('LOG_QUEUE', 'false').lower() == 'true'
+    LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', 10_000))
+    LOG_QUEUE_FULL = os.environ.get('LOG_QUEUE_FULL') or 'drop'
 
     # Auth Configuration
     # Use environment variable for API key in production!
@@ -2,8 +2,19 @@
 
 from flask import jsonify, current_app, request
 
+# Bodies that never change are serialized once, by the app's JSON provider,
+# when the handlers are registered
+STATIC_ERROR_BODIES = {
+    500: {"error": "internal_server_error", "message": "An unexpected error occurred on the server."},
+}
+
+def static_error_response(status):
+    body = current_app.extensions['static_error_bodies'][status]
+    return current_app.response_class(body, status=status, mimetype=current_app.json.mimetype)
+
 # --- Error Handlers ---
-# (Handlers remain the same as before)
+# Client-error warnings carry a rate_key, so a flood of them can be rate
+# limited per kind (LOG_RATE_LIMIT, see request_log.LogRateLimiter)
 def handle_bad_request(error):
     messages = getattr(error, 'description', "Invalid request.")
     error_payload = { "error": "bad_request" }
@@ -18,7 +29,7 @@ def handle_bad_request(error):
     else:
         error_payload["message"] = "Invalid request."
         log_message += " - No specific description provided."
-    current_app.logger.warning(log_message) # Use current_app logger
+    current_app.logger.warning(log_message, extra={'rate_key': 'bad_request'}) # Use current_app logger
     response = jsonify(error_payload)
     response.status_code = 400
     return response
@@ -26,7 +37,8 @@ def handle_bad_request(error):
 def handle_unauthorized(error):
     message = getattr(error, 'description', "Authentication credentials were not provided or are invalid.")
     error_payload = {"error": "unauthorized", "message": message}
-    current_app.logger.warning(f"Unauthorized (401): {request.method} {request.path} - {message}")
+    current_app.logger.warning(f"Unauthorized (401): {request.method} {request.path} - {message}",
+                               extra={'rate_key': 'unauthorized'})
     response = jsonify(error_payload)
     response.status_code = 401
     response.headers['WWW-Authenticate'] = 'API-Key realm="Items API"'
@@ -36,7 +48,8 @@ def handle_not_found(error):
     message = error.description if hasattr(error, 'description') else "Resource not found."
     response = jsonify({"error": "not_found", "message": message})
     response.status_code = 404
-    current_app.logger.warning(f"Not Found (404): {request.method} {request.path} - {message}")
+    current_app.logger.warning(f"Not Found (404): {request.method} {request.path} - {message}",
+                               extra={'rate_key': 'not_found'})
     return response
 
 def handle_internal_server_error(error):
@@ -46,14 +59,26 @@ def handle_internal_server_error(error):
         f"Internal Server Error (500): {request.method} {request.path} - Desc: {description}",
         exc_info=error
     )
-    response = jsonify({"error": "internal_server_error", "message": "An unexpected error occurred on the server."})
-    response.status_code = 500
+    return static_error_response(500)
+
+def handle_service_unavailable(error):
+    message = getattr(error, 'description', "The service is temporarily unavailable.")
+    current_app.logger.error(f"Service Unavailable (503): {request.method} {request.path} - {message}")
+    response = jsonify({"error": "service_unavailable", "message": message})
+    response.status_code = 503
     return response
 
 # --- Registration Function ---
 def register_error_handlers(app):
-    """Registers the error handler functions with the Flask app."""
+    """Registers the error handler functions with the Flask app.
+
+    Call after the JSON provider is configured: static bodies are encoded here.
+    """
+    app.extensions['static_error_bodies'] = {
+        status: app.json.response(body).get_data() for status, body in STATIC_ERROR_BODIES.items()
+    }
     app.register_error_handler(400, handle_bad_request)
     app.register_error_handler(401, handle_unauthorized)
     app.register_error_handler(404, handle_not_found)
     app.register_error_handler(500, handle_internal_server_error)
+    app.register_error_handler(503, handle_service_unavailable)
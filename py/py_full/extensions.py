@@ -0,0 +1,15 @@
+# extensions.py
+from flask_sqlalchemy import SQLAlchemy
+
+from cache import ReadThroughCache
+from item_writer import ItemWriter
+from metrics import Metrics
+
+# Initialize extensions here but don't associate with an app instance yet
+db = SQLAlchemy()
+# Read-through cache of Item rows for GET /items/<id>
+item_cache = ReadThroughCache()
+# Commits item writes, per request or grouped (ITEMS_GROUP_COMMIT)
+item_writer = ItemWriter()
+# Request counts and latency histograms, served at /metrics
+metrics = Metrics()
@@ -1,5 +0,0 @@
-# extensions.py
-from flask_sqlalchemy import SQLAlchemy
-
-# Initialize extensions here but don't associate with an app instance yet
-db = SQLAlchemy()
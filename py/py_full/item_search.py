@@ -0,0 +1,97 @@
+# item_search.py
+from sqlalchemy import column, event, inspect, select, table
+
+from models import Item
+
+# --- Full-Text Index ---
+# An external-content FTS5 table: it stores only the index and reads name and
+# description back from the item table. Triggers keep it in step with every
+# write, including Core inserts and SQL run outside the ORM.
+SEARCH_TABLE = 'item_fts'
+
+SEARCH_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+        name, description,
+        content='{Item.__tablename__}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_ai AFTER INSERT ON {Item.__tablename__} BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_ad AFTER DELETE ON {Item.__tablename__} BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_au AFTER UPDATE OF name, description ON {Item.__tablename__} BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {SEARCH_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+]
+
+# bm25 with a name match weighted 10x a description match. Stored as the
+# table's default rank so ORDER BY rank can use FTS5's ranked scan.
+SEARCH_RANK = 'bm25(10.0, 1.0)'
+
+item_fts = table(SEARCH_TABLE, column('rowid'), column('rank'), column(SEARCH_TABLE))
+
+
+def ensure_item_search(connection):
+    """Creates the index and its triggers if missing, filling the index from
+    existing rows. Returns False when the database is not SQLite or the item
+    table does not exist yet."""
+    if connection.dialect.name != 'sqlite':
+        return False
+    tables = inspect(connection).get_table_names()
+    if Item.__tablename__ not in tables:
+        return False
+    if SEARCH_TABLE in tables:
+        # The triggers go with the item table when models.ensure_item_autoincrement rebuilds it
+        for statement in SEARCH_DDL[1:]:
+            connection.exec_driver_sql(statement)
+        return True
+    for statement in SEARCH_DDL:
+        connection.exec_driver_sql(statement)
+    connection.exec_driver_sql(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rank) VALUES ('rank', '{SEARCH_RANK}')")
+    connection.exec_driver_sql(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')")
+    return True
+
+
+@event.listens_for(Item.__table__, 'after_create')
+def create_item_search(target, connection, **kw):
+    ensure_item_search(connection)
+
+
+def install_item_search(app, engine):
+    """Sets up the index on an existing database; db.create_all() sets it up
+    on a new one."""
+    with engine.begin() as connection:
+        enabled = ensure_item_search(connection)
+    app.logger.info(f"Item search index: {'ready' if enabled else 'not available until the item table exists (SQLite only)'}")
+
+
+# --- Queries ---
+def fts_query(text):
+    """Turns user input into an FTS5 query that matches every term.
+
+    Terms are quoted so FTS5 operators and punctuation are taken literally;
+    a trailing '*' keeps its meaning as a prefix match. Returns None if
+    there is nothing to search for.
+    """
+    terms = []
+    for term in text.split():
+        prefix = term.endswith('*')
+        term = term.rstrip('*')
+        if term:
+            terms.append('"' + term.replace('"', '""') + '"' + ('*' if prefix else ''))
+    return ' '.join(terms) or None
+
+
+def search_statement(query, limit, offset, columns=(Item.id, Item.name, Item.description)):
+    """Selects ``columns`` of the items matching an fts_query(), best first."""
+    return (
+        select(*columns)
+        .join(item_fts, item_fts.c.rowid == Item.id)
+        .where(item_fts.c[SEARCH_TABLE].match(query))
+        .order_by(item_fts.c.rank)
+        .limit(limit)
+        .offset(offset)
+    )
@@ -0,0 +1,190 @@
+# item_writer.py
+import atexit
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, TimeoutError
+
+from werkzeug.exceptions import ServiceUnavailable
+
+
+class ItemWriter:
+    """Commits item writes: functions that change db.session and flush, but
+    leave the commit to the writer.
+
+    By default a write is committed by the request that made it. With
+    ITEMS_GROUP_COMMIT on, writes are handed to one writer thread instead.
+    It takes every write already queued (those that arrived during the
+    previous commit), optionally waits ITEMS_GROUP_COMMIT_WINDOW_MS for more,
+    runs each in its own SAVEPOINT and commits the group as one transaction. So concurrent requests share one
+    commit (on SQLite, one turn of the write lock and at most one fsync)
+    instead of queueing for their own. A write that raises rolls back only
+    its savepoint and its request gets the exception; if the commit itself
+    fails, every request in the group gets that error.
+
+    A request waits at most ITEMS_GROUP_COMMIT_TIMEOUT seconds for its
+    write, then gets a 503 (ServiceUnavailable); a write still queued by
+    then is dropped. At exit, stop() commits whatever is still queued.
+    """
+
+    def __init__(self):
+        self.db = None
+        self.group_commit = False
+        self.window = 0
+        self.max_group = 1
+        self.timeout = None
+        self._queue = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._groups = 0
+        self._writes = 0
+
+    def init_app(self, app, db):
+        self.stop()
+        self.db = db
+        self.group_commit = app.config.get('ITEMS_GROUP_COMMIT', False)
+        self.window = app.config.get('ITEMS_GROUP_COMMIT_WINDOW_MS', 0) / 1000
+        self.max_group = app.config.get('ITEMS_GROUP_COMMIT_MAX', 256)
+        self.timeout = app.config.get('ITEMS_GROUP_COMMIT_TIMEOUT', 30)
+        if self.group_commit:
+            self._queue = queue.SimpleQueue()
+            self._thread = threading.Thread(target=self._run, args=(app, self._queue), name='item-writer', daemon=True)
+            self._thread.start()
+            # The thread is a daemon, so without this the writes still queued
+            # when the process exits would be lost
+            atexit.unregister(self.stop)
+            atexit.register(self.stop)
+            app.logger.info(f"Item writes: group commit, window {self.window * 1000:g}ms, up to {self.max_group} per group")
+
+    def run(self, write, *args):
+        """Returns write(*args) once its changes are committed, or raises what it raised."""
+        if not self.group_commit:
+            try:
+                result = write(*args)
+                self.db.session.commit()
+            except BaseException:
+                self.db.session.rollback()
+                raise
+            return result
+        thread, jobs = self._thread, self._queue
+        if thread is None or not thread.is_alive():
+            raise ServiceUnavailable("The item writer is not running.")
+        future = Future()
+        jobs.put((future, write, args))
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            # Only a write the writer has not started yet can be called off
+            if future.cancel():
+                raise ServiceUnavailable("Timed out waiting for the item writer; the write was not applied.")
+            raise ServiceUnavailable("Timed out waiting for the item writer; the write may still be applied.")
+
+    def stop(self):
+        """Commits the writes queued so far and stops the writer thread,
+        waiting for it at most ITEMS_GROUP_COMMIT_TIMEOUT seconds."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(self.timeout)
+            self._queue = self._thread = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'group_commit': self.group_commit,
+                'groups': self._groups,
+                'writes': self._writes,
+                'mean_group_size': self._writes / self._groups if self._groups else 0.0,
+            }
+
+    # --- Writer thread ---
+    def _run(self, app, jobs):
+        with app.app_context():
+            running = True
+            while running:
+                group, running = self._next_group(jobs)
+                if not group:
+                    continue
+                # Nothing a group does may end the loop: every later write
+                # would wait for a dead thread and time out
+                try:
+                    self._commit_group(group, app.logger)
+                except Exception as e:
+                    app.logger.error(f"Item writer failed on a group of {len(group)} writes: {e}", exc_info=True)
+                    for future, write, args in group:
+                        settle(future, error=e)
+
+    def _next_group(self, jobs):
+        """Returns (writes to commit together, False once stop() was called)."""
+        job = jobs.get()
+        if job is None:
+            return [], False
+        group = [job]
+        deadline = time.monotonic() + self.window
+        while len(group) < self.max_group:
+            try:
+                job = jobs.get_nowait()
+            except queue.Empty:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    job = jobs.get(timeout=timeout)
+                except queue.Empty:
+                    break
+            if job is None:
+                return group, False
+            group.append(job)
+        return group, True
+
+    def _commit_group(self, group, logger):
+        session = self.db.session
+        outcomes = []
+        try:
+            if session.get_bind().dialect.name == 'sqlite':
+                # pysqlite opens no transaction before a SAVEPOINT, which would
+                # make releasing the first one commit; BEGIN IMMEDIATE gives
+                # the group one outer transaction and takes the write lock now
+                session.connection().exec_driver_sql('BEGIN IMMEDIATE')
+            for future, write, args in group:
+                if not future.set_running_or_notify_cancel():
+                    continue  # its request timed out and gave up on it
+                try:
+                    with session.begin_nested():
+                        result = write(*args)
+                except Exception as e:
+                    outcomes.append((future, None, e))
+                else:
+                    outcomes.append((future, result, None))
+            session.commit()
+        except Exception as e:
+            try:
+                session.rollback()
+            except Exception as rollback_error:
+                # remove() below still discards the session and its connection
+                logger.error(f"Item writer could not roll back a failed group: {rollback_error}")
+            for future, write, args in group:
+                settle(future, error=e)
+            return
+        finally:
+            try:
+                self.db.session.remove()
+            except Exception as e:
+                logger.error(f"Item writer could not release its session: {e}")
+
+        with self._lock:
+            self._groups += 1
+            self._writes += len(outcomes)
+        for future, result, error in outcomes:
+            settle(future, result, error)
+
+
+def settle(future, result=None, error=None):
+    """Hands a write's outcome to its request, unless the request has
+    cancelled the write (it timed out before the write started)."""
+    try:
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(error)
+    except InvalidStateError:
+        pass  # cancelled by its request after timing out, or settled already
@@ -1,18 +1,114 @@
 # logging_config.py
+import atexit
+import copy
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import os
+import queue
+
+from request_log import make_log_formatter
+
+# What a LogQueueHandler does with a record when the queue is full
+LOG_QUEUE_POLICIES = ('drop', 'block')
+
+
+class LogQueueHandler(QueueHandler):
+    """Hands records to a LogQueueListener thread through a bounded queue.
+
+    With the 'drop' policy a full queue discards the record; the count is
+    kept in .dropped and a warning saying how many were lost is queued once
+    there is room again. With 'block' the logging thread waits for room.
+    """
+
+    def __init__(self, log_queue, policy='drop'):
+        super().__init__(log_queue)
+        self.block = policy == 'block'
+        self.listener = None
+        self.dropped = 0
+        self._unreported = 0
+
+    def prepare(self, record):
+        # Same process, so nothing has to be pickled: merge msg and args now
+        # (args may change after the call) and leave formatting, tracebacks
+        # included, to the listener thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        # Runs under the handler's lock (Handler.handle), so the counters are safe
+        if self.block:
+            self.queue.put(record)
+            return
+        try:
+            if self._unreported:
+                self.queue.put_nowait(logging.makeLogRecord({
+                    'name': record.name, 'levelno': logging.WARNING, 'levelname': 'WARNING',
+                    'msg': f"Log queue full: {self._unreported} log records were dropped.",
+                }))
+                self._unreported = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            self._unreported += 1
+
+    def stats(self):
+        return {'queued': self.queue.qsize(), 'dropped': self.dropped}
+
+    def close(self):
+        """Writes out everything queued so far and stops the listener."""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+        super().close()
+
+
+class LogQueueListener(QueueListener):
+    def enqueue_sentinel(self):
+        # Wait for room rather than fail when stopping with a full queue
+        self.queue.put(self._sentinel)
+
+
+def install_log_queue(app, handlers):
+    """Moves app.logger's handlers, and the new ones, behind a LogQueueHandler."""
+    policy = app.config.get('LOG_QUEUE_FULL', 'drop')
+    if policy not in LOG_QUEUE_POLICIES:
+        raise ValueError(f"Unknown LOG_QUEUE_FULL '{policy}'. Choose one of: {', '.join(LOG_QUEUE_POLICIES)}.")
+
+    # app.logger is shared by every app with the same name: stop the queue of
+    # one configured earlier in this process before taking its place
+    for handler in list(app.logger.handlers):
+        if isinstance(handler, LogQueueHandler):
+            handler.close()
+            app.logger.removeHandler(handler)
+    # Flask's default stderr handler included, so request threads do no I/O
+    handlers = app.logger.handlers + handlers
+    for handler in list(app.logger.handlers):
+        app.logger.removeHandler(handler)
+
+    log_queue = queue.Queue(maxsize=app.config.get('LOG_QUEUE_SIZE', 10_000))
+    queue_handler = LogQueueHandler(log_queue, policy)
+    queue_handler.listener = LogQueueListener(log_queue, *handlers, respect_handler_level=True)
+    queue_handler.listener.start()
+    app.logger.addHandler(queue_handler)
+    # Registered after logging's own atexit hook, so it runs first and the
+    # handlers are still open while the queue is written out
+    atexit.register(queue_handler.close)
+    app.extensions['log_queue'] = queue_handler
+    return queue_handler
+
 
 def configure_logging(app):
     """Configures logging for the Flask application."""
-    log_formatter = logging.Formatter(
-        '%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]'
-    )
+    # LOG_FORMAT 'text' or 'json' (one object per line), LOG_SOURCE for the [in file:line] location
+    log_formatter = make_log_formatter(app)
     log_level_name = app.config.get('LOG_LEVEL', 'INFO')
     log_level = logging.getLevelName(log_level_name)
     log_file = app.config.get('LOG_FILE')
 
     app.logger.setLevel(log_level)
+    handlers = []
 
     # File Handler (only if LOG_FILE is set)
     if log_file:
@@ -27,18 +123,31 @@ def configure_logging(app):
             file_handler = RotatingFileHandler(log_file, maxBytes=1024 * 1024, backupCount=5)
             file_handler.setFormatter(log_formatter)
             file_handler.setLevel(log_level)
-            if file_handler not in app.logger.handlers:
-                app.logger.addHandler(file_handler)
-                app.logger.info(f"File logging enabled: {log_file}")
+            handlers.append(file_handler)
 
     # Console Handler (only if not in debug or if no file logging)
     # Flask's default logger is often sufficient in debug mode.
-    has_console_handler = any(isinstance(h, logging.StreamHandler) for h in app.logger.handlers)
+    console_handler = None
+    has_console_handler = any(isinstance(h, logging.StreamHandler) for h in app.logger.handlers + handlers)
     if not app.debug and not has_console_handler:
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(log_formatter)
         console_handler.setLevel(log_level)
-        app.logger.addHandler(console_handler)
+        handlers.append(console_handler)
+
+    # Queued logging: request threads only enqueue records, one listener
+    # thread formats them and does the writes and rotation checks
+    if app.config.get('LOG_QUEUE'):
+        queue_handler = install_log_queue(app, handlers)
+        app.logger.info(f"Queued logging enabled: up to {queue_handler.queue.maxsize} records, "
+                        f"'{app.config.get('LOG_QUEUE_FULL', 'drop')}' when full")
+    else:
+        for handler in handlers:
+            app.logger.addHandler(handler)
+
+    if log_file:
+        app.logger.info(f"File logging enabled: {log_file}")
+    if console_handler:
         app.logger.info("Console logging enabled.")
     elif app.debug:
          app.logger.info("Flask's default console logging active (debug mode).")
@@ -1,10 +1,21 @@
 # models.py
+from sqlalchemy import MetaData, inspect
+from sqlalchemy.schema import CreateTable
+
 from extensions import db # Import the db instance
 
 class Item(db.Model):
+    # AUTOINCREMENT keeps SQLite from reusing the id of a deleted row, so
+    # (id, version) never repeats and can be used as an ETag.
+    __table_args__ = {'sqlite_autoincrement': True}
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(80), unique=True, nullable=False)
     description = db.Column(db.String(120), nullable=True)
+    # Row version, bumped by routes.update_item_statement whenever a value
+    # changes. Not a mapper version_id_col: a concurrent flush of the same
+    # row would then fail with StaleDataError instead of last-write-wins.
+    version = db.Column(db.Integer, nullable=False, default=1, server_default=db.text('1'))
 
     def __repr__(self):
         return f'<Item {self.name}>'
@@ -15,3 +26,73 @@ class Item(db.Model):
             'name': self.name,
             'description': self.description
         }
+
+    @property
+    def etag(self):
+        return item_etag(self.id, self.version)
+
+
+def item_etag(item_id, version):
+    return f'{item_id}-{version}'
+
+
+# --- Schema upgrades ---
+# Columns added after the table was first created, as (name, DDL). New
+# databases get them from db.create_all(), existing ones from
+# install_item_schema at startup.
+ITEM_COLUMNS_ADDED = [
+    ('version', 'INTEGER NOT NULL DEFAULT 1'),
+]
+
+
+def ensure_item_columns(connection):
+    """Adds any ITEM_COLUMNS_ADDED missing from an existing item table.
+    Returns the names added."""
+    inspector = inspect(connection)
+    if Item.__tablename__ not in inspector.get_table_names():
+        return []
+    existing = {column['name'] for column in inspector.get_columns(Item.__tablename__)}
+    added = []
+    for name, ddl in ITEM_COLUMNS_ADDED:
+        if name not in existing:
+            connection.exec_driver_sql(f"ALTER TABLE {Item.__tablename__} ADD COLUMN {name} {ddl}")
+            added.append(name)
+    return added
+
+
+def ensure_item_autoincrement(connection):
+    """Rebuilds a SQLite item table created without AUTOINCREMENT, which
+    SQLite cannot add in place. Returns True if the table was rebuilt.
+
+    Dropping the old table drops its triggers too; install_item_search puts
+    the search index triggers back. Ids deleted before the rebuild above the
+    highest remaining one can still be handed out once more.
+    """
+    if connection.dialect.name != 'sqlite':
+        return False
+    sql = connection.exec_driver_sql(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (Item.__tablename__,)
+    ).scalar()
+    if sql is None or 'AUTOINCREMENT' in sql.upper():
+        return False
+    rebuilt = Item.__table__.to_metadata(MetaData(), name=f'{Item.__tablename__}_rebuild')
+    columns = ', '.join(column.name for column in Item.__table__.columns)
+    connection.execute(CreateTable(rebuilt))
+    connection.exec_driver_sql(
+        f"INSERT INTO {rebuilt.name} ({columns}) SELECT {columns} FROM {Item.__tablename__}"
+    )
+    connection.exec_driver_sql(f"DROP TABLE {Item.__tablename__}")
+    connection.exec_driver_sql(f"ALTER TABLE {rebuilt.name} RENAME TO {Item.__tablename__}")
+    return True
+
+
+def install_item_schema(app, engine):
+    """Brings an existing item table up to date with the model: missing
+    columns, then AUTOINCREMENT ids."""
+    with engine.begin() as connection:
+        added = ensure_item_columns(connection)
+        rebuilt = ensure_item_autoincrement(connection)
+    if added:
+        app.logger.info("Added item column(s): %s", ', '.join(added))
+    if rebuilt:
+        app.logger.info("Rebuilt the item table with AUTOINCREMENT ids")
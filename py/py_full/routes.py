@@ -1,11 +1,15 @@
 # routes.py
-from flask import Blueprint, request, jsonify, abort, current_app
+from flask import Blueprint, request, jsonify, abort, current_app, make_response, stream_with_context
 from marshmallow import ValidationError
+from sqlalchemy.exc import IntegrityError
+from werkzeug.exceptions import HTTPException
 
 # Import application components
-from models import db, Item
-from schemas import item_create_schema, item_update_schema
+from extensions import item_cache, item_writer
+from models import db, Item, item_etag
+from schemas import item_create_schema, item_create_many_schema, item_update_schema
 from auth import require_api_key
+from item_search import fts_query, search_statement
 
 # Create a Blueprint instance
 # The first argument 'items' is the blueprint's name used for Flask internals (like url_for).
@@ -13,6 +17,16 @@ from auth import require_api_key
 # url_prefix makes all routes in this blueprint start with /items
 items_bp = Blueprint('items', __name__, url_prefix='/items')
 
+# SQLite accepts at most 32766 bound parameters per statement, so name
+# lookups for very large batches are split into IN queries of this size
+NAME_LOOKUP_CHUNK = 10_000
+
+# Columns of Item.to_dict(); reads select them directly instead of
+# building an ORM object per row
+ITEM_COLUMNS = (Item.id, Item.name, Item.description)
+# Fields a listing can be narrowed to with ?fields=
+ITEM_FIELDS = {column.key: column for column in ITEM_COLUMNS}
+
 
 # --- Request/Response Logging Hooks (Blueprint Specific) ---
 # These run only for requests handled by this blueprint
@@ -43,61 +57,287 @@ def create_item():
 
     try:
         validated_data = item_create_schema.load(json_data)
-        current_app.logger.debug(f"Create item validation successful for name: {validated_data.get('name')}")
+        current_app.logger.debug("Create item validation successful for name: %s", validated_data.get('name'))
     except ValidationError as err:
         current_app.logger.warning(f"Create item validation failed: {err.messages}")
         abort(400, description=err.messages)
 
-    name = validated_data['name']
-    description = validated_data.get('description')
-
-    if Item.query.filter_by(name=name).first():
-         current_app.logger.warning(f"Create item failed: Item name '{name}' already exists.")
-         abort(400, description=f"Item with name '{name}' already exists.")
-
-    new_item = Item(name=name, description=description)
     try:
-        db.session.add(new_item)
-        db.session.commit()
-        current_app.logger.info(f"Item created successfully with ID: {new_item.id}, Name: {new_item.name}")
+        item = item_writer.run(write_create_item, validated_data['name'], validated_data.get('description'))
+    except HTTPException:
+        raise
     except Exception as e:
-        db.session.rollback()
         current_app.logger.error(f"Database error on create: {e}", exc_info=True)
         abort(500, description="Database error occurred during item creation.")
 
-    return jsonify(new_item.to_dict()), 201
+    current_app.logger.info(f"Item created successfully with ID: {item['id']}, Name: {item['name']}")
+    return jsonify(item), 201
+
+
+@items_bp.route('/batch', methods=['POST']) # Corresponds to POST /items/batch
+@require_api_key
+def create_items_batch():
+    current_app.logger.debug("Attempting to create a batch of items (authorized).")
+    json_data = request.get_json()
+    if not isinstance(json_data, list) or not json_data:
+        current_app.logger.warning("Create batch failed: Request body was not a non-empty JSON array.")
+        abort(400, description="Request body must be a non-empty JSON array of items.")
+
+    max_items = current_app.config['ITEMS_BATCH_MAX']
+    if len(json_data) > max_items:
+        current_app.logger.warning(f"Create batch failed: {len(json_data)} items exceeds the limit of {max_items}.")
+        abort(400, description=f"A batch can hold at most {max_items} items.")
+
+    # Validate the whole list in one pass; invalid entries are reported by index
+    try:
+        rows = item_create_many_schema.load(json_data)
+        errors = {}
+    except ValidationError as err:
+        rows, errors = err.valid_data, err.messages
+
+    # First valid entry per name wins; later ones in the same batch are rejected
+    pending = {}  # name -> index in the request
+    for index, row in enumerate(rows):
+        if index in errors:
+            continue
+        if row['name'] in pending:
+            errors[index] = {'name': [f"Duplicate name '{row['name']}' within the batch."]}
+        else:
+            pending[row['name']] = index
+
+    for name in existing_item_names(pending):
+        errors[pending.pop(name)] = {'name': [f"Item with name '{name}' already exists."]}
+
+    created = {}
+    if pending:
+        # One executemany in one transaction; RETURNING hands back the new ids
+        # in parameter order, so they line up with the pending entries
+        try:
+            result = db.session.execute(
+                db.insert(Item).returning(Item.id, Item.name, Item.description, sort_by_parameter_order=True),
+                [{'name': name, 'description': rows[index].get('description')} for name, index in pending.items()],
+            )
+            created = {index: row._asdict() for index, row in zip(pending.values(), result)}
+            # Core inserts bypass the ORM's change tracking; drop any cached 404s
+            item_cache.mark_changed(db.session, *(item['id'] for item in created.values()))
+            db.session.commit()
+        except IntegrityError as e:
+            db.session.rollback()
+            current_app.logger.warning(f"Create batch failed: name conflict with a concurrent write: {e.orig}")
+            abort(400, description="Another request created items with some of these names; nothing was created, retry the batch.")
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Database error on batch create: {e}", exc_info=True)
+            abort(500, description="Database error occurred during batch creation.")
+
+    current_app.logger.info(f"Batch create finished: {len(created)} created, {len(errors)} rejected.")
+    results = [
+        {'index': index, 'status': 201, 'item': created[index]} if index in created
+        else {'index': index, 'status': 400, 'errors': errors[index]}
+        for index in range(len(json_data))
+    ]
+    # 207 Multi-Status tells the client to look at the per-item results
+    return jsonify({'created': len(created), 'failed': len(errors), 'results': results}), 201 if not errors else 207
+
+
+def existing_item_names(names):
+    """Returns which of ``names`` are already taken, using as few IN queries as possible."""
+    names = list(names)
+    existing = set()
+    for start in range(0, len(names), NAME_LOOKUP_CHUNK):
+        chunk = names[start:start + NAME_LOOKUP_CHUNK]
+        existing.update(db.session.execute(db.select(Item.name).where(Item.name.in_(chunk))).scalars())
+    return existing
+
+
+# --- Projection ---
+def parse_fields():
+    """Columns to select for ?fields=name,description; id is always included."""
+    fields = request.args.get('fields')
+    if fields is None:
+        return ITEM_COLUMNS
+    names = {name.strip() for name in fields.split(',')} - {''}
+    unknown = names - ITEM_FIELDS.keys()
+    if unknown or not names:
+        current_app.logger.warning(f"Invalid fields parameter '{fields}'.")
+        abort(400, description=f"fields must be a comma-separated list of: {', '.join(ITEM_FIELDS)}.")
+    return tuple(column for key, column in ITEM_FIELDS.items() if key == 'id' or key in names)
+
+
+def row_dicts(keys, rows):
+    """Result rows as dicts, several times cheaper than Row._asdict() per row."""
+    return [dict(zip(keys, row)) for row in rows]
 
 
 @items_bp.route('/', methods=['GET']) # Corresponds to GET /items
 def get_items():
-    current_app.logger.debug("Attempting to retrieve all items.")
+    # ?limit=N&after_id=<last id of the previous page> returns one page in id
+    # order, read straight off the primary key index. Without either
+    # parameter the whole table is streamed rather than loaded at once.
+    # ?fields= limits the columns the SELECT reads.
+    columns = parse_fields()
+    limit = request.args.get('limit')
+    after_id = request.args.get('after_id')
+    if limit is None and after_id is None:
+        return stream_all_items(columns)
+
+    try:
+        limit = int(limit) if limit is not None else current_app.config['ITEMS_PAGE_DEFAULT']
+        after_id = int(after_id) if after_id is not None else 0
+    except ValueError:
+        current_app.logger.warning(f"Get items failed: non-integer limit '{limit}' or after_id '{after_id}'.")
+        abort(400, description="limit and after_id must be integers.")
+    max_limit = current_app.config['ITEMS_PAGE_MAX']
+    if not 1 <= limit <= max_limit:
+        current_app.logger.warning(f"Get items failed: limit {limit} out of range.")
+        abort(400, description=f"limit must be between 1 and {max_limit}.")
+
+    current_app.logger.debug("Attempting to retrieve %s items after ID %s.", limit, after_id)
+    try:
+        # One extra row tells whether another page follows
+        result = db.session.execute(
+            db.select(*columns).where(Item.id > after_id).order_by(Item.id).limit(limit + 1)
+        )
+        keys, rows = tuple(result.keys()), result.all()
+    except Exception as e:
+        current_app.logger.error(f"Database error on get page: {e}", exc_info=True)
+        abort(500, description="Database error occurred while fetching items.")
+
+    page = rows[:limit]
+    current_app.logger.info(f"Retrieved {len(page)} items after ID {after_id}.")
+    response = jsonify(row_dicts(keys, page))
+    if len(rows) > limit:
+        # Pass back as after_id to get the next page
+        response.headers['X-Next-After-Id'] = str(page[-1].id)
+    return response, 200
+
+
+def stream_all_items(columns=ITEM_COLUMNS):
+    """Streams every item as a JSON array, fetching ITEMS_STREAM_CHUNK rows at a time."""
+    current_app.logger.debug("Attempting to stream all items.")
+    chunk_size = current_app.config['ITEMS_STREAM_CHUNK']
     try:
-        all_items = Item.query.all()
-        current_app.logger.info(f"Retrieved {len(all_items)} items.")
-        return jsonify([item.to_dict() for item in all_items]), 200
+        result = db.session.execute(
+            db.select(*columns).order_by(Item.id).execution_options(yield_per=chunk_size)
+        )
     except Exception as e:
-         current_app.logger.error(f"Database error on get all: {e}", exc_info=True)
-         abort(500, description="Database error occurred while fetching items.")
+        current_app.logger.error(f"Database error on get all: {e}", exc_info=True)
+        abort(500, description="Database error occurred while fetching items.")
+
+    def generate():
+        dumps = current_app.json.dumps
+        keys = tuple(result.keys())
+        count = 0
+        yield '['
+        try:
+            for rows in result.partitions():
+                # Encode each chunk as one compact array and splice off its brackets
+                body = dumps(row_dicts(keys, rows), separators=(',', ':'))[1:-1]
+                yield body if count == 0 else ',' + body
+                count += len(rows)
+        except Exception as e:
+            # The status line is already sent; leaving the array unterminated
+            # makes the failure visible to the client as invalid JSON
+            current_app.logger.error(f"Database error while streaming items after {count} rows: {e}", exc_info=True)
+            return
+        yield ']'
+        current_app.logger.info(f"Streamed {count} items.")
+
+    # stream_with_context keeps the app context, and with it the session and
+    # its open cursor, alive until the last chunk has been sent
+    return current_app.response_class(stream_with_context(generate()), mimetype='application/json')
+
+
+def parse_search_args():
+    """Validates ?q=&limit=&offset= for GET /items/search; returns (fts query, limit, offset)."""
+    query = fts_query(request.args.get('q', ''))
+    if query is None:
+        current_app.logger.warning("Search items failed: empty query.")
+        abort(400, description="Query parameter 'q' must contain at least one search term.")
+    limit = request.args.get('limit')
+    offset = request.args.get('offset')
+    try:
+        limit = int(limit) if limit is not None else current_app.config['ITEMS_PAGE_DEFAULT']
+        offset = int(offset) if offset is not None else 0
+    except ValueError:
+        current_app.logger.warning(f"Search items failed: non-integer limit '{limit}' or offset '{offset}'.")
+        abort(400, description="limit and offset must be integers.")
+    max_limit = current_app.config['ITEMS_PAGE_MAX']
+    if not 1 <= limit <= max_limit or offset < 0:
+        current_app.logger.warning(f"Search items failed: limit {limit} or offset {offset} out of range.")
+        abort(400, description=f"limit must be between 1 and {max_limit} and offset must not be negative.")
+    return query, limit, offset
+
+
+def search_response(keys, rows, limit, offset):
+    page = rows[:limit]
+    response = jsonify(row_dicts(keys, page))
+    if len(rows) > limit:
+        # Pass back as offset to get the next page
+        response.headers['X-Next-Offset'] = str(offset + limit)
+    return response
+
+
+@items_bp.route('/search', methods=['GET']) # Corresponds to GET /items/search?q=
+def search_items():
+    # Matches every term of q against name and description through the FTS5
+    # index, best match first (a name match ranks above a description match)
+    query, limit, offset = parse_search_args()
+    columns = parse_fields()
+    current_app.logger.debug("Searching items for %s (limit %s, offset %s).", query, limit, offset)
+    try:
+        # One extra row tells whether another page follows
+        result = db.session.execute(search_statement(query, limit + 1, offset, columns))
+        keys, rows = tuple(result.keys()), result.all()
+    except Exception as e:
+        current_app.logger.error(f"Database error on search: {e}", exc_info=True)
+        abort(500, description="Database error occurred while searching items.")
+
+    current_app.logger.info(f"Search for {query} returned {min(len(rows), limit)} items at offset {offset}.")
+    return search_response(keys, rows, limit, offset), 200
 
 
 @items_bp.route('/<int:item_id>', methods=['GET']) # Corresponds to GET /items/<id>
 def get_item(item_id):
-    current_app.logger.debug(f"Attempting to retrieve item with ID: {item_id}.")
+    current_app.logger.debug("Attempting to retrieve item with ID: %s.", item_id)
     try:
-        # Use db.get_or_404 from the imported db instance
-        item = db.get_or_404(Item, item_id, description=f"Item with ID {item_id} not found.")
-        current_app.logger.info(f"Retrieved item with ID: {item_id}.")
-        return jsonify(item.to_dict()), 200
+        cached = item_cache.get(item_id, load_item)
     except Exception as e:
          current_app.logger.error(f"Error retrieving item {item_id}: {e}", exc_info=True)
          abort(500, description=f"Error retrieving item {item_id}.")
 
+    if cached is None:
+        abort(404, description=f"Item with ID {item_id} not found.")
+    data, etag = cached
+
+    # Conditional GET: answered from the cached ETag without touching the database
+    if request.if_none_match.contains_weak(etag):
+        current_app.logger.info(f"Item {item_id} not modified (ETag {etag}).")
+        response = make_response('', 304)
+        response.set_etag(etag, weak=True)
+        return response
+
+    current_app.logger.info(f"Retrieved item with ID: {item_id}.")
+    response = jsonify(data)
+    response.set_etag(etag, weak=True)
+    return response, 200
+
+
+def load_item(item_id):
+    """item_cache loader: the item's response body and ETag, or None if it does not exist."""
+    row = db.session.execute(db.select(*ITEM_COLUMNS, Item.version).where(Item.id == item_id)).first()
+    return None if row is None else (dict(zip(ITEM_FIELDS, row)), item_etag(row.id, row.version))
+
+
+@items_bp.route('/cache/stats', methods=['GET']) # Corresponds to GET /items/cache/stats
+def get_cache_stats():
+    return jsonify(item_cache.stats()), 200
+
 
 @items_bp.route('/<int:item_id>', methods=['PUT']) # Corresponds to PUT /items/<id>
 @require_api_key
 def update_item(item_id):
-    current_app.logger.debug(f"Attempting to update item with ID: {item_id} (authorized).")
-    item = db.get_or_404(Item, item_id, description=f"Item with ID {item_id} not found for update.")
+    current_app.logger.debug("Attempting to update item with ID: %s (authorized).", item_id)
     json_data = request.get_json()
     if not json_data:
         current_app.logger.warning(f"Update item {item_id} failed: Request body was not JSON.")
@@ -105,7 +345,7 @@ def update_item(item_id):
 
     try:
         validated_data = item_update_schema.load(json_data, partial=True)
-        current_app.logger.debug(f"Update item {item_id} validation successful. Data: {validated_data}")
+        current_app.logger.debug("Update item %s validation successful. Data: %s", item_id, validated_data)
     except ValidationError as err:
         current_app.logger.warning(f"Update item {item_id} validation failed: {err.messages}")
         abort(400, description=err.messages)
@@ -114,43 +354,100 @@ def update_item(item_id):
          current_app.logger.warning(f"Update item {item_id} failed: No update data provided.")
          abort(400, description="No update data provided. Must provide 'name' or 'description'.")
 
-    new_name = validated_data.get('name')
-    if new_name is not None and new_name != item.name and Item.query.filter_by(name=new_name).first():
-        current_app.logger.warning(f"Update item {item_id} failed: Name '{new_name}' already exists.")
-        abort(400, description=f"Cannot update: another item with name '{new_name}' already exists.")
-
-    updated_fields = []
-    if 'name' in validated_data and item.name != validated_data['name']: item.name = validated_data['name']; updated_fields.append('name')
-    if 'description' in validated_data and item.description != validated_data['description']: item.description = validated_data['description']; updated_fields.append('description')
-
-    if not updated_fields:
-        current_app.logger.info(f"Update item {item_id}: No actual changes detected in provided data.")
-        return jsonify(item.to_dict()), 200
-
     try:
-        db.session.commit()
-        current_app.logger.info(f"Item {item_id} updated successfully. Changed fields: {', '.join(updated_fields)}.")
+        item = item_writer.run(write_update_item, item_id, validated_data)
+    except HTTPException:
+        raise
     except Exception as e:
-        db.session.rollback()
         current_app.logger.error(f"Database error on update for item {item_id}: {e}", exc_info=True)
         abort(500, description="Database error occurred during update.")
 
-    return jsonify(item.to_dict()), 200
+    current_app.logger.info(f"Item {item_id} updated successfully. Fields: {', '.join(validated_data)}.")
+    return jsonify(item), 200
 
 
 @items_bp.route('/<int:item_id>', methods=['DELETE']) # Corresponds to DELETE /items/<id>
 def delete_item(item_id):
      # Note: We did not apply @require_api_key to DELETE in this example
-     current_app.logger.debug(f"Attempting to delete item with ID: {item_id}.")
-     item = db.get_or_404(Item, item_id, description=f"Item with ID {item_id} not found for deletion.")
-     item_name_for_log = item.name
+     current_app.logger.debug("Attempting to delete item with ID: %s.", item_id)
      try:
-         db.session.delete(item)
-         db.session.commit()
-         current_app.logger.info(f"Item {item_id} (Name: '{item_name_for_log}') deleted successfully.")
+         item_name_for_log = item_writer.run(write_delete_item, item_id)
+     except HTTPException:
+         raise
      except Exception as e:
-         db.session.rollback()
          current_app.logger.error(f"Database error on delete for item {item_id}: {e}", exc_info=True)
          abort(500, description="Database error occurred during deletion.")
 
+     current_app.logger.info(f"Item {item_id} (Name: '{item_name_for_log}') deleted successfully.")
      return jsonify({"message": f"Item with ID {item_id} deleted successfully."}), 200
+
+
+# --- Writes ---
+# Run through item_writer, which commits them: per request, or in group
+# commit mode together with other requests' writes on the writer thread.
+# They change db.session and flush, but never commit or roll back themselves.
+def write_create_item(name, description):
+    if Item.query.filter_by(name=name).first():
+        current_app.logger.warning(f"Create item failed: Item name '{name}' already exists.")
+        abort(400, description=f"Item with name '{name}' already exists.")
+    new_item = Item(name=name, description=description)
+    db.session.add(new_item)
+    flush_or_conflict(f"Item with name '{name}' already exists.")
+    return new_item.to_dict()
+
+
+def write_update_item(item_id, changes):
+    """Returns the item's new body. One UPDATE ... RETURNING: the unique
+    constraint on name replaces a lookup, and no row back means no item."""
+    try:
+        row = db.session.execute(update_item_statement(item_id, changes)).first()
+    except IntegrityError as e:
+        new_name = changes.get('name')
+        current_app.logger.warning(f"Update item {item_id} failed: Name '{new_name}' already exists ({e.orig}).")
+        abort(400, description=f"Cannot update: another item with name '{new_name}' already exists.")
+    if row is None:
+        abort(404, description=f"Item with ID {item_id} not found for update.")
+    # Bulk statements bypass the session's change tracking
+    item_cache.mark_changed(db.session, item_id)
+    return dict(zip(ITEM_FIELDS, row))
+
+
+def write_delete_item(item_id):
+    """Returns the deleted item's name. One DELETE ... RETURNING: no row back
+    means there was no item (a rowcount check that also yields the name)."""
+    name = db.session.execute(delete_item_statement(item_id)).scalar()
+    if name is None:
+        abort(404, description=f"Item with ID {item_id} not found for deletion.")
+    item_cache.mark_changed(db.session, item_id)
+    return name
+
+
+def update_item_statement(item_id, changes):
+    columns = Item.__table__.c
+    # Bump the version (the ETag) only if a value really changes
+    changed = db.or_(*[columns[field].is_distinct_from(value) for field, value in changes.items()])
+    return (
+        db.update(Item)
+        .where(Item.id == item_id)
+        .values(**changes, version=db.case((changed, Item.version + 1), else_=Item.version))
+        .returning(*ITEM_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def delete_item_statement(item_id):
+    return (
+        db.delete(Item)
+        .where(Item.id == item_id)
+        .returning(Item.name)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def flush_or_conflict(message):
+    # A concurrent write can take the name between the check and the flush
+    try:
+        db.session.flush()
+    except IntegrityError as e:
+        current_app.logger.warning(f"Write failed on a unique constraint: {e.orig}")
+        abort(400, description=message)
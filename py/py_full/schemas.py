@@ -27,5 +27,6 @@ class ItemUpdateSchema(Schema):
 
 # Instantiate schemas for use in routes
 item_create_schema = ItemCreateSchema()
+item_create_many_schema = ItemCreateSchema(many=True)
 item_update_schema = ItemUpdateSchema()
 
@@ -0,0 +1,183 @@
+# request_log.py
+import json
+import logging
+import random
+import threading
+import time
+from collections import Counter
+
+from flask import g, request
+
+from json_provider import orjson
+
+TEXT_LOG_FORMAT = '%(asctime)s %(levelname)s: %(message)s'
+# Appended to the text format while records carry their source location
+SOURCE_LOG_FORMAT = ' [in %(pathname)s:%(lineno)d]'
+LOG_FORMATS = ('text', 'json')
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as one JSON object per line: time, level, logger,
+    then the record's structured `fields` (see install_request_log) or, for
+    records without them, the message; then the source location (unless
+    with_source is False) and the traceback when there is one.
+    """
+
+    def __init__(self, with_source=True):
+        super().__init__()
+        self.with_source = with_source
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+        }
+        fields = getattr(record, 'fields', None)
+        if fields:
+            entry.update(fields)
+        else:
+            entry['message'] = record.getMessage()
+        if self.with_source:
+            entry['source'] = f"{record.pathname}:{record.lineno}"
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        if orjson is not None:
+            try:
+                return orjson.dumps(entry, default=str).decode()
+            except orjson.JSONEncodeError:
+                pass  # e.g. an item id beyond 64 bits, which the stdlib encodes
+        return json.dumps(entry, default=str, separators=(',', ':'))
+
+
+def make_log_formatter(app):
+    """Formatter for LOG_FORMAT ('text' or 'json'); LOG_SOURCE off leaves the
+    source location ([in file:line], or the JSON 'source' key) out of each line.
+    """
+    log_format = app.config.get('LOG_FORMAT', 'text')
+    with_source = app.config.get('LOG_SOURCE', True)
+    if log_format not in LOG_FORMATS:
+        raise ValueError(f"Unknown LOG_FORMAT '{log_format}'. Choose one of: {', '.join(LOG_FORMATS)}.")
+    if log_format == 'json':
+        return JsonFormatter(with_source)
+    return logging.Formatter(TEXT_LOG_FORMAT + (SOURCE_LOG_FORMAT if with_source else ''))
+
+
+class SuppressedLogs:
+    """Counts log lines left out by sampling and rate limits, per kind, and
+    logs what it counted at most once every `interval` seconds.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.counts = Counter()
+        self.since = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add(self, kind):
+        with self._lock:
+            self.counts[kind] += 1
+
+    def report(self, logger):
+        """Logs the counts if `interval` has passed since the last report."""
+        now = time.monotonic()
+        if now - self.since < self.interval:
+            return
+        with self._lock:
+            if now - self.since < self.interval:
+                return  # another thread just reported
+            counts, self.counts = self.counts, Counter()
+            elapsed, self.since = now - self.since, now
+        if counts:
+            logger.info('Suppressed in the last %.0fs: %s', elapsed,
+                        ', '.join(f"{count} {kind}" for kind, count in counts.most_common()),
+                        extra={'fields': {'suppressed': dict(counts), 'interval_s': round(elapsed, 1)}})
+
+
+class LogRateLimiter(logging.Filter):
+    """Token bucket per `rate_key`: lets `burst` records through at once,
+    then `rate` per second. Only records logged with extra={'rate_key': ...}
+    are limited; the ones it drops are counted in `suppressed`.
+    """
+
+    def __init__(self, rate, burst, suppressed):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.suppressed = suppressed
+        self._buckets = {}  # rate_key -> (tokens, last refill)
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        key = getattr(record, 'rate_key', None)
+        if key is None:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            tokens, refilled = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - refilled) * self.rate)
+            allowed = tokens >= 1
+            self._buckets[key] = (tokens - 1 if allowed else tokens, now)
+        if not allowed:
+            self.suppressed.add(f"{key} {record.levelname.lower()}s")
+        return allowed
+
+
+def install_request_log(app):
+    """Logs one INFO line per request: method, path, status, duration and,
+    for item routes, the item id. The fields are only gathered when INFO is
+    enabled; the JSON formatter writes them as keys (instead of a message),
+    the text one as 'GET /items/5 200 1.21ms'. For streamed responses the
+    duration ends when the view returns, before the body is sent.
+
+    REQUEST_LOG_SAMPLE and REQUEST_LOG_ERROR_SAMPLE are the shares of
+    requests logged with a status below 400 and from 400 up; a sampled line
+    carries its sample_rate. With LOG_RATE_LIMIT > 0, app.logger also gets a
+    LogRateLimiter. What both leave out is summed up every
+    LOG_SUMMARY_INTERVAL seconds.
+    """
+    logger = app.logger
+    sample_rate = app.config.get('REQUEST_LOG_SAMPLE', 1.0)
+    error_sample_rate = app.config.get('REQUEST_LOG_ERROR_SAMPLE', 1.0)
+    suppressed = SuppressedLogs(app.config.get('LOG_SUMMARY_INTERVAL', 60))
+    app.extensions['suppressed_logs'] = suppressed
+
+    # app.logger is shared by every app with the same name: replace the
+    # limiter of one configured earlier in this process
+    for log_filter in list(logger.filters):
+        if isinstance(log_filter, LogRateLimiter):
+            logger.removeFilter(log_filter)
+    rate_limit = app.config.get('LOG_RATE_LIMIT', 0)
+    if rate_limit > 0:
+        logger.addFilter(LogRateLimiter(rate_limit, app.config.get('LOG_RATE_BURST', 20), suppressed))
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def log_request(response):
+        if not logger.isEnabledFor(logging.INFO) or request.endpoint == 'static':
+            return response
+        suppressed.report(logger)
+        rate = sample_rate if response.status_code < 400 else error_sample_rate
+        if rate < 1 and random.random() >= rate:
+            suppressed.add(f"sampled {response.status_code // 100}xx requests")
+            return response
+        started = g.get('request_started')
+        duration_ms = (time.perf_counter() - started) * 1000 if started is not None else None
+        fields = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(duration_ms, 2) if duration_ms is not None else None,
+            'remote_addr': request.remote_addr,
+        }
+        item_id = request.view_args.get('item_id') if request.view_args else None
+        if item_id is not None:
+            fields['item_id'] = item_id
+        if rate < 1:
+            fields['sample_rate'] = rate
+        logger.info('%s %s %s %.2fms', request.method, request.path, response.status_code,
+                    duration_ms or 0.0, extra={'fields': fields})
+        return response
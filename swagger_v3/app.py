@@ -1,10 +1,33 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flasgger import Swagger, swag_from
 from functools import wraps
+
+from item_ingest import IngestError, read_items_batch
+from item_journal import ItemJournal
+from item_response import iter_items_json
+from item_store import ItemStore, decode_cursor, encode_cursor
+from json_provider import configure_json_provider
+from metrics import Metrics
+from response_cache import ResponseCache
+from shared_item_store import SharedItemStore
 import os
 
 app = Flask(__name__)
 
+# JSON provider for jsonify: orjson when installed, JSON_PROVIDER=stdlib|orjson overrides
+app.config['JSON_PROVIDER'] = os.environ.get('JSON_PROVIDER') or 'auto'
+configure_json_provider(app)
+
+# Error bodies depend only on their message, so each one is encoded once by
+# the JSON provider and reused
+_error_bodies = {}
+
+def error_response(message, status):
+    body = _error_bodies.get(message)
+    if body is None:
+        body = _error_bodies[message] = app.json.response({"error": message}).get_data()
+    return Response(body, status=status, mimetype='application/json')
+
 # Ensure the swagger_docs directory exists
 if not os.path.exists('swagger_docs'):
     os.makedirs('swagger_docs')
@@ -45,7 +68,7 @@ swagger_template = {
 swagger = Swagger(app, config=swagger_config, template=swagger_template)
 
 # Sample data store
-items_store = {
+SAMPLE_ITEMS = {
     "ap123": {
         "production": [
             {"id": 1, "name": "item 1", "description": "short description here"}
@@ -53,13 +76,55 @@ items_store = {
     }
 }
 
+# Multi-worker deployments (e.g. gunicorn -w 4): set ITEMS_SHARED_PATH to a
+# file, ideally on tmpfs such as /dev/shm/items.store, so every worker process
+# serves the same items. Otherwise ITEMS_DATA_DIR enables optional persistence:
+# the store is rebuilt from the latest snapshot plus the tail of the log.
+ITEMS_SHARED_PATH = os.environ.get('ITEMS_SHARED_PATH')
+ITEMS_DATA_DIR = os.environ.get('ITEMS_DATA_DIR')
+
+if ITEMS_SHARED_PATH:
+    items_store = SharedItemStore(ITEMS_SHARED_PATH)
+    seed_sample_items = items_store.created
+elif ITEMS_DATA_DIR:
+    items_store = ItemStore(copy_on_write=True)
+    seed_sample_items = not ItemJournal(ITEMS_DATA_DIR).open(items_store)
+else:
+    items_store = ItemStore(copy_on_write=True)
+    seed_sample_items = True
+
+# Pagination limits for GET /api/items
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 10000
+
+# Most items a single PUT/DELETE /api/items/batch request may touch
+MAX_BATCH_SIZE = 10000
+
+# Cache of rendered GET /api/items bodies, dropped per environment on every write
+response_cache = ResponseCache(
+    max_entries=int(os.environ.get('ITEMS_RESPONSE_CACHE_ENTRIES', 1024)),
+    max_bytes=int(os.environ.get('ITEMS_RESPONSE_CACHE_BYTES', 64 * 1024 * 1024)),
+)
+items_store.add_listener(response_cache.invalidate)
+
+# Request counts, latency histograms and the response cache counters at
+# /metrics, in the Prometheus text format
+metrics = Metrics()
+metrics.init_app(app)
+metrics.add_collector('response_cache', response_cache.stats)
+
+if seed_sample_items:
+    for appid, envs in SAMPLE_ITEMS.items():
+        for appenv, items in envs.items():
+            items_store.add_items(appid, appenv, items)
+
 # Authorization decorator
 def requires_auth(f):
     @wraps(f)
     def decorated(*args, **kwargs):
         auth_header = request.headers.get('Authorization')
         if not auth_header:
-            return jsonify({"error": "Authorization header is required"}), 401
+            return error_response("Authorization header is required", 401)
         # In a real app, you would validate the token here
         return f(*args, **kwargs)
     return decorated
@@ -70,22 +135,85 @@ def get_items():
     """
     Get all items
     This endpoint returns all items for a specific application ID and environment.
+    Pass limit (and the next_cursor of the previous page as cursor) to page
+    through large environments, and stream=true to receive the body in chunks.
     No authorization required.
     """
     appid = request.args.get('appid')
     appenv = request.args.get('appenv')
+    limit = request.args.get('limit')
+    cursor = request.args.get('cursor')
+    stream = request.args.get('stream', '').lower() in ('1', 'true', 'yes')
     
     if not appid or not appenv:
-        return jsonify({"error": "appid and appenv query parameters are required"}), 400
+        return error_response("appid and appenv query parameters are required", 400)
     
-    if appid not in items_store or appenv not in items_store.get(appid, {}):
-        return jsonify({"appid": appid, "appenv": appenv, "items": []}), 200
+    # Polling clients that already hold the current version get a 304
+    # without the item list being touched
+    etag = items_store.etag(appid, appenv)
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        response.set_etag(etag, weak=True)
+        return response
     
-    return jsonify({
+    paginated = limit is not None or cursor is not None
+    after = None
+    if paginated:
+        try:
+            limit = int(limit) if limit is not None else DEFAULT_PAGE_LIMIT
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= MAX_PAGE_LIMIT:
+            return error_response(f"limit must be an integer between 1 and {MAX_PAGE_LIMIT}", 400)
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError:
+            return error_response("cursor must be a next_cursor returned by a previous page", 400)
+    
+    # Rendered bodies are cached per version and page; a hit skips jsonify entirely
+    cache_key = (appid, appenv, etag, limit if paginated else None, after)
+    if not stream:
+        cached_body = response_cache.get(cache_key)
+        if cached_body is not None:
+            response = Response(cached_body, mimetype='application/json')
+            response.set_etag(etag, weak=True)
+            return response, 200
+    
+    next_cursor = None
+    if paginated:
+        items, next_after = items_store.list_page(appid, appenv, limit, after)
+        if next_after is not None:
+            next_cursor = encode_cursor(next_after)
+    else:
+        items = items_store.list_items(appid, appenv)
+    
+    if stream:
+        response = Response(iter_items_json(appid, appenv, items, paginated, next_cursor, app.json.dumps),
+                            mimetype='application/json')
+        response.set_etag(etag, weak=True)
+        return response, 200
+    
+    body = {
         "appid": appid,
         "appenv": appenv,
-        "items": items_store[appid][appenv]
-    }), 200
+        "items": [item.to_dict() for item in items]
+    }
+    if paginated:
+        body["next_cursor"] = next_cursor
+    response = jsonify(body)
+    response_cache.put(cache_key, response.get_data())
+    response.set_etag(etag, weak=True)
+    return response, 200
+
+@app.route('/api/cache/stats', methods=['GET'])
+@swag_from('swagger_docs/get_cache_stats.json')
+def get_cache_stats():
+    """
+    Get response cache statistics
+    This endpoint returns hit/miss/eviction counters of the GET /api/items response cache.
+    No authorization required.
+    """
+    return jsonify(response_cache.stats()), 200
 
 @app.route('/api/items', methods=['POST'])
 @requires_auth
@@ -96,30 +224,18 @@ def create_items():
     This endpoint creates new items for a specific application ID and environment.
     Authorization required.
     """
-    data = request.get_json()
-    
-    if not data or 'appid' not in data or 'appenv' not in data or 'items' not in data:
-        return jsonify({"error": "Invalid request. Required fields: appid, appenv, items"}), 400
-    
-    appid = data['appid']
-    appenv = data['appenv']
-    items = data['items']
-    
-    if not items or not isinstance(items, list):
-        return jsonify({"error": "Items must be a non-empty array"}), 400
-    
-    # Create the app and environment if they don't exist
-    if appid not in items_store:
-        items_store[appid] = {}
+    if not request.is_json:
+        return error_response("Request body must be JSON", 400)
     
-    if appenv not in items_store[appid]:
-        items_store[appid][appenv] = []
+    # Parse the body incrementally instead of loading it whole; every item is
+    # validated before anything is stored, so a bad batch leaves no trace
+    try:
+        appid, appenv, items = read_items_batch(request.stream)
+    except IngestError as e:
+        return jsonify({"error": str(e)}), 400
     
-    # Add the new items
-    for item in items:
-        if 'id' not in item or 'name' not in item:
-            return jsonify({"error": "Each item must have an id and name"}), 400
-        items_store[appid][appenv].append(item)
+    # Add the new items in one store operation (creates the app and environment if needed)
+    items_store.add_items(appid, appenv, items)
     
     return jsonify({
         "message": "Items created successfully",
@@ -141,30 +257,21 @@ def update_item(item_id):
     data = request.get_json()
     
     if not appid or not appenv:
-        return jsonify({"error": "appid and appenv query parameters are required"}), 400
+        return error_response("appid and appenv query parameters are required", 400)
     
-    if appid not in items_store or appenv not in items_store.get(appid, {}):
-        return jsonify({"error": "Application ID or environment not found"}), 404
-    
-    # Find the item
-    item_index = None
-    for i, item in enumerate(items_store[appid][appenv]):
-        if item['id'] == item_id:
-            item_index = i
-            break
-    
-    if item_index is None:
-        return jsonify({"error": "Item not found"}), 404
+    if not items_store.has_env(appid, appenv):
+        return error_response("Application ID or environment not found", 404)
     
     # Update the item
-    if 'name' in data:
-        items_store[appid][appenv][item_index]['name'] = data['name']
-    if 'description' in data:
-        items_store[appid][appenv][item_index]['description'] = data['description']
+    changes = {key: data[key] for key in ('name', 'description') if key in data}
+    item = items_store.update_item(appid, appenv, item_id, changes)
+    
+    if item is None:
+        return error_response("Item not found", 404)
     
     return jsonify({
         "message": "Item updated successfully",
-        "item": items_store[appid][appenv][item_index]
+        "item": item.to_dict()
     }), 200
 
 @app.route('/api/items/<int:item_id>', methods=['DELETE'])
@@ -180,27 +287,108 @@ def delete_item(item_id):
     appenv = request.args.get('appenv')
     
     if not appid or not appenv:
-        return jsonify({"error": "appid and appenv query parameters are required"}), 400
-    
-    if appid not in items_store or appenv not in items_store.get(appid, {}):
-        return jsonify({"error": "Application ID or environment not found"}), 404
+        return error_response("appid and appenv query parameters are required", 400)
     
-    # Find the item
-    item_index = None
-    for i, item in enumerate(items_store[appid][appenv]):
-        if item['id'] == item_id:
-            item_index = i
-            break
-    
-    if item_index is None:
-        return jsonify({"error": "Item not found"}), 404
+    if not items_store.has_env(appid, appenv):
+        return error_response("Application ID or environment not found", 404)
     
     # Delete the item
-    deleted_item = items_store[appid][appenv].pop(item_index)
+    deleted_item = items_store.delete_item(appid, appenv, item_id)
+    
+    if deleted_item is None:
+        return error_response("Item not found", 404)
     
     return jsonify({
         "message": "Item deleted successfully",
-        "item": deleted_item
+        "item": deleted_item.to_dict()
+    }), 200
+
+def batch_result(item_id, item):
+    """Per-item entry of a batch response."""
+    if item is None:
+        return {"id": item_id, "status": 404, "error": "Item not found"}
+    return {"id": item_id, "status": 200, "item": item.to_dict()}
+
+@app.route('/api/items/batch', methods=['PUT'])
+@requires_auth
+@swag_from('swagger_docs/put_items_batch.json')
+def update_items():
+    """
+    Update several items
+    This endpoint updates a list of items for a specific application ID and environment
+    in one store operation, and returns a status for every item.
+    Authorization required.
+    """
+    appid = request.args.get('appid')
+    appenv = request.args.get('appenv')
+    data = request.get_json(silent=True)
+    
+    if not appid or not appenv:
+        return error_response("appid and appenv query parameters are required", 400)
+    
+    entries = data.get('items') if isinstance(data, dict) else None
+    if not isinstance(entries, list) or not entries:
+        return error_response("items must be a non-empty array", 400)
+    if len(entries) > MAX_BATCH_SIZE:
+        return error_response(f"A batch can hold at most {MAX_BATCH_SIZE} items", 400)
+    
+    updates = []
+    for entry in entries:
+        if not isinstance(entry, dict) or type(entry.get('id')) is not int:
+            return error_response("Each item must have an integer id", 400)
+        changes = {key: entry[key] for key in ('name', 'description') if key in entry}
+        updates.append((entry['id'], changes))
+    
+    if not items_store.has_env(appid, appenv):
+        return error_response("Application ID or environment not found", 404)
+    
+    # All updates are applied under one lock, as one new version of the environment
+    items = items_store.update_items(appid, appenv, updates)
+    updated = sum(item is not None for item in items)
+    
+    return jsonify({
+        "message": f"{updated} of {len(items)} items updated",
+        "appid": appid,
+        "appenv": appenv,
+        "results": [batch_result(item_id, item) for (item_id, _), item in zip(updates, items)]
+    }), 200
+
+@app.route('/api/items/batch', methods=['DELETE'])
+@requires_auth
+@swag_from('swagger_docs/delete_items_batch.json')
+def delete_items():
+    """
+    Delete several items
+    This endpoint deletes a list of items by ID for a specific application ID and environment
+    in one store operation, and returns a status for every item.
+    Authorization required.
+    """
+    appid = request.args.get('appid')
+    appenv = request.args.get('appenv')
+    data = request.get_json(silent=True)
+    
+    if not appid or not appenv:
+        return error_response("appid and appenv query parameters are required", 400)
+    
+    item_ids = data.get('ids') if isinstance(data, dict) else None
+    if not isinstance(item_ids, list) or not item_ids:
+        return error_response("ids must be a non-empty array", 400)
+    if len(item_ids) > MAX_BATCH_SIZE:
+        return error_response(f"A batch can hold at most {MAX_BATCH_SIZE} items", 400)
+    if any(type(item_id) is not int for item_id in item_ids):
+        return error_response("ids must be integers", 400)
+    
+    if not items_store.has_env(appid, appenv):
+        return error_response("Application ID or environment not found", 404)
+    
+    deleted_items = items_store.delete_items(appid, appenv, item_ids)
+    deleted = sum(item is not None for item in deleted_items)
+    
+    return jsonify({
+        "message": f"{deleted} of {len(deleted_items)} items deleted",
+        "appid": appid,
+        "appenv": appenv,
+        "results": [batch_result(item_id, item) for item_id, item in zip(item_ids, deleted_items)]
     }), 200
 
 if __name__ == '__main__':
@@ -0,0 +1,54 @@
+# item_record.py
+import sys
+
+# Marks a field the client never sent, so to_dict() gives back the same keys
+_ABSENT = object()
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class ItemRecord:
+    """Compact, immutable form of one stored item.
+
+    A ``__slots__`` object costs a fraction of a dict with the same fields,
+    and interning ``name``/``description`` lets the many items that repeat a
+    value share one string. Any fields beyond id/name/description are kept in
+    ``extra``, which stays None for the usual item. Records are turned back
+    into dicts only when a response is rendered.
+    """
+    __slots__ = ('id', 'name', 'description', 'extra')
+
+    def __init__(self, id, name, description=_ABSENT, extra=None):
+        self.id = id
+        self.name = _intern(name)
+        self.description = _intern(description)
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, data):
+        extra = None
+        if len(data) > 2 + ('description' in data):
+            extra = {_intern(key): value for key, value in data.items() if key not in ('id', 'name', 'description')}
+        return cls(data['id'], data['name'], data.get('description', _ABSENT), extra)
+
+    def replace(self, changes):
+        """Returns a new record with ``changes`` applied; records are never mutated."""
+        if self.extra is None and changes.keys() <= {'name', 'description'}:
+            return ItemRecord(self.id, changes.get('name', self.name),
+                              changes.get('description', self.description))
+        data = self.to_dict()
+        data.update(changes)
+        return ItemRecord.from_dict(data)
+
+    def to_dict(self):
+        data = {'id': self.id, 'name': self.name}
+        if self.description is not _ABSENT:
+            data['description'] = self.description
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __repr__(self):
+        return f'<ItemRecord {self.id}: {self.name!r}>'
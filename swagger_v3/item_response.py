@@ -0,0 +1,21 @@
+# item_response.py
+import json
+
+STREAM_CHUNK_ITEMS = 500  # Items encoded per chunk written to the socket
+
+
+def iter_items_json(appid, appenv, items, paginated=False, next_cursor=None, dumps=json.dumps):
+    """Yields the get_items response body a chunk of ItemRecords at a time.
+
+    The body has the same shape as the jsonify response, but the worker never
+    holds more than one chunk of encoded items in memory. ``dumps`` encodes
+    each value; pass the app's JSON provider's to match its output.
+    """
+    yield f'{{"appid": {dumps(appid)}, "appenv": {dumps(appenv)}, "items": ['
+    for start in range(0, len(items), STREAM_CHUNK_ITEMS):
+        chunk = ', '.join(dumps(item.to_dict()) for item in items[start:start + STREAM_CHUNK_ITEMS])
+        yield f', {chunk}' if start else chunk
+    yield ']'
+    if paginated:
+        yield f', "next_cursor": {dumps(next_cursor)}'
+    yield '}'
@@ -0,0 +1,458 @@
+# item_store.py
+import base64
+import bisect
+import struct
+import threading
+import uuid
+from itertools import accumulate, compress
+from operator import itemgetter
+
+from item_record import ItemRecord
+
+_CURSOR = struct.Struct('>Q')
+# Slot positions per chunk of a published snapshot
+SNAPSHOT_CHUNK = 1024
+
+
+def encode_cursor(seq):
+    """Turns an item sequence number into an opaque pagination cursor."""
+    return base64.urlsafe_b64encode(_CURSOR.pack(seq)).rstrip(b'=').decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; raises ValueError for anything it did not produce."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        return _CURSOR.unpack(raw)[0]
+    except (ValueError, struct.error) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+class _Snapshot:
+    """Immutable view of one environment's live items, as handed to readers.
+
+    Live items are grouped by ranges of SNAPSHOT_CHUNK slot positions, each
+    an (items, seqs, last seq of the range) tuple. A write rebuilds only the
+    chunks holding the positions it touched and shares the others with the
+    snapshot before it, so publishing costs O(touched chunks + chunk count)
+    rather than O(items). Supports len(), iteration, indexing and slicing
+    like a tuple of items.
+    """
+    __slots__ = ('chunks', 'starts', 'last_seqs')
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        # Live items before each chunk, then the total
+        self.starts = (0, *accumulate(map(len, map(itemgetter(0), chunks))))
+        # Seqs only increase along the slots, holes included, so these do too
+        self.last_seqs = tuple(map(itemgetter(2), chunks))
+
+    @classmethod
+    def build(cls, slots, seqs, previous=None, positions=None, holes=True):
+        """Returns the snapshot of slots/seqs, rebuilding only the chunks of
+        ``positions`` from ``previous`` (everything when either is None).
+        ``holes=False`` promises slots holds no None, which skips filtering.
+        """
+        count = -(-len(slots) // SNAPSHOT_CHUNK)
+        if previous is None or positions is None:
+            chunks, dirty = [None] * count, range(count)
+        else:
+            chunks = list(previous.chunks[:count])
+            chunks += [None] * (count - len(chunks))
+            dirty = {pos // SNAPSHOT_CHUNK for pos in positions}
+        for k in dirty:
+            start = k * SNAPSHOT_CHUNK
+            items = slots[start:start + SNAPSHOT_CHUNK]
+            chunk_seqs = seqs[start:start + SNAPSHOT_CHUNK]
+            last_seq = chunk_seqs[-1]
+            if holes:
+                live = [item is not None for item in items]
+                items, chunk_seqs = compress(items, live), compress(chunk_seqs, live)
+            chunks[k] = (tuple(items), tuple(chunk_seqs), last_seq)
+        return cls(tuple(chunks))
+
+    def __len__(self):
+        return self.starts[-1]
+
+    def __iter__(self):
+        for items, _, _ in self.chunks:
+            yield from items
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError('snapshot index out of range')
+            k = bisect.bisect_right(self.starts, index) - 1
+            return self.chunks[k][0][index - self.starts[k]]
+        start, stop, step = index.indices(len(self))
+        if step != 1:
+            return tuple(self)[index]
+        result = []
+        k = bisect.bisect_right(self.starts, start) - 1
+        while start < stop:
+            chunk_start = self.starts[k]
+            items = self.chunks[k][0]
+            result.extend(items[start - chunk_start:stop - chunk_start])
+            start = chunk_start + len(items)
+            k += 1
+        return tuple(result)
+
+    def seq_at(self, index):
+        """Returns the sequence number of the item at ``index``."""
+        k = bisect.bisect_right(self.starts, index) - 1
+        return self.chunks[k][1][index - self.starts[k]]
+
+    def index_after(self, after):
+        """Returns the index of the first item whose seq is greater than ``after``."""
+        k = bisect.bisect_right(self.last_seqs, after)
+        if k == len(self.chunks):
+            return len(self)
+        return self.starts[k] + bisect.bisect_right(self.chunks[k][1], after)
+
+
+_EMPTY_SNAPSHOT = _Snapshot(())
+
+
+class _EnvItems:
+    """Items of one (appid, appenv) pair, kept in insertion order.
+
+    Deleted items leave a ``None`` hole in ``slots`` so nothing has to shift;
+    the list is compacted once holes outnumber live items.
+
+    ``seqs`` runs parallel to ``slots`` and holds each item's insertion
+    sequence number. It only ever increases along the list, which is what
+    makes pagination cursors stable across deletes and compaction.
+
+    ``snapshot`` is the published, immutable _Snapshot handed to readers in
+    copy-on-write mode; every write publishes a new one before releasing
+    the writer lock.
+
+    ``version`` increases with every write to the environment.
+    """
+    __slots__ = ('slots', 'seqs', 'next_seq', 'id_index', 'name_index', 'live', 'snapshot', 'version')
+
+    def __init__(self, index_names):
+        self.slots = []
+        self.seqs = []
+        self.next_seq = 1
+        self.id_index = {}  # item id -> position in slots
+        self.name_index = {} if index_names else None  # name -> set of item ids
+        self.live = 0
+        self.snapshot = _EMPTY_SNAPSHOT
+        self.version = 0
+
+
+class ItemStore:
+    """In-memory item storage keyed by appid and appenv.
+
+    Items are passed in as dicts and stored as compact ItemRecord objects;
+    reads return records, which callers turn into dicts with ``to_dict()``
+    when rendering a response.
+
+    Lookups by id go through a per-environment index, so get, update and
+    delete cost O(1) regardless of how many items an environment holds.
+
+    Writers are serialized by a lock. With ``copy_on_write`` enabled, readers
+    never take that lock: ``list_items`` returns the environment's published
+    snapshot, which only ever reflects whole write operations (a POST batch
+    is never seen half-applied). Each writer publishes the snapshot for its
+    write, copying only the chunks it changed; stored records are never
+    mutated, so a published snapshot never changes.
+
+    An attached journal (see item_journal.ItemJournal) is told about every
+    write while the writer lock is held; the writer then waits, outside the
+    lock, until its record is durable. Listeners registered with
+    ``add_listener`` are then called with the (appid, appenv) written to.
+    """
+
+    # Only bother compacting once there is a meaningful number of holes
+    COMPACT_MIN_HOLES = 64
+
+    def __init__(self, initial=None, index_names=False, copy_on_write=False):
+        self._envs = {}
+        self._index_names = index_names
+        self._copy_on_write = copy_on_write
+        self._write_lock = threading.Lock()
+        self._journal = None
+        self._listeners = []
+        # Versions restart with the process, so tag them with this instance
+        self._epoch = uuid.uuid4().hex[:12]
+        for appid, envs in (initial or {}).items():
+            for appenv, items in envs.items():
+                self.add_items(appid, appenv, items)
+
+    # --- Reads ---
+    def has_env(self, appid, appenv):
+        return (appid, appenv) in self._envs
+
+    def etag(self, appid, appenv):
+        """Returns an entity tag that changes whenever the environment does."""
+        env = self._envs.get((appid, appenv))
+        return f'{self._epoch}-{0 if env is None else env.version}'
+
+    def list_items(self, appid, appenv):
+        env = self._envs.get((appid, appenv))
+        if env is None:
+            return []
+        if not self._copy_on_write:
+            return [item for item in env.slots if item is not None]
+        return self._view(env)
+
+    def list_page(self, appid, appenv, limit, after=None):
+        """Returns up to ``limit`` items following sequence number ``after``.
+
+        The second value is the sequence number to pass as ``after`` for the
+        next page, or None once the last item has been returned.
+        """
+        env = self._envs.get((appid, appenv))
+        if env is None:
+            return [], None
+        items = self._view(env)
+        start = 0 if after is None else items.index_after(after)
+        end = start + limit
+        next_after = items.seq_at(end - 1) if end < len(items) else None
+        return items[start:end], next_after
+
+    def get_item(self, appid, appenv, item_id):
+        env = self._envs.get((appid, appenv))
+        if env is None:
+            return None
+        # Lock-free: a concurrent compaction can swap slots and index between
+        # the two reads, in which case the id check fails and we read again
+        while True:
+            pos = env.id_index.get(item_id)
+            if pos is None:
+                return None
+            slots = env.slots
+            item = slots[pos] if pos < len(slots) else None
+            if item is not None and item.id == item_id:
+                return item
+
+    def dump(self, on_locked=None):
+        """Returns (appid, appenv, items) for every environment.
+
+        ``on_locked`` is called while writers are held off, so it sees
+        exactly the state being dumped.
+        """
+        with self._write_lock:
+            if on_locked is not None:
+                on_locked()
+            return [
+                (appid, appenv, tuple(item for item in env.slots if item is not None))
+                for (appid, appenv), env in self._envs.items()
+            ]
+
+    def find_by_name(self, appid, appenv, name):
+        env = self._envs.get((appid, appenv))
+        if env is None:
+            return []
+        if env.name_index is None:
+            return [item for item in env.slots if item is not None and item.name == name]
+        return [env.slots[env.id_index[item_id]] for item_id in env.name_index.get(name, ())]
+
+    # --- Writes ---
+    def attach_journal(self, journal):
+        self._journal = journal
+
+    def add_listener(self, callback):
+        """Calls ``callback(appid, appenv)`` after every write to an environment."""
+        self._listeners.append(callback)
+
+    def add_items(self, appid, appenv, items):
+        """Appends items, as dicts or ItemRecords (what item_ingest produces);
+        an item whose id already exists replaces it in place.
+
+        The batch is applied whole or not at all: everything that can fail
+        (an unhashable id or name) is checked before the environment changes.
+        """
+        records = [item if type(item) is ItemRecord else ItemRecord.from_dict(item) for item in items]
+        seq = None
+        with self._write_lock:
+            env = self._envs.get((appid, appenv))
+            if env is None:
+                env = _EnvItems(self._index_names)
+            replaced, appended = self._plan_add(env, records)
+            first_new = len(env.slots)
+            for pos, item in replaced.items():
+                self._unindex_name(env, env.slots[pos])
+                env.slots[pos] = item
+                self._index_name(env, item)
+            for item in appended.values():
+                # The slot first: a lock-free get_item that finds the id
+                # in the index must find its record
+                env.slots.append(item)
+                env.seqs.append(env.next_seq)
+                env.id_index[item.id] = len(env.slots) - 1
+                env.next_seq += 1
+                env.live += 1
+                self._index_name(env, item)
+            self._publish(env, [*replaced, *range(first_new, len(env.slots))])
+            env.version += 1
+            # Only make a new environment visible once its batch is complete
+            self._envs[(appid, appenv)] = env
+            if self._journal is not None:
+                seq = self._journal.record_add(appid, appenv, items)
+        self._after_write(appid, appenv, seq)
+
+    def update_item(self, appid, appenv, item_id, changes):
+        """Applies ``changes`` to an item and returns it, or None if it does not exist."""
+        return self._update_items(appid, appenv, [(item_id, changes)])[0]
+
+    def update_items(self, appid, appenv, updates):
+        """Applies (item_id, changes) pairs in one write.
+
+        Returns the updated item for each pair, or None where the item does
+        not exist. Readers see either none or all of the updates.
+        """
+        return self._update_items(appid, appenv, updates)
+
+    def delete_item(self, appid, appenv, item_id):
+        """Removes an item and returns it, or None if it does not exist."""
+        return self._delete_items(appid, appenv, [item_id])[0]
+
+    def delete_items(self, appid, appenv, item_ids):
+        """Removes items in one write.
+
+        Returns the removed item for each id, or None where it did not exist.
+        """
+        return self._delete_items(appid, appenv, item_ids)
+
+    # --- Internals ---
+    # The single and batch variants share these, so a subclass can wrap the
+    # public methods without one calling back into the other
+    def _update_items(self, appid, appenv, updates):
+        results = [None] * len(updates)
+        seq = None
+        with self._write_lock:
+            env = self._envs.get((appid, appenv))
+            if env is None:
+                return results
+            # Work out every new record before changing any, so a failure
+            # leaves the environment as it was
+            planned, pending = [], {}  # pending: position -> its latest planned record
+            for i, (item_id, changes) in enumerate(updates):
+                pos = env.id_index.get(item_id)
+                if pos is None:
+                    continue
+                item = pending[pos] = pending.get(pos, env.slots[pos]).replace(changes)
+                if 'name' in changes and env.name_index is not None:
+                    hash(item.name)
+                planned.append((i, pos, item, (item_id, changes)))
+            if not planned:
+                return results
+            applied = []
+            for i, pos, item, update in planned:
+                if 'name' in update[1]:
+                    self._unindex_name(env, env.slots[pos])
+                    self._index_name(env, item)
+                env.slots[pos] = item
+                results[i] = item
+                applied.append(update)
+            self._publish(env, [pos for _, pos, _, _ in planned])
+            env.version += 1
+            if self._journal is not None:
+                seq = self._journal.record_update(appid, appenv, applied)
+        self._after_write(appid, appenv, seq)
+        return results
+
+    def _delete_items(self, appid, appenv, item_ids):
+        results = [None] * len(item_ids)
+        seq = None
+        with self._write_lock:
+            env = self._envs.get((appid, appenv))
+            if env is None:
+                return results
+            applied, positions = [], []
+            for i, item_id in enumerate(item_ids):
+                pos = env.id_index.pop(item_id, None)
+                if pos is None:
+                    continue
+                positions.append(pos)
+                item = env.slots[pos]
+                env.slots[pos] = None
+                env.live -= 1
+                self._unindex_name(env, item)
+                results[i] = item
+                applied.append(item_id)
+            if not applied:
+                return results
+            holes = len(env.slots) - env.live
+            if holes >= self.COMPACT_MIN_HOLES and holes > env.live:
+                self._compact(env)
+                positions = None  # every position moved
+            self._publish(env, positions)
+            env.version += 1
+            if self._journal is not None:
+                seq = self._journal.record_delete(appid, appenv, applied)
+        self._after_write(appid, appenv, seq)
+        return results
+
+    @staticmethod
+    def _plan_add(env, records):
+        """Sorts records into replacements of stored items, by position, and
+        new items, by id (a later duplicate wins); raises before anything is
+        applied if an id or indexed name cannot be hashed.
+        """
+        replaced, appended = {}, {}
+        for item in records:
+            pos = env.id_index.get(item.id)
+            if pos is not None:
+                replaced[pos] = item
+            else:
+                appended[item.id] = item
+            if env.name_index is not None:
+                hash(item.name)
+        return replaced, appended
+
+    def _after_write(self, appid, appenv, seq):
+        if seq is not None:
+            self._journal.wait_durable(seq)
+        for callback in self._listeners:
+            callback(appid, appenv)
+
+    def _view(self, env):
+        """Returns a consistent _Snapshot of env."""
+        if self._copy_on_write:
+            return env.snapshot
+        with self._write_lock:
+            return _Snapshot.build(env.slots, env.seqs)
+
+    def _publish(self, env, positions):
+        """Publishes env's snapshot after a write to slot ``positions`` (None:
+        all of them); the caller holds the writer lock.
+        """
+        if self._copy_on_write:
+            env.snapshot = _Snapshot.build(env.slots, env.seqs, env.snapshot, positions,
+                                           holes=env.live < len(env.slots))
+
+    @staticmethod
+    def _live(env):
+        items, seqs = [], []
+        for item, seq in zip(env.slots, env.seqs):
+            if item is not None:
+                items.append(item)
+                seqs.append(seq)
+        return items, seqs
+
+    @classmethod
+    def _compact(cls, env):
+        slots, env.seqs = cls._live(env)
+        id_index = {item.id: pos for pos, item in enumerate(slots)}
+        env.slots, env.id_index = slots, id_index
+
+    @staticmethod
+    def _index_name(env, item):
+        if env.name_index is not None:
+            env.name_index.setdefault(item.name, set()).add(item.id)
+
+    @staticmethod
+    def _unindex_name(env, item):
+        if env.name_index is None:
+            return
+        ids = env.name_index.get(item.name)
+        if ids is not None:
+            ids.discard(item.id)
+            if not ids:
+                del env.name_index[item.name]
@@ -1,6 +1,8 @@
 from fastapi import FastAPI, HTTPException, status
 from pydantic import BaseModel, Field
 from typing import List, Dict, Optional
+from itertools import islice
+import sys
 import uuid
 
 # --- Pydantic Models ---
@@ -23,7 +25,21 @@ class Item(ItemBase):
 # --- In-Memory Storage ---
 # Using a dictionary to store items, with the item ID as the key.
 # This is for simplicity; a real application would use a database.
-fake_items_db: Dict[str, Item] = {}
+# Items are stored as compact slotted records (with interned strings) rather
+# than pydantic models and only become Item models when they are returned.
+class StoredItem:
+    __slots__ = ('id', 'name', 'description', 'price')
+
+    def __init__(self, id: str, name: str, description: Optional[str], price: float):
+        self.id = id
+        self.name = sys.intern(name)
+        self.description = sys.intern(description) if description is not None else None
+        self.price = price
+
+    def to_model(self) -> Item:
+        return Item.model_construct(id=self.id, name=self.name, description=self.description, price=self.price)
+
+fake_items_db: Dict[str, StoredItem] = {}
 
 # --- FastAPI Application ---
 app = FastAPI(
@@ -45,27 +61,26 @@ async def create_item(item_in: ItemCreate):
     Create a new item.
     """
     item_id = generate_id()
-    new_item = Item(id=item_id, **item_in.model_dump())
-    fake_items_db[item_id] = new_item
-    return new_item
+    stored = StoredItem(id=item_id, **item_in.model_dump())
+    fake_items_db[item_id] = stored
+    return stored.to_model()
 
 @app.get("/items/", response_model=List[Item], tags=["Items"])
 async def read_items(skip: int = 0, limit: int = 100):
     """
     Retrieve all items with pagination.
     """
-    items_list = list(fake_items_db.values())
-    return items_list[skip : skip + limit]
+    return [stored.to_model() for stored in islice(fake_items_db.values(), skip, skip + limit)]
 
 @app.get("/items/{item_id}", response_model=Item, tags=["Items"])
 async def read_item(item_id: str):
     """
     Retrieve a specific item by its ID.
     """
-    item = fake_items_db.get(item_id)
-    if not item:
+    stored = fake_items_db.get(item_id)
+    if not stored:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
-    return item
+    return stored.to_model()
 
 @app.put("/items/{item_id}", response_model=Item, tags=["Items"])
 async def update_item(item_id: str, item_in: ItemUpdate):
@@ -77,13 +92,13 @@ async def update_item(item_id: str, item_in: ItemUpdate):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
 
     update_data = item_in.model_dump(exclude_unset=True) # Get only fields that were actually provided
-    
-    # Create a new Item object with updated fields
-    # Pydantic models are immutable by default, so we create a new one
-    updated_item_data = existing_item.model_copy(update=update_data).model_dump()
-    updated_item = Item(**updated_item_data)
 
-    fake_items_db[item_id] = updated_item
+    # Validate the merged result as a full Item before storing it
+    updated_item = Item(**{**existing_item.to_model().model_dump(), **update_data})
+
+    fake_items_db[item_id] = StoredItem(
+        id=item_id, name=updated_item.name, description=updated_item.description, price=updated_item.price
+    )
     return updated_item
 
 @app.delete("/items/{item_id}", status_code=status.HTTP_204_NO_CONTENT, tags=["Items"])
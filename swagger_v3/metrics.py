@@ -0,0 +1,179 @@
+# metrics.py
+import bisect
+import threading
+import time
+
+from flask import g, request
+
+# Upper bounds, in seconds, of the request latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Prometheus text exposition format
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+STATUS_CLASSES = tuple(f"{n}xx" for n in range(10))
+
+
+class _Shard:
+    """One thread's counters. Only that thread writes them, so recording a
+    request takes no lock; a scrape adds up the shards.
+    """
+
+    __slots__ = ('thread', 'requests', 'latency', 'in_flight')
+
+    def __init__(self, thread):
+        self.thread = thread
+        self.requests = {}   # (endpoint, method, status class) -> count
+        self.latency = {}    # endpoint -> [count per bucket, +Inf count, sum of seconds]
+        self.in_flight = {}  # endpoint -> requests started and not finished
+
+    def merge(self, other):
+        for key, count in list(other.requests.items()):
+            self.requests[key] = self.requests.get(key, 0) + count
+        for endpoint, latency in list(other.latency.items()):
+            mine = self.latency.get(endpoint)
+            self.latency[endpoint] = list(latency) if mine is None else [a + b for a, b in zip(mine, latency)]
+        for endpoint, count in list(other.in_flight.items()):
+            self.in_flight[endpoint] = self.in_flight.get(endpoint, 0) + count
+
+
+class Metrics:
+    """Per-endpoint request counts by method and status class, in-flight
+    gauges and latency histograms, served at METRICS_PATH (default
+    /metrics) in the Prometheus text format.
+
+    Latency covers the request hooks, the view and the error handlers; for a
+    streamed response it ends before the body is sent. A request that fails
+    with an unhandled error counts as a 500. Requests for an unknown URL have
+    the endpoint "none". add_collector exports the numbers in a
+    stats() dict, like a cache's hit counts, next to the request metrics.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._collectors = {}
+        self._lock = threading.Lock()  # guards the shard list: taken once per thread and per scrape
+        self._reset()
+
+    def init_app(self, app):
+        self.buckets = tuple(app.config.get('METRICS_BUCKETS', self.buckets))
+        self._collectors = {}
+        self._reset()
+        # The first before_request hook and the last after_request hook to
+        # run (after_request hooks run in reverse order), so the latency
+        # covers the app's other hooks too
+        app.before_request_funcs.setdefault(None, []).insert(0, self._start)
+        app.after_request_funcs.setdefault(None, []).insert(0, self._finish)
+        app.teardown_request(self._teardown)
+        app.add_url_rule(app.config.get('METRICS_PATH', '/metrics'), 'metrics', self.serve)
+        app.extensions['metrics'] = self
+
+    def add_collector(self, name, stats):
+        """Exports the numeric values of stats() as gauges named <name>_<key>."""
+        self._collectors[name] = stats
+
+    # --- Recording ---
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = _Shard(threading.current_thread())
+            with self._lock:
+                self._shards.append(shard)
+                # Servers that start a thread per request would otherwise
+                # add a shard per request between scrapes
+                if len(self._shards) >= self._retire_at:
+                    self._retire_finished_threads()
+                    self._retire_at = 2 * len(self._shards) + 64
+        return shard
+
+    def _start(self):
+        # The request proxy is resolved once: attribute access through it
+        # costs about a microsecond, on the request object a tenth of that
+        req = request._get_current_object()
+        endpoint = req.endpoint or 'none'
+        shard = self._shard()
+        shard.in_flight[endpoint] = shard.in_flight.get(endpoint, 0) + 1
+        g._metrics = (shard, endpoint, req.method, time.perf_counter())
+
+    def _finish(self, response):
+        self._record(g.pop('_metrics', None), response.status_code)
+        return response
+
+    def _teardown(self, error):
+        # Still pending if no response came back: an error propagated out of
+        # the app (PROPAGATE_EXCEPTIONS) or an after_request hook raised
+        self._record(g.pop('_metrics', None), 500)
+
+    def _record(self, started, status):
+        if started is None:
+            return
+        shard, endpoint, method, start = started
+        duration = time.perf_counter() - start
+        shard.in_flight[endpoint] -= 1
+        key = (endpoint, method, STATUS_CLASSES[status // 100])
+        shard.requests[key] = shard.requests.get(key, 0) + 1
+        latency = shard.latency.get(endpoint)
+        if latency is None:
+            latency = shard.latency[endpoint] = [0] * (len(self.buckets) + 1) + [0.0]
+        latency[bisect.bisect_left(self.buckets, duration)] += 1
+        latency[-1] += duration
+
+    # --- Exposition ---
+    def _reset(self):
+        self._local = threading.local()
+        self._shards = []
+        self._retired = _Shard(None)
+        self._retire_at = 64
+
+    def _retire_finished_threads(self):
+        # A finished thread writes no more, so its shard can be folded in
+        for shard in [s for s in self._shards if not s.thread.is_alive()]:
+            self._retired.merge(shard)
+            self._shards.remove(shard)
+
+    def snapshot(self):
+        """All shards added up, as one _Shard."""
+        total = _Shard(None)
+        with self._lock:
+            self._retire_finished_threads()
+            total.merge(self._retired)
+            for shard in self._shards:
+                total.merge(shard)
+        return total
+
+    def render(self):
+        total = self.snapshot()
+        lines = [
+            '# HELP http_requests_total Requests handled, by endpoint, method and status class.',
+            '# TYPE http_requests_total counter',
+        ]
+        for (endpoint, method, status), count in sorted(total.requests.items()):
+            lines.append(f'http_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {count}')
+        lines += [
+            '# HELP http_requests_in_flight Requests being handled, by endpoint.',
+            '# TYPE http_requests_in_flight gauge',
+        ]
+        for endpoint, count in sorted(total.in_flight.items()):
+            lines.append(f'http_requests_in_flight{{endpoint="{endpoint}"}} {count}')
+        lines += [
+            '# HELP http_request_duration_seconds Request latency, by endpoint.',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        for endpoint, latency in sorted(total.latency.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, latency):
+                cumulative += count
+                lines.append(f'http_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound:g}"}} {cumulative}')
+            cumulative += latency[len(self.buckets)]
+            lines += [
+                f'http_request_duration_seconds_bucket{{endpoint="{endpoint}",le="+Inf"}} {cumulative}',
+                f'http_request_duration_seconds_sum{{endpoint="{endpoint}"}} {latency[-1]:.6f}',
+                f'http_request_duration_seconds_count{{endpoint="{endpoint}"}} {cumulative}',
+            ]
+        for name, stats in sorted(self._collectors.items()):
+            for key, value in stats().items():
+                if isinstance(value, (int, float)):
+                    number = int(value) if isinstance(value, bool) else value
+                    lines += [f'# TYPE {name}_{key} gauge', f'{name}_{key} {number}']
+        return '\n'.join(lines) + '\n'
+
+    def serve(self):
+        return self.render(), 200, {'Content-Type': CONTENT_TYPE}
@@ -0,0 +1,84 @@
+# response_cache.py
+import threading
+from collections import OrderedDict
+
+# Rough per-entry bookkeeping cost on top of the body itself
+ENTRY_OVERHEAD = 256
+
+
+class ResponseCache:
+    """LRU cache of rendered response bodies for GET /api/items.
+
+    Keys start with (appid, appenv, etag) so a body can never outlive the
+    version it was rendered from; ``invalidate`` additionally drops every
+    entry of an environment as soon as it is written, to free the memory.
+    Entries are evicted least-recently-used first once either ``max_entries``
+    or ``max_bytes`` is exceeded.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024, max_entry_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes if max_entry_bytes is not None else max_bytes // 8
+        self._entries = OrderedDict()  # key -> (body, size)
+        self._env_keys = {}  # (appid, appenv) -> set of keys
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, body):
+        size = len(body) + ENTRY_OVERHEAD
+        if size > self.max_entry_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (body, size)
+            self._env_keys.setdefault(key[:2], set()).add(key)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, appid, appenv):
+        with self._lock:
+            for key in self._env_keys.pop((appid, appenv), ()):
+                self._remove(key, forget_env=False)
+                self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, key, forget_env=True):
+        _, size = self._entries.pop(key)
+        self._bytes -= size
+        if forget_env:
+            keys = self._env_keys.get(key[:2])
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._env_keys[key[:2]]
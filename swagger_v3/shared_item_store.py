@@ -0,0 +1,258 @@
+# shared_item_store.py
+import fcntl
+import mmap
+import os
+import struct
+import threading
+import uuid
+import zlib
+from contextlib import contextmanager
+
+from item_journal import (
+    OP_ADD, RECORD_HEADER, SNAPSHOT_CHUNK, apply_payload, delete_op, encode_record, update_op,
+)
+from item_store import ItemStore
+
+# --- Shared file layout ---
+# header = magic, start and committed end offsets of the log, generation,
+#          size of the log right after the last compaction, store id
+# the log = the records of the current generation (item_journal's record
+#           format); the rest of the file is free space
+HEADER = struct.Struct('<8sQQQQ16s')
+MAGIC = b'ITEMSHM2'
+INITIAL_SIZE = 16 * 1024 * 1024
+
+
+class SharedItemStore(ItemStore):
+    """ItemStore whose writes are shared by every process mapping one file.
+
+    The file holds an append-only log of writes. Each process keeps a local
+    copy-on-write replica and, before every operation, replays whatever other
+    processes appended since it last looked. Checking for new records is a
+    lock-free read of the header; catching up takes a shared flock, and
+    writes take an exclusive one, so all workers apply writes in one order.
+
+    Once the log grows past ``compact_factor`` times its size after the last
+    compaction, the writer that notices writes the current state as a new
+    log in free space and switches the header to it, bumping the generation;
+    the other processes then rebuild their replica off to the side and swap
+    it in whole. The live log is never overwritten, so a writer killed
+    mid-compaction leaves it intact.
+    Put the file on tmpfs (e.g. /dev/shm) to keep it purely in memory.
+    """
+
+    def __init__(self, path, compact_min_bytes=8 * 1024 * 1024, compact_factor=4, **kwargs):
+        kwargs.setdefault('copy_on_write', True)
+        super().__init__(**kwargs)
+        self.path = path
+        self.compact_min_bytes = compact_min_bytes
+        self.compact_factor = compact_factor
+        self.created = False
+        self._local_lock = threading.Lock()  # flock does not exclude threads of one process
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._map = None
+        self._applied = HEADER.size
+        self._generation = 0
+        self._store_id = b''
+
+        with self._local_lock, self._flock(fcntl.LOCK_EX):
+            if os.fstat(self._fd).st_size == 0:
+                os.ftruncate(self._fd, INITIAL_SIZE)
+                self._remap()
+                self._write_header(HEADER.size, HEADER.size, 1, 0, uuid.uuid4().bytes)
+                self.created = True
+            else:
+                self._remap()
+                if self._read_header()[0] != MAGIC:
+                    raise ValueError(f"{path} is not a shared item store")
+            self._catch_up()
+        # flock belongs to the open file, which forked workers (gunicorn
+        # --preload) would otherwise share and so never exclude each other
+        os.register_at_fork(after_in_child=self._reopen)
+
+    def close(self):
+        self._map.close()
+        os.close(self._fd)
+
+    # --- Reads: catch up with other processes first ---
+    def has_env(self, appid, appenv):
+        self._sync()
+        return super().has_env(appid, appenv)
+
+    def etag(self, appid, appenv):
+        # Every process replays the same records in the same order, so the
+        # per-environment versions agree across workers within a generation
+        self._sync()
+        while True:
+            # _catch_up swaps in a new generation's replica before its number,
+            # so an unchanged number means env belongs to that generation
+            generation = self._generation
+            env = self._envs.get((appid, appenv))
+            if generation == self._generation:
+                break
+        version = 0 if env is None else env.version
+        return f'{self._store_id.hex()[:12]}-{generation}-{version}'
+
+    def list_items(self, appid, appenv):
+        self._sync()
+        return super().list_items(appid, appenv)
+
+    def list_page(self, appid, appenv, limit, after=None):
+        self._sync()
+        return super().list_page(appid, appenv, limit, after)
+
+    def get_item(self, appid, appenv, item_id):
+        self._sync()
+        return super().get_item(appid, appenv, item_id)
+
+    def find_by_name(self, appid, appenv, name):
+        self._sync()
+        return super().find_by_name(appid, appenv, name)
+
+    def dump(self, on_locked=None):
+        self._sync()
+        return super().dump(on_locked)
+
+    # --- Writes: apply locally, then publish to the shared log ---
+    def add_items(self, appid, appenv, items):
+        with self._exclusive():
+            super().add_items(appid, appenv, items)
+            self._append(OP_ADD, [appid, appenv, items])
+
+    def update_item(self, appid, appenv, item_id, changes):
+        return self.update_items(appid, appenv, [(item_id, changes)])[0]
+
+    def update_items(self, appid, appenv, updates):
+        with self._exclusive():
+            results = super().update_items(appid, appenv, updates)
+            applied = [update for update, item in zip(updates, results) if item is not None]
+            if applied:
+                self._append(*update_op(appid, appenv, applied))
+            return results
+
+    def delete_item(self, appid, appenv, item_id):
+        return self.delete_items(appid, appenv, [item_id])[0]
+
+    def delete_items(self, appid, appenv, item_ids):
+        with self._exclusive():
+            results = super().delete_items(appid, appenv, item_ids)
+            applied = [item_id for item_id, item in zip(item_ids, results) if item is not None]
+            if applied:
+                self._append(*delete_op(appid, appenv, applied))
+            return results
+
+    # --- Internals ---
+    def _sync(self):
+        # Lock-free: another process may be rewriting the header under its
+        # flock, so only two equal reads that match the replica count as
+        # "nothing new"; anything else re-reads it under the lock
+        header = self._read_header()
+        if header[2] == self._applied and header[3] == self._generation and self._read_header() == header:
+            return
+        with self._local_lock, self._flock(fcntl.LOCK_SH):
+            self._catch_up()
+
+    @contextmanager
+    def _exclusive(self):
+        with self._local_lock, self._flock(fcntl.LOCK_EX):
+            self._catch_up()
+            yield
+
+    @contextmanager
+    def _flock(self, mode):
+        fcntl.flock(self._fd, mode)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _catch_up(self):
+        """Replays records appended by other processes; caller holds a flock."""
+        _, log_start, committed, generation, _, store_id = self._read_header()
+        if committed > len(self._map):
+            self._remap()
+        if generation == self._generation:
+            # Replay through ItemStore's own methods so nothing is re-published
+            self._replay(super(), self._applied, committed)
+            self._applied = committed
+            return
+        # The log was compacted: rebuild the replica from the new log off to
+        # the side, so lock-free readers keep the old one until the swap
+        replica = ItemStore(index_names=self._index_names, copy_on_write=self._copy_on_write)
+        self._replay(replica, log_start, committed)
+        with self._write_lock:
+            changed = self._envs.keys() | replica._envs.keys()
+            self._envs = replica._envs
+            self._store_id = store_id
+            self._generation = generation
+        self._applied = committed
+        for appid, appenv in changed:
+            for callback in self._listeners:
+                callback(appid, appenv)
+
+    def _replay(self, replica, offset, end):
+        while offset < end:
+            _, length, crc = RECORD_HEADER.unpack_from(self._map, offset)
+            start = offset + RECORD_HEADER.size
+            payload = self._map[start:start + length]
+            if zlib.crc32(payload) != crc:
+                raise ValueError(f"Corrupt record at offset {offset} of {self.path}")
+            apply_payload(replica, payload)
+            offset = start + length
+
+    def _append(self, op, body):
+        """Appends one record; caller holds the exclusive flock and is caught up."""
+        _, start, committed, generation, compacted, store_id = self._read_header()
+        record = encode_record(committed, op, body)
+        self._ensure_capacity(committed + len(record))
+        self._map[committed:committed + len(record)] = record
+        committed += len(record)
+        # Publish the record only once it is fully written
+        self._write_header(start, committed, generation, compacted, store_id)
+        self._applied = committed
+        if committed - start > max(self.compact_min_bytes, self.compact_factor * compacted):
+            self._compact(start, committed, generation, store_id)
+
+    def _compact(self, start, committed, generation, store_id):
+        records = []
+        for appid, appenv, items in super().dump():
+            for first in range(0, max(len(items), 1), SNAPSHOT_CHUNK):
+                chunk = [item.to_dict() for item in items[first:first + SNAPSHOT_CHUNK]]
+                records.append(encode_record(0, OP_ADD, [appid, appenv, chunk]))
+        data = b''.join(records)
+        # The new log goes before the live one when it fits there, otherwise
+        # after it; either way the live log stays valid until the header
+        # points past it
+        new_start = HEADER.size if HEADER.size + len(data) <= start else committed
+        new_end = new_start + len(data)
+        self._ensure_capacity(new_end)
+        self._map[new_start:new_end] = data
+        self._write_header(new_start, new_end, generation + 1, len(data), store_id)
+        # Rebuild our own replica too, so versions match the other workers'
+        self._catch_up()
+
+    def _reopen(self):
+        os.close(self._fd)
+        self._fd = os.open(self.path, os.O_RDWR)
+        self._local_lock = threading.Lock()
+        self._remap()
+
+    def _ensure_capacity(self, size):
+        if size <= len(self._map):
+            return
+        new_size = len(self._map)
+        while new_size < size:
+            new_size *= 2
+        os.ftruncate(self._fd, new_size)
+        self._remap()
+
+    def _remap(self):
+        # The old map is not closed: lock-free readers in other threads may
+        # still be reading its header. It is unmapped once nothing refers to it.
+        self._map = mmap.mmap(self._fd, os.fstat(self._fd).st_size)
+
+    def _read_header(self):
+        return HEADER.unpack_from(self._map, 0)
+
+    def _write_header(self, start, committed, generation, compacted, store_id):
+        HEADER.pack_into(self._map, 0, MAGIC, start, committed, generation, compacted, store_id)
@@ -0,0 +1,47 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PY_FULL = os.path.join(ROOT, 'py', 'py_full')
+
+# Each app imports its modules as top-level names, the way it does when run
+# from its own directory. The root app and py/py_full share no module names
+# apart from the copies kept identical (see test_module_copies.py).
+for path in (PY_FULL, ROOT):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+@pytest.fixture
+def c_swagger_client():
+    """Test client for the root c_swagger app and its in-memory item store."""
+    import c_swagger
+    return c_swagger.app.test_client()
+
+
+@pytest.fixture
+def py_full_app(tmp_path):
+    """py/py_full app on a fresh SQLite database, logging under tmp_path."""
+    from app import create_app
+    from config import Config
+    from extensions import db
+
+    class TestConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'items.db'}"
+        LOG_FILE = str(tmp_path / 'app.log')
+        EXPECTED_API_KEY = 'test-key'
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture
+def py_full_client(py_full_app):
+    return py_full_app.test_client()
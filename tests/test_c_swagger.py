@@ -0,0 +1,78 @@
+import itertools
+
+import pytest
+
+AUTH = {"Authorization": "token"}
+_envs = itertools.count()
+
+
+@pytest.fixture
+def env(c_swagger_client):
+    """A fresh environment in the app's store holding items 1..25."""
+    appid, appenv = "test-app", f"env-{next(_envs)}"
+    response = c_swagger_client.post("/api/items", headers=AUTH, json={
+        "appid": appid,
+        "appenv": appenv,
+        "items": [{"id": i, "name": f"item {i}"} for i in range(1, 26)],
+    })
+    assert response.status_code == 201
+    return {"appid": appid, "appenv": appenv}
+
+
+def test_cursor_pagination(c_swagger_client, env):
+    seen, cursor = [], None
+    while True:
+        query = dict(env, limit=10, **({"cursor": cursor} if cursor else {}))
+        body = c_swagger_client.get("/api/items", query_string=query).get_json()
+        seen += [item["id"] for item in body["items"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == list(range(1, 26))
+
+
+def test_pagination_skips_items_deleted_between_pages(c_swagger_client, env):
+    first = c_swagger_client.get("/api/items", query_string=dict(env, limit=10)).get_json()
+    response = c_swagger_client.delete("/api/items/batch", headers=AUTH, query_string=env, json={"ids": [11, 12]})
+    assert response.status_code == 200
+    second = c_swagger_client.get("/api/items", query_string=dict(env, limit=10, cursor=first["next_cursor"])).get_json()
+    assert [item["id"] for item in second["items"]] == list(range(13, 23))
+
+
+@pytest.mark.parametrize("query", [{"limit": 0}, {"limit": "ten"}, {"cursor": "not-a-cursor"}])
+def test_invalid_page_parameters(c_swagger_client, env, query):
+    response = c_swagger_client.get("/api/items", query_string=dict(env, **query))
+    assert response.status_code == 400
+
+
+def test_etag_not_modified(c_swagger_client, env):
+    response = c_swagger_client.get("/api/items", query_string=env)
+    etag = response.headers["ETag"]
+
+    not_modified = c_swagger_client.get("/api/items", query_string=env, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["ETag"] == etag
+    assert not_modified.data == b""
+
+    response = c_swagger_client.put("/api/items/1", headers=AUTH, query_string=env, json={"name": "renamed"})
+    assert response.status_code == 200
+    changed = c_swagger_client.get("/api/items", query_string=env, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.get_json()["items"][0]["name"] == "renamed"
+
+
+def test_batch_update_reports_each_item(c_swagger_client, env):
+    response = c_swagger_client.put("/api/items/batch", headers=AUTH, query_string=env, json={
+        "items": [{"id": 1, "description": "updated"}, {"id": 999, "name": "missing"}],
+    })
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert [(result["id"], result["status"]) for result in results] == [(1, 200), (999, 404)]
+    assert results[0]["item"]["description"] == "updated"
+
+
+def test_post_rejects_invalid_batch(c_swagger_client, env):
+    response = c_swagger_client.post("/api/items", headers=AUTH, json=dict(env, items=[{"id": True, "name": "x"}]))
+    assert response.status_code == 400
+    assert len(c_swagger_client.get("/api/items", query_string=env).get_json()["items"]) == 25
@@ -0,0 +1,74 @@
+from item_journal import ItemJournal
+from item_store import ItemStore
+
+
+def items(count, start=0):
+    return [{"id": i, "name": f"item {i}", "description": f"description {i}"} for i in range(start, start + count)]
+
+
+def as_dicts(records):
+    return [record.to_dict() for record in records]
+
+
+def test_add_get_update_delete():
+    store = ItemStore(index_names=True)
+    store.add_items("app", "env", items(5))
+
+    assert store.get_item("app", "env", 3).to_dict() == {"id": 3, "name": "item 3", "description": "description 3"}
+    assert store.update_item("app", "env", 3, {"name": "renamed"}).name == "renamed"
+    assert [item.id for item in store.find_by_name("app", "env", "renamed")] == [3]
+    assert store.delete_item("app", "env", 1).id == 1
+    assert store.delete_item("app", "env", 1) is None
+    assert store.update_item("app", "env", 1, {"name": "gone"}) is None
+    assert [item.id for item in store.list_items("app", "env")] == [0, 2, 3, 4]
+
+
+def test_etag_changes_on_write():
+    store = ItemStore()
+    store.add_items("app", "env", items(2))
+    etag = store.etag("app", "env")
+    assert store.etag("app", "env") == etag
+    store.update_item("app", "env", 0, {"description": "changed"})
+    assert store.etag("app", "env") != etag
+
+
+def test_list_page_follows_insertion_order_across_deletes():
+    store = ItemStore(copy_on_write=True)
+    store.add_items("app", "env", items(10))
+    store.delete_items("app", "env", [2, 3, 7])
+
+    seen, after = [], None
+    while True:
+        page, after = store.list_page("app", "env", 3, after)
+        seen += [item.id for item in page]
+        if after is None:
+            break
+    assert seen == [0, 1, 4, 5, 6, 8, 9]
+
+
+def test_journal_round_trip(tmp_path):
+    store = ItemStore()
+    journal = ItemJournal(str(tmp_path), snapshot_interval=3600)
+    journal.open(store)
+    store.add_items("app", "env", items(50))
+    store.add_items("app", "other", items(3, start=100))
+    journal.snapshot()
+    # Written after the snapshot, so recovery has to replay them from the log
+    store.update_items("app", "env", [(0, {"name": "first"}), (49, {"description": None})])
+    store.delete_items("app", "env", [10, 11])
+    store.delete_item("app", "other", 101)
+    journal.close()
+
+    recovered = ItemStore()
+    recovered_journal = ItemJournal(str(tmp_path), snapshot_interval=3600)
+    assert recovered_journal.open(recovered)
+    recovered_journal.close()
+
+    for appenv in ("env", "other"):
+        assert as_dicts(recovered.list_items("app", appenv)) == as_dicts(store.list_items("app", appenv))
+
+
+def test_journal_open_on_empty_directory(tmp_path):
+    journal = ItemJournal(str(tmp_path / "data"))
+    assert not journal.open(ItemStore())
+    journal.close()
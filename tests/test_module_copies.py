@@ -0,0 +1,39 @@
+"""The shared modules are copied into each app directory, not imported.
+
+Each app directory (the root c_swagger app, swagger_v3, py and py/py_full)
+is run on its own, from inside that directory, with nothing installed: its
+modules import one another as top-level names. A module shared between them
+therefore lives in each directory that uses it, and the copies must stay
+byte-for-byte identical.
+"""
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COPIES = {
+    'item_ingest.py': ['.', 'swagger_v3'],
+    'item_journal.py': ['.', 'swagger_v3'],
+    'item_record.py': ['.', 'swagger_v3'],
+    'item_response.py': ['.', 'swagger_v3'],
+    'item_store.py': ['.', 'swagger_v3'],
+    'json_provider.py': ['.', 'swagger_v3', 'py', 'py/py_full'],
+    'metrics.py': ['.', 'swagger_v3', 'py/py_full'],
+    'request_log.py': ['py', 'py/py_full'],
+    'response_cache.py': ['.', 'swagger_v3'],
+    'shared_item_store.py': ['.', 'swagger_v3'],
+}
+
+
+def read(directory, name):
+    with open(os.path.join(ROOT, directory, name), 'rb') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('name', sorted(COPIES))
+def test_copies_are_identical(name):
+    first, *others = COPIES[name]
+    expected = read(first, name)
+    for directory in others:
+        assert read(directory, name) == expected, f"{directory}/{name} differs from {first}/{name}"
@@ -0,0 +1,70 @@
+import gzip
+import json
+
+import pytest
+
+
+@pytest.fixture
+def runner(py_full_app):
+    return py_full_app.test_cli_runner()
+
+
+def write_lines(path, *lines):
+    path.write_text(''.join(line + '\n' for line in lines), encoding='utf-8')
+    return str(path)
+
+
+def read_items(path):
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_import_export_round_trip(runner, tmp_path):
+    items = [{"id": i, "name": f"item {i}", "description": None if i % 2 else f"about {i}"} for i in range(1, 8)]
+    source = write_lines(tmp_path / 'in.ndjson', *(json.dumps(item) for item in items))
+    result = runner.invoke(args=['items', 'import', source, '--chunk-size', '3'])
+    assert result.exit_code == 0, result.output + result.stderr
+
+    for name in ('out.ndjson', 'out.ndjson.gz'):
+        target = str(tmp_path / name)
+        result = runner.invoke(args=['items', 'export', target, '--chunk-size', '2'])
+        assert result.exit_code == 0, result.stderr
+        exported = read_items(target)
+        assert [{key: item[key] for key in ('id', 'name', 'description')} for item in exported] == items
+
+
+def test_import_gzip_with_new_ids(runner, tmp_path):
+    source = str(tmp_path / 'in.ndjson.gz')
+    with gzip.open(source, 'wt', encoding='utf-8') as f:
+        f.write('{"id": 500, "name": "a"}\n\n{"id": 501, "name": "b"}\n')
+    result = runner.invoke(args=['items', 'import', source, '--new-ids'])
+    assert result.exit_code == 0, result.stderr
+
+    target = str(tmp_path / 'out.ndjson')
+    runner.invoke(args=['items', 'export', target])
+    assert [(item['id'], item['name']) for item in read_items(target)] == [(1, 'a'), (2, 'b')]
+
+
+def test_import_rejects_boolean_id(runner, tmp_path):
+    source = write_lines(tmp_path / 'in.ndjson', '{"id": 1, "name": "a"}', '{"id": true, "name": "b"}')
+    result = runner.invoke(args=['items', 'import', source])
+    assert result.exit_code != 0
+    assert 'Line 2: id must be an integer' in result.stderr
+
+
+def test_import_duplicate_reports_line_range(runner, tmp_path):
+    first = write_lines(tmp_path / 'first.ndjson', '{"id": 1, "name": "a"}')
+    assert runner.invoke(args=['items', 'import', first]).exit_code == 0
+
+    # Line 4 is blank: the second chunk holds the items on lines 3 and 5
+    second = write_lines(tmp_path / 'second.ndjson', '{"id": 2, "name": "b"}', '{"id": 3, "name": "c"}',
+                         '{"id": 4, "name": "d"}', '', '{"id": 1, "name": "a"}')
+    result = runner.invoke(args=['items', 'import', second, '--chunk-size', '2'])
+    assert result.exit_code != 0
+    assert 'Lines 3-5:' in result.stderr
+    assert '2 items were imported before them' in result.stderr
+
+    result = runner.invoke(args=['items', 'import', second, '--skip-existing'])
+    assert result.exit_code == 0, result.stderr
+    assert 'Inserted 1 new items; 3 already existed.' in result.stderr
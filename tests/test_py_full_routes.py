@@ -0,0 +1,74 @@
+API_KEY = {"X-API-Key": "test-key"}
+
+
+def create(client, *items):
+    response = client.post("/items/batch", headers=API_KEY, json=list(items))
+    assert response.status_code == 201, response.get_json()
+    return [result["item"] for result in response.get_json()["results"]]
+
+
+def test_batch_all_created(py_full_client):
+    response = py_full_client.post("/items/batch", headers=API_KEY, json=[{"name": "a"}, {"name": "b"}])
+    assert response.status_code == 201
+    body = response.get_json()
+    assert (body["created"], body["failed"]) == (2, 0)
+    assert [result["item"]["name"] for result in body["results"]] == ["a", "b"]
+
+
+def test_batch_partial_failure_is_multi_status(py_full_client):
+    create(py_full_client, {"name": "taken"})
+    response = py_full_client.post("/items/batch", headers=API_KEY, json=[
+        {"name": "new"},
+        {"name": "taken"},
+        {"name": ""},
+        {"name": "new"},
+    ])
+    assert response.status_code == 207
+    body = response.get_json()
+    assert (body["created"], body["failed"]) == (1, 3)
+    assert [(result["index"], result["status"]) for result in body["results"]] == [(0, 201), (1, 400), (2, 400), (3, 400)]
+    assert "name" in body["results"][1]["errors"]
+
+
+def test_batch_requires_api_key(py_full_client):
+    assert py_full_client.post("/items/batch", json=[{"name": "a"}]).status_code == 401
+
+
+def test_batch_rejects_non_array(py_full_client):
+    response = py_full_client.post("/items/batch", headers=API_KEY, json={"name": "a"})
+    assert response.status_code == 400
+
+
+def test_get_item_etag_not_modified(py_full_client):
+    [item] = create(py_full_client, {"name": "cached", "description": "first"})
+    response = py_full_client.get(f"/items/{item['id']}")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    not_modified = py_full_client.get(f"/items/{item['id']}", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["ETag"] == etag
+
+    response = py_full_client.put(f"/items/{item['id']}", headers=API_KEY, json={"description": "second"})
+    assert response.status_code == 200
+    changed = py_full_client.get(f"/items/{item['id']}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.get_json()["description"] == "second"
+
+
+def test_get_missing_item(py_full_client):
+    assert py_full_client.get("/items/12345").status_code == 404
+
+
+def test_keyset_pagination(py_full_client):
+    create(py_full_client, *({"name": f"item {i}"} for i in range(7)))
+    names, after_id = [], 0
+    while True:
+        response = py_full_client.get("/items/", query_string={"limit": 3, "after_id": after_id})
+        assert response.status_code == 200
+        names += [item["name"] for item in response.get_json()]
+        if "X-Next-After-Id" not in response.headers:
+            break
+        after_id = response.headers["X-Next-After-Id"]
+    assert names == [f"item {i}" for i in range(7)]